@@ -0,0 +1,80 @@
+"""Microbenchmark of the per-row cost of preparing api records for execution.
+
+Compares the previous path (etag removal plus a per-value CustomString TypeDecorator bind processor)
+with the batch normalization stage. Run from the src directory with: python -m benchmarks.normalization
+"""
+from models.db_model import salesInvoiceLines, customers
+from models.normalization import normalize_records
+from sqlalchemy.types import TypeDecorator, String
+from sqlalchemy.dialects.mssql import pyodbc
+import timeit
+import copy
+
+class LegacyCustomString(TypeDecorator):
+    """Previous CustomString implementation, kept here as the benchmark baseline."""
+
+    impl = String
+    cache_ok = True
+
+    def process_bind_param(self,value,dialect):
+        if value == '' or value == ' ':
+            return None
+        return value
+
+
+def make_line_records(n : int):
+    return [{
+        '@odata.etag' : 'W/"JzQ0O0VnQUFBQUo3QlRjQU9BQTJBREVBTlFBMkFBQUFBQUFDeElvQUFBQUFBUT09MTsn"',
+        'documentNo' : f'FV-{i // 10:08d}', 'lineNo' : (i % 10) * 10000, 'type' : 'Item' if i % 3 else ' ',
+        'no' : f'ITEM-{i % 500:05d}', 'quantity' : i % 7, 'unitPrice' : 125.5, 'lineDiscount' : 0,
+        'lineDiscountAmount' : 0, 'amount' : 878.5, 'amountIncludingVAT' : 1019.06,
+        'systemCreatedAt' : '2024-05-10T17:45:12.873Z', 'systemModifiedAt' : '2024-05-11T08:01:55.120Z'
+    } for i in range(n)]
+
+def make_customer_records(n : int):
+    return [{
+        '@odata.etag' : 'W/"JzQ0O0VnQUFBQUo3QlRjQU9BQTJBREVBTlFBMkFBQUFBQUFDeElvQUFBQUFBUT09MTsn"',
+        'no' : f'C{i:06d}', 'name' : f'Customer {i}', 'contact' : '', 'customerPostingGroup' : 'NACIONAL',
+        'customerPriceGroup' : '', 'paymentTermsCode' : '30 DIAS', 'countryRegionCode' : 'MX', 'locationCode' : '',
+        'salespersonCode' : 'JP', 'rfcNo' : 'XAXX010101000', 'blocked' : ' ',
+        'systemCreatedAt' : '2024-05-10T17:45:12.873Z', 'systemModifiedAt' : '2024-05-11T08:01:55.120Z'
+    } for i in range(n)]
+
+
+def legacy_prepare(model, records, dialect):
+    """Reproduces the previous path: strip the etag, then bind every value through the column type processors."""
+
+    processors = []
+    for key, column in model.__mapper__.columns.items():
+        column_type = LegacyCustomString() if column.type.__class__.__name__ == 'CustomString' else column.type
+        processors.append((key, column_type.bind_processor(dialect)))
+
+    for rec in records:
+        rec.pop('@odata.etag', None)
+        for key, process in processors:
+            if process and key in rec:
+                process(rec[key])
+
+def batch_prepare(model, records, dialect):
+    """Current path: one normalization pass per column, plain types bind without python processors."""
+
+    processors = [(key, column.type.bind_processor(dialect)) for key, column in model.__mapper__.columns.items()]
+    for rec in normalize_records(model, records):
+        for key, process in processors:
+            if process and key in rec:
+                process(rec[key])
+
+
+def run(n : int = 20000, repeat : int = 5):
+
+    dialect = pyodbc.dialect()
+    for model, factory in ((salesInvoiceLines, make_line_records), (customers, make_customer_records)):
+        template = factory(n)
+        for name, prepare in (('legacy', legacy_prepare), ('batch', batch_prepare)):
+            best = min(timeit.repeat(lambda: prepare(model, copy.deepcopy(template), dialect), number=1, repeat=repeat))
+            baseline = min(timeit.repeat(lambda: copy.deepcopy(template), number=1, repeat=repeat))
+            print(f'{model.__tablename__:<20} {name:<8} {(best - baseline) / n * 1e6:8.2f} us/row')
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,74 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+import re
+
+#Business Central accepts at most 100 operations per $batch request.
+MAX_BATCH_REQUESTS = 100
+#values per $filter when looking up existing records, keeps the request url short.
+MAX_FILTER_VALUES = 50
+
+ISO_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+@dataclass
+class BulkWriteResult:
+    """Outcome of a single record of a bulk write: created, skipped (already existing or repeated) or failed."""
+
+    index : int
+    record : Dict[str,Any]
+    status : str
+    http_status : Optional[int] = None
+    body : Optional[Dict[str,Any]] = None
+    error : Optional[str] = None
+
+
+def format_odata_literal(value : Any) -> str:
+    """Formats a python value as an odata $filter literal, strings holding an ISO date are formatted as Edm.Date."""
+
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, str) and ISO_DATE.match(value):
+        return value
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def record_key(record : Dict[str,Any], key_fields : List[str]) -> Tuple:
+    """Business key of a record, compared as strings so keys sent and returned by the api match."""
+
+    return tuple(str(record.get(field)) for field in key_fields)
+
+
+def build_key_filters(records : List[Dict[str,Any]], key_fields : List[str]) -> List[str]:
+    """Filters selecting the candidate existing records, by the distinct values of the first key field."""
+
+    field = key_fields[0]
+    values = sorted({format_odata_literal(rec.get(field)) for rec in records})
+
+    return [' or '.join(f'{field} eq {value}' for value in values[start:start + MAX_FILTER_VALUES])
+            for start in range(0, len(values), MAX_FILTER_VALUES)]
+
+
+def build_batch_payload(entity_url : str, indexed_records : List[Tuple[int,Dict[str,Any]]], atomic : bool) -> Dict[str,Any]:
+    """JSON $batch body posting each record, in a single changeset (atomicity group) when atomic is set."""
+
+    requests = []
+    for index, record in indexed_records:
+        operation = {
+            'id' : str(index),
+            'method' : 'POST',
+            'url' : entity_url,
+            'headers' : {'Content-Type' : 'application/json'},
+            'body' : record
+        }
+        if atomic:
+            operation['atomicityGroup'] = 'changeset'
+        requests.append(operation)
+
+    return {'requests' : requests}
@@ -2,18 +2,39 @@ from msal import ConfidentialClientApplication
 import requests
 from datetime import datetime
 import urllib.parse
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Generator, Optional, Tuple
 from .exceptions import BusinessCentralClientRequestError, TokenRequestError
+from .page_size import PageSizeTuner
+from .streaming import ODataPageReader
+from .bulk import BulkWriteResult, MAX_BATCH_REQUESTS, build_batch_payload, build_key_filters, record_key
+from concurrent.futures import ThreadPoolExecutor
 import logging
+import time
+import json
+import re
+import itertools
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+#responses that signal throttling by Business Central, retried with a smaller page size.
+THROTTLE_STATUS_CODES = (429, 503, 504)
+MAX_THROTTLE_RETRIES = 5
+#page bodies are read and parsed incrementally in chunks of this size, records are yielded in batches.
+STREAM_CHUNK_BYTES = 64 * 1024
+STREAM_BATCH_SIZE = 5000
+#top level @odata.nextLink of a page body, searched first in its last bytes where Business Central writes it.
+NEXT_LINK = re.compile(rb'(?<!\\)"@odata\.nextLink"\s*:\s*"((?:[^"\\]|\\.)*)"')
+NEXT_LINK_TAIL_BYTES = 4096
+#numbers each request, so the sampling of config.logging_config keeps or drops its request and response lines together.
+_request_numbers = itertools.count(1)
+
 class BusinessCentralAPIClient(requests.Session):
     """A client for interacting with Business Central API."""
     
-    def __init__(self,tenant_id,environment,api_publisher,api_group,api_version,company_id,client_id,client_secret):
-        """Initializes the api client with oauth 2.0 bearer token authentication."""
+    def __init__(self,tenant_id,environment,api_publisher,api_group,api_version,company_id,client_id,client_secret,page_size=None,page_size_cache=None):
+        """Initializes the api client with oauth 2.0 bearer token authentication.
+           page_size fixes the odata.maxpagesize of every request, otherwise it is learned per entity of the environment and company and persisted at page_size_cache."""
 
         super().__init__()
 
@@ -27,9 +48,12 @@ class BusinessCentralAPIClient(requests.Session):
         self.client_secret = client_secret
         self.scopes = ['https://api.businesscentral.dynamics.com/.default']
         self.base_url = f"https://api.businesscentral.dynamics.com/v2.0/{self.environment}/api/{self.api_publisher}/{self.api_group}/{self.api_version}/companies({self.company_id})/"
+        self.api_root_url = f"https://api.businesscentral.dynamics.com/v2.0/{self.environment}/api/{self.api_publisher}/{self.api_group}/{self.api_version}/"
+        self.subscriptions_url = f"https://api.businesscentral.dynamics.com/v2.0/{self.environment}/api/v2.0/subscriptions"
         self.authority = f"https://login.microsoftonline.com/{self.tenant_id}"
         self.access_token = None
         self.token_type = None
+        self.page_size_tuner = PageSizeTuner(page_size_cache, page_size, (environment, company_id))
         self.log_client_details()
         self.get_oauth_token()
 
@@ -74,6 +98,7 @@ class BusinessCentralAPIClient(requests.Session):
         """Refresh the bearer token if expired"""
 
         self.get_oauth_token()
+        self.headers['Authorization'] = f'{self.token_type} {self.access_token}'
 
 
     def request(self, method : str, url : str, **kwargs):
@@ -81,14 +106,21 @@ class BusinessCentralAPIClient(requests.Session):
 
         endpoint = urllib.parse.urljoin(self.base_url,url)
         parameters = kwargs.get('params')
-        logger.info(f'Attempting {method} request to {endpoint}. \n parameters : {parameters}')
+        #request logs are sampled per entity in the queue logging mode of config.logging_config
+        entity = urllib.parse.urlsplit(endpoint).path.rsplit('/',1)[-1]
+        request_no = next(_request_numbers)
+        logger.info(f'Attempting {method} request to {endpoint}. \n parameters : {parameters}',
+                    extra={'sample_key' : entity, 'request_no' : request_no, 'method' : method})
         response = super().request(url=endpoint,method=method,**kwargs)
 
-        logger.info(f'response obtained with status code : {response.status_code}')
+        logger.info(f'response obtained with status code : {response.status_code}',
+                    extra={'sample_key' : entity, 'request_no' : request_no, 'status_code' : response.status_code, 'elapsed_ms' : int(response.elapsed.total_seconds() * 1000)})
 
         if response.status_code == 401:
             logger.warning('401 Unauthorized request, refreshing oauth token')
             self.refresh_oauth_token()
+            if kwargs.get('headers') is not None:
+                kwargs['headers'] = {**kwargs['headers'], 'Authorization' : self.headers['Authorization']}
             response = super().request(url=endpoint,method=method,**kwargs)
             
 
@@ -97,41 +129,126 @@ class BusinessCentralAPIClient(requests.Session):
 
         except requests.HTTPError as e:
             logger.error(f'http error :\n {e}')
-            raise BusinessCentralClientRequestError(f'Unable to process the request to business central API : {e}')
+            retry_after = response.headers.get('Retry-After')
+            raise BusinessCentralClientRequestError(f'Unable to process the request to business central API : {e}',
+                                                    status_code=response.status_code,
+                                                    retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None)
             
 
         return response
     
     
-    def paginated_get_request(self, url : str, params : dict = None):
-        """Paginated GET request using @odata.next link parameter, which is available on paginated responses of the API."""
+    def _get_page_response(self, entity : str, url : str, params : dict = None, field_count : int = None, stream : bool = True) -> Tuple[requests.Response,int,float]:
+        """GET request of a single page, sized with the odata.maxpagesize preference learned for the entity.
+           Throttled responses shrink the page size and are retried after the Retry-After delay.
+           Returns the response, the requested page size and the seconds until the response was received."""
 
-        response = self.request(url=url,method='GET',headers=self.headers,params=params)
-        result = response.json()
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
 
-        all_values = result.get('value',[])
+            page_size = self.page_size_tuner.get(entity, field_count)
+            headers = {**self.headers, 'Prefer' : f'odata.maxpagesize={page_size}'}
+            started = time.perf_counter()
 
-        next_link = result.get('@odata.nextLink')
+            try:
+                response = self.request(url=url,method='GET',headers=headers,params=params,stream=stream)
+            except BusinessCentralClientRequestError as e:
+                if e.status_code not in THROTTLE_STATUS_CODES or attempt == MAX_THROTTLE_RETRIES:
+                    raise
+                self.page_size_tuner.record_throttle(entity)
+                time.sleep(e.retry_after or 2 ** attempt)
+                continue
 
-        while next_link:
+            return response, page_size, time.perf_counter() - started
+
+    def iter_page(self, entity : str, url : str, params : dict = None, field_count : int = None) -> Generator[List[Dict[str,Any]], None, Optional[str]]:
+        """Records of a single page, parsed and yielded in batches while the body downloads, the @odata.nextLink of the page is returned."""
+
+        response, page_size, request_seconds = self._get_page_response(entity, url, params, field_count)
+        reader = ODataPageReader(response.iter_content(STREAM_CHUNK_BYTES))
+
+        try:
+            yield from reader.iter_batches(STREAM_BATCH_SIZE)
+        finally:
+            response.close()
+
+        self.page_size_tuner.record_page(entity, page_size, reader.record_count,
+                                         request_seconds + reader.read_seconds, reader.payload_bytes)
+        return reader.metadata.get('@odata.nextLink')
+
+    def iter_raw_pages(self, url : str, params : dict = None, field_count : int = None) -> Iterator[bytes]:
+        """Paginated GET request yielding the undecoded body of each page, for decoding outside of this process.
+           Only the @odata.nextLink is read from the body, so pages are recorded on the page size tuner with an unknown record count."""
+
+        entity = url
+        next_link = url
+        try:
+            while next_link:
+                response, page_size, request_seconds = self._get_page_response(entity, next_link, params, field_count, stream=False)
+                payload = response.content
+                match = NEXT_LINK.search(payload, max(0, len(payload) - NEXT_LINK_TAIL_BYTES)) or NEXT_LINK.search(payload)
+                next_link = json.loads(b'"' + match.group(1) + b'"') if match else None
+                params = None
+                self.page_size_tuner.record_page(entity, page_size, None, request_seconds, len(payload))
+                yield payload
+        finally:
+            self.page_size_tuner.save()
+
+    def iter_paginated_get_request(self, url : str, params : dict = None, field_count : int = None) -> Iterator[List[Dict[str,Any]]]:
+        """Paginated GET request using @odata.next link parameter, yielding batches of records as each page is received."""
+
+        entity = url
+        try:
+            next_link = yield from self.iter_page(entity,url,params,field_count)
+
+            while next_link:
+
+                next_link = yield from self.iter_page(entity,next_link,field_count=field_count)
+
+        finally:
+            self.page_size_tuner.save()
+
+    def paginated_get_request(self, url : str, params : dict = None):
+        """Paginated GET request using @odata.next link parameter, which is available on paginated responses of the API."""
+
+        all_values = []
+        for page in self.iter_paginated_get_request(url,params):
+            all_values.extend(page)
 
-            next_response = self.request(url=next_link,method='GET',headers=self.headers)
-            next_result = next_response.json()
-            all_values.extend(next_result.get('value',[]))
-            next_link = next_result.get('@odata.nextLink')
-        
         return all_values
     
+    @staticmethod
+    def format_timestamp(timestamp : datetime) -> str:
+        return timestamp.strftime('%Y-%m-%dT%H:%M:%S.%f')+'Z'
+
+    def count_changes(self, endpoint : str, last_created_at : datetime = None, last_modified_at : datetime = None) -> int:
+        """Cheap probe of the records created or modified after the given timestamps, requesting a single record and the total count.
+           Without timestamps it returns the total number of records of the endpoint."""
+
+        params = {'$schemaversion':'1.0', '$top':'1', '$count':'true', '$select':'systemModifiedAt'}
+
+        conditions = []
+        if last_created_at:
+            conditions.append(f'systemCreatedAt gt {self.format_timestamp(last_created_at)}')
+        if last_modified_at:
+            conditions.append(f'systemModifiedAt gt {self.format_timestamp(last_modified_at)}')
+        if conditions:
+            params['$filter'] = ' or '.join(conditions)
+
+        response = self.request(url=endpoint,method='GET',headers=self.headers,params=params)
+        result = response.json()
+
+        return result.get('@odata.count', len(result.get('value',[])))
+
     def create_parameters(self,last_created_at : datetime = None, last_modified_at : datetime = None, order_by : str = None, select : List[str] = None, offset : int =None, limit : int = None, custom_filter : str = None):
         """Dinamically generate parameters dictionary for the request, using odata standard parameters: $filter, $orderBy, $select, $offset and $limit"""
         params = {'$schemaversion':'1.0'}
 
         if last_created_at:
-            formatted_datetime = last_created_at.strftime('%Y-%m-%dT%H:%M:%S.%f')+'Z'
+            formatted_datetime = self.format_timestamp(last_created_at)
             params.update({'$filter' : f'systemCreatedAt gt {formatted_datetime}'})
         
         if last_modified_at:
-            formatted_datetime = last_modified_at.strftime('%Y-%m-%dT%H:%M:%S.%f')+'Z'
+            formatted_datetime = self.format_timestamp(last_modified_at)
             if '$filter' in params:
                 params['$filter'] = params['$filter'] + f' and systemModifiedAt gt {formatted_datetime}'
             else:
@@ -170,7 +287,141 @@ class BusinessCentralAPIClient(requests.Session):
             logger.warning(f'No items in response for entity {endpoint}')
 
         return result
+
+    def iter_raw_with_params(self, endpoint : str, last_created_at : datetime = None, last_modified_at : datetime = None, order_by : str = None, select : List[str] = None, offset : int = None, limit : int = None, custom_filter : str = None)-> Iterator[bytes]:
+        """Get the undecoded pages of a specific API endpoint, using custom odata parameters."""
+
+        params = self.create_parameters(last_created_at,last_modified_at,order_by,select,offset,limit,custom_filter)
+        yield from self.iter_raw_pages(url=endpoint,params=params,field_count=len(select) if select else None)
+
+    def iter_with_params(self, endpoint : str, last_created_at : datetime = None, last_modified_at : datetime = None, order_by : str = None, select : List[str] = None, offset : int = None, limit : int = None, custom_filter : str = None)-> Iterator[List[Dict[str,Any]]]:
+        """Get records from a specific API endpoint page by page, using custom odata parameters."""
+
+        params = self.create_parameters(last_created_at,last_modified_at,order_by,select,offset,limit,custom_filter)
+        yield from self.iter_paginated_get_request(url=endpoint,params=params,field_count=len(select) if select else None)
     
+    def get_resource_path(self, entity : str) -> str:
+        """Resource path of an entity, as used by webhook subscriptions and notifications."""
+
+        return f"api/{self.api_publisher}/{self.api_group}/{self.api_version}/companies({self.company_id})/{entity}"
+
+    def list_subscriptions(self) -> List[Dict[str,Any]]:
+
+        response = self.request(url=self.subscriptions_url,method='GET',headers=self.headers)
+        return response.json().get('value',[])
+
+    def create_subscription(self, entity : str, notification_url : str, client_state : str) -> Dict[str,Any]:
+        """Registers a webhook subscription for the changes of an entity. Business Central validates notification_url before replying."""
+
+        request_body = {
+            'notificationUrl' : notification_url,
+            'resource' : self.get_resource_path(entity),
+            'clientState' : client_state
+        }
+        response = self.request(url=self.subscriptions_url,method='POST',headers=self.headers,json=request_body)
+        return response.json()
+
+    def renew_subscription(self, subscription : Dict[str,Any], client_state : str = None) -> Dict[str,Any]:
+        """Extends the expiration of a subscription, which Business Central limits to three days, optionally replacing its client state."""
+
+        headers = {**self.headers, 'If-Match' : subscription['@odata.etag']}
+        url = f"{self.subscriptions_url}('{subscription['subscriptionId']}')"
+        request_body = {
+            'notificationUrl' : subscription['notificationUrl'],
+            'resource' : subscription['resource'],
+            'clientState' : client_state or subscription.get('clientState')
+        }
+        response = self.request(url=url,method='PATCH',headers=headers,json=request_body)
+        return response.json()
+
+    def delete_subscription(self, subscription : Dict[str,Any]) -> None:
+
+        headers = {**self.headers, 'If-Match' : subscription['@odata.etag']}
+        self.request(url=f"{self.subscriptions_url}('{subscription['subscriptionId']}')",method='DELETE',headers=headers)
+
+    def bulk_post(self, entity : str, records : List[Dict[str,Any]], key_fields : List[str] = None, max_concurrency : int = 4,
+                  batch_size : int = MAX_BATCH_REQUESTS, atomic : bool = True) -> List[BulkWriteResult]:
+        """Creates many records of an entity through $batch requests, sending up to max_concurrency batches at a time.
+           Records whose key_fields match an existing record, or an earlier record of the input, are skipped, so a series can be posted again safely.
+           With atomic set each batch is a changeset, committed or rejected as a whole. Returns one result per record, in input order."""
+
+        results : List[Optional[BulkWriteResult]] = [None] * len(records)
+        pending = list(enumerate(records))
+
+        if key_fields and records:
+            existing = self.get_existing_keys(entity, records, key_fields)
+            for index, record in pending:
+                if record_key(record, key_fields) in existing:
+                    results[index] = BulkWriteResult(index, record, 'skipped')
+            pending = [(index, record) for index, record in pending if results[index] is None]
+            logger.info(f'{len(records) - len(pending)} of {len(records)} records already exist in entity {entity} and are skipped.')
+
+            #repeated keys would be created twice, or fail the atomic batch holding them, only their first copy is posted
+            seen = set()
+            for index, record in pending:
+                key = record_key(record, key_fields)
+                if key in seen:
+                    results[index] = BulkWriteResult(index, record, 'skipped')
+                seen.add(key)
+            if len(seen) < len(pending):
+                logger.info(f'{len(pending) - len(seen)} repeated records of entity {entity} are skipped.')
+                pending = [(index, record) for index, record in pending if results[index] is None]
+
+        batches = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+        entity_url = f'companies({self.company_id})/{entity}'
+
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+            for batch_results in executor.map(lambda batch: self._post_batch(entity_url, batch, atomic), batches):
+                for result in batch_results:
+                    results[result.index] = result
+
+        return results
+
+    def get_existing_keys(self, entity : str, records : List[Dict[str,Any]], key_fields : List[str]) -> set:
+        """Returns the keys of the existing records of an entity that share the first key field with the given records."""
+
+        existing = set()
+        for key_filter in build_key_filters(records, key_fields):
+            for page in self.iter_with_params(entity, select=key_fields, custom_filter=key_filter):
+                existing.update(record_key(rec, key_fields) for rec in page)
+
+        return existing
+
+    def _post_batch(self, entity_url : str, batch : List[Tuple[int,Dict[str,Any]]], atomic : bool) -> List[BulkWriteResult]:
+
+        records = dict(batch)
+        try:
+            response = self.request(url=urllib.parse.urljoin(self.api_root_url,'$batch'),method='POST',headers=self.headers,
+                                    json=build_batch_payload(entity_url, batch, atomic))
+            responses = response.json().get('responses',[])
+        except Exception as e:
+            return [BulkWriteResult(index, record, 'failed', error=str(e)) for index, record in batch]
+
+        results = []
+        for item in responses:
+            index = int(item['id'])
+            status = item.get('status')
+            body = item.get('body')
+            if status is not None and 200 <= status < 300:
+                results.append(BulkWriteResult(index, records[index], 'created', status, body))
+            else:
+                error = body.get('error',{}).get('message') if isinstance(body, dict) else str(body)
+                results.append(BulkWriteResult(index, records[index], 'failed', status, body, error))
+
+        answered = {result.index for result in results}
+        results.extend(BulkWriteResult(index, record, 'failed', error='missing from $batch response')
+                       for index, record in batch if index not in answered)
+
+        return results
+
+    def post_exchange_rates(self, rates : List[Dict[str,Any]], max_concurrency : int = 4) -> List[BulkWriteResult]:
+        """Posts exchange rates (currencyCode, startingDate, exchangeRateAmount and optionally relationalCurrencyCode),
+           skipping the rates that already exist for the same currency and date."""
+
+        records = [{'relationalCurrencyCode' : '', **rate} for rate in rates]
+        return self.bulk_post('exchangeRates', records, key_fields=['startingDate','currencyCode','relationalCurrencyCode'],
+                              max_concurrency=max_concurrency)
+
     def post_usd_exchange_rate(self, starting_date : str, rate_amount : float):
         """Allows to insert the exchange rate for USD currency for a specific date"""
 
@@ -182,6 +433,6 @@ class BusinessCentralAPIClient(requests.Session):
             'startingDate' : starting_date
         }
 
-        response =super().request(url = urllib.parse.urljoin(self.base_url,'exchangeRates') ,method='POST', json=request_body)
+        response = self.request(url='exchangeRates',method='POST',headers=self.headers,json=request_body)
 
-        return response
\ No newline at end of file
+        return response
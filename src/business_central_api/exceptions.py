@@ -1,6 +1,9 @@
-
 class TokenRequestError(Exception):
     pass
 
 class BusinessCentralClientRequestError(Exception):
-    pass
+
+    def __init__(self, message : str, status_code : int = None, retry_after : float = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
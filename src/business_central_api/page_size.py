@@ -0,0 +1,122 @@
+import json
+import os
+import tempfile
+import threading
+import logging
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+#bounds accepted by the odata.maxpagesize preference of Business Central.
+MIN_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 20000
+#fields per page used to size the first request of an entity, so narrow entities start with bigger pages.
+INITIAL_PAGE_CELLS = 200000
+#a page is sized to be fetched within this latency and without exceeding this payload.
+TARGET_PAGE_SECONDS = 5.0
+MAX_PAGE_BYTES = 8 * 1024 * 1024
+
+
+class PageSizeTuner:
+    """Learns the odata.maxpagesize of each entity from the latency, payload bytes and throttling of its pages.
+       Learned sizes are persisted as json in cache_path under the environment and company of scope, so they carry over between runs
+       and clients of other companies sharing the cache keep their own sizes. A fixed_page_size disables the tuning."""
+
+    def __init__(self, cache_path : Optional[str] = None, fixed_page_size : Optional[int] = None, scope : Tuple[str,str] = ('', '')):
+
+        self.cache_path = cache_path
+        self.fixed_page_size = fixed_page_size
+        self.environment, self.company = scope
+        self._sizes : Dict[str,int] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def get(self, entity : str, field_count : Optional[int] = None) -> int:
+        """Returns the page size to request for an entity, derived from its number of selected fields when not learned yet."""
+
+        if self.fixed_page_size:
+            return self.fixed_page_size
+
+        with self._lock:
+            if entity not in self._sizes:
+                self._sizes[entity] = self._clamp(INITIAL_PAGE_CELLS // field_count) if field_count else MAX_PAGE_SIZE
+            return self._sizes[entity]
+
+    def record_page(self, entity : str, page_size : int, record_count : Optional[int], elapsed : float, payload_bytes : int) -> None:
+        """Moves the page size of an entity halfway towards the size that meets the latency and payload targets.
+           Pages smaller than the requested size, or of unknown record count, only shrink the size, since they do not show how far it could grow."""
+
+        if self.fixed_page_size or record_count == 0:
+            return
+
+        #the requested size bounds the record count, so the payload target computed from it is an upper bound when the count is unknown
+        ideal = page_size * TARGET_PAGE_SECONDS / max(elapsed, 0.001)
+        ideal = min(ideal, MAX_PAGE_BYTES * (record_count or page_size) / max(payload_bytes, 1), page_size * 2)
+        if record_count is None or record_count < page_size:
+            ideal = min(ideal, page_size)
+
+        with self._lock:
+            self._sizes[entity] = self._clamp((page_size + ideal) // 2)
+
+    def record_throttle(self, entity : str) -> None:
+        """Halves the page size of an entity after a throttled response."""
+
+        if self.fixed_page_size:
+            return
+
+        with self._lock:
+            self._sizes[entity] = self._clamp(self._sizes.get(entity, MAX_PAGE_SIZE) // 2)
+            logger.warning(f'Throttled response for entity {entity}, page size reduced to {self._sizes[entity]}')
+
+    def save(self) -> None:
+        """Merges the sizes of this scope into the cache, written to a temporary file then moved over it,
+           so a concurrent reader or an interrupted write never sees a partial file."""
+
+        if not self.cache_path:
+            return
+
+        with self._lock:
+            sizes = dict(self._sizes)
+
+        cache = self._read() or {}
+        cache.setdefault(self.environment, {})[self.company] = sizes
+        directory = os.path.dirname(os.path.abspath(self.cache_path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix='.page_sizes_', suffix='.tmp', dir=directory)
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(cache, f, indent=2, sort_keys=True)
+                os.replace(tmp_path, self.cache_path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+        except OSError as e:
+            logger.warning(f'Unable to persist learned page sizes at {self.cache_path} : {e}')
+
+    def _load(self) -> None:
+
+        sizes = (self._read() or {}).get(self.environment, {}).get(self.company, {})
+        self._sizes = {entity : self._clamp(size) for entity, size in sizes.items()}
+
+    def _read(self) -> Optional[Dict[str,Dict[str,Dict[str,int]]]]:
+        """Returns the cached sizes by environment, company and entity, None when missing or unreadable."""
+
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+
+        try:
+            with open(self.cache_path) as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f'Ignoring unreadable page size cache at {self.cache_path} : {e}')
+            return None
+
+        #caches written before the sizes were scoped map entities to sizes directly, they are dropped
+        return {environment : companies for environment, companies in cache.items()
+                if isinstance(companies, dict) and all(isinstance(sizes, dict) for sizes in companies.values())}
+
+    @staticmethod
+    def _clamp(size : float) -> int:
+        return int(min(MAX_PAGE_SIZE, max(MIN_PAGE_SIZE, size)))
@@ -0,0 +1,88 @@
+import codecs
+import json
+import re
+import time
+from typing import Iterable, Iterator, List, Dict, Any
+
+VALUE_ARRAY = re.compile(r'"value"\s*:\s*\[')
+SEPARATORS = ' \t\r\n,'
+
+
+class ODataPageReader:
+    """Incremental parser of an odata page body, yielding the records of its value array while the body is still downloading.
+       The remaining top level fields, like @odata.nextLink, are available in metadata once the records are consumed."""
+
+    def __init__(self, chunks : Iterable[bytes]):
+
+        self._chunks = iter(chunks)
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.metadata : Dict[str,Any] = {}
+        self.record_count = 0
+        self.payload_bytes = 0
+        self.read_seconds = 0.0
+
+    def iter_batches(self, batch_size : int = 5000) -> Iterator[List[Dict[str,Any]]]:
+
+        buffer = ''
+        prefix = None
+        in_values = False
+        batch = []
+
+        for chunk in self._read_chunks():
+
+            buffer += self._text_decoder.decode(chunk)
+
+            if prefix is None:
+                match = VALUE_ARRAY.search(buffer)
+                if not match:
+                    continue
+                prefix = buffer[:match.start()]
+                buffer = buffer[match.end():]
+                in_values = True
+
+            if in_values:
+                pos = 0
+                while True:
+                    while pos < len(buffer) and buffer[pos] in SEPARATORS:
+                        pos += 1
+                    if pos == len(buffer):
+                        break
+                    if buffer[pos] == ']':
+                        in_values = False
+                        pos += 1
+                        break
+                    try:
+                        record, pos = self._decoder.raw_decode(buffer, pos)
+                    except json.JSONDecodeError:
+                        #incomplete record, wait for the next chunk
+                        break
+                    batch.append(record)
+                    if len(batch) >= batch_size:
+                        self.record_count += len(batch)
+                        yield batch
+                        batch = []
+                buffer = buffer[pos:]
+
+        buffer += self._text_decoder.decode(b'', final=True)
+
+        if prefix is None or in_values:
+            raise ValueError('Incomplete odata response, the value array was not closed.')
+
+        if batch:
+            self.record_count += len(batch)
+            yield batch
+
+        self.metadata = json.loads(prefix + '"value":[]' + buffer)
+
+    def _read_chunks(self) -> Iterator[bytes]:
+        """Reads the body, timing only the download, not the time spent by consumers between batches."""
+
+        while True:
+            started = time.perf_counter()
+            chunk = next(self._chunks, None)
+            self.read_seconds += time.perf_counter() - started
+            if chunk is None:
+                return
+            self.payload_bytes += len(chunk)
+            yield chunk
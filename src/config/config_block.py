@@ -15,4 +15,11 @@ class IntegracionBusinessCentral(Block):
     username : Optional[SecretStr]
     password : Optional[SecretStr]
     server : str
-    database : str
\ No newline at end of file
+    database : str
+    pool_size : Optional[int] = None
+    page_size : Optional[int] = None
+    page_size_cache : Optional[str] = None
+    pool_recycle : int = 1800
+    pool_pre_ping : bool = True
+    key_index_cache : Optional[str] = None
+    backend : str = 'mssql'
@@ -1,20 +1,146 @@
 import logging
 import logging.handlers
+import threading
+import atexit
+import queue
+import json
 import sys
+from collections import Counter, OrderedDict
+from typing import Dict, Any, List, Optional
 
-def setup_logging(log_level=logging.INFO, log_file=None):
+#attributes of every LogRecord, the remaining ones were passed as extra and are written as fields by JsonFormatter.
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+#process level state of the queue logging mode
+_listener : Optional[logging.handlers.QueueListener] = None
+_sampler : Optional['SamplingFilter'] = None
+_listener_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats each record as a single line JSON object, with the extra attributes of the record as fields."""
+
+    def format(self, record : logging.LogRecord) -> str:
+
+        entry = {
+            'time' : self.formatTime(record),
+            'level' : record.levelname,
+            'logger' : record.name,
+            'message' : record.getMessage(),
+        }
+        entry.update({key : value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Lets through the records of one of every sample_every requests logged with a sample_key extra attribute (e.g. the entity),
+       the rest are only counted, with their status_code when present, until summarize returns and resets the counts of a key.
+       Records sharing a request_no extra attribute are sampled together, so the request and response lines of a request are kept as a pair."""
+
+    #decisions of the requests whose records were not all seen yet, e.g. requests that raised before their response was logged
+    MAX_PENDING_REQUESTS = 1024
+
+    def __init__(self, sample_every : int = 100):
+
+        super().__init__()
+        self.sample_every = max(1, sample_every)
+        self._counts : Dict[str,Counter] = {}
+        self._pending : 'OrderedDict[Any,bool]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def filter(self, record : logging.LogRecord) -> bool:
+
+        key = getattr(record, 'sample_key', None)
+        if key is None:
+            return True
+
+        request_no = getattr(record, 'request_no', None)
+        with self._lock:
+            counts = self._counts.setdefault(key, Counter())
+            counts['records'] += 1
+            status_code = getattr(record, 'status_code', None)
+            if status_code is not None:
+                counts[f'status_{status_code}'] += 1
+
+            if request_no is not None and request_no in self._pending:
+                return self._pending.pop(request_no)
+
+            counts['requests'] += 1
+            keep = counts['requests'] % self.sample_every == 1 or self.sample_every == 1
+            if request_no is not None:
+                self._pending[request_no] = keep
+                if len(self._pending) > self.MAX_PENDING_REQUESTS:
+                    self._pending.popitem(last=False)
+            return keep
+
+    def summarize(self, key : str) -> Dict[str,int]:
+
+        with self._lock:
+            return dict(self._counts.pop(key, Counter()))
+
+
+def _build_handlers(log_file : Optional[str], formatter : logging.Formatter) -> List[logging.Handler]:
+
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+def enable_queue_logging(sample_every : int = 100, structured : bool = True) -> logging.handlers.QueueListener:
+    """Moves the handlers of the root logger behind a QueueListener thread, so logging calls only enqueue their records.
+       Records with a sample_key are sampled by a SamplingFilter before being enqueued. Calling it again returns the running listener."""
+
+    global _listener, _sampler
+
+    with _listener_lock:
+        if _listener is not None:
+            return _listener
+
+        root_logger = logging.getLogger()
+        handlers = list(root_logger.handlers) or _build_handlers(None, logging.Formatter())
+        for handler in handlers:
+            root_logger.removeHandler(handler)
+            if structured:
+                handler.setFormatter(JsonFormatter())
+
+        _sampler = SamplingFilter(sample_every)
+        queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+        queue_handler.addFilter(_sampler)
+        root_logger.addHandler(queue_handler)
+
+        _listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+        return _listener
+
+def log_sample_summary(logger : logging.Logger, key : str, message : str) -> None:
+    """Logs the counts of the sampled records of a key as a single record, does nothing outside of the queue logging mode."""
+
+    if _sampler is None:
+        return
+
+    counts = _sampler.summarize(key)
+    if counts:
+        logger.info(f'{message} : {counts}', extra={'summary_of' : key, **counts})
+
+
+def setup_logging(log_level=logging.INFO, log_file=None, queued=False, sample_every=100):
+    """Configures the root logger, with queued set records are written as JSON lines by a listener thread, see enable_queue_logging."""
 
     log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     formatter = logging.Formatter(log_format)
-    
+
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
-    
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
-    
-    if log_file:
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setFormatter(formatter)
-        root_logger.addHandler(file_handler)
\ No newline at end of file
+
+    for handler in _build_handlers(log_file, formatter):
+        root_logger.addHandler(handler)
+
+    if queued:
+        enable_queue_logging(sample_every)
@@ -5,6 +5,10 @@ import os
 from dotenv import load_dotenv
 from .config_block import IntegracionBusinessCentral
 
+#learned api page sizes are kept outside the working directory, which is cloned again on every deployment run.
+DEFAULT_PAGE_SIZE_CACHE = os.path.join(os.path.expanduser('~'),'.bc_sync','page_sizes.json')
+DEFAULT_KEY_INDEX_CACHE = os.path.join(os.path.expanduser('~'),'.bc_sync','key_index')
+
 @dataclass
 class APIConfig:
 
@@ -16,6 +20,8 @@ class APIConfig:
     version : str
     client_id : str
     client_secret : str
+    page_size : Optional[int] = None
+    page_size_cache : Optional[str] = DEFAULT_PAGE_SIZE_CACHE
 
 
 @dataclass
@@ -25,6 +31,11 @@ class DatabaseConfig:
     password : str
     server : str
     database : str
+    pool_size : Optional[int] = None
+    pool_recycle : int = 1800
+    pool_pre_ping : bool = True
+    key_index_cache : Optional[str] = DEFAULT_KEY_INDEX_CACHE
+    backend : str = 'mssql'
 
 
 @dataclass
@@ -50,7 +61,9 @@ class Config:
             group = os.getenv('API_GROUP'),
             version = os.getenv('API_VERSION'),
             client_id = os.getenv('CLIENT_ID'),
-            client_secret = os.getenv('CLIENT_SECRET')
+            client_secret = os.getenv('CLIENT_SECRET'),
+            page_size = int(os.getenv('BC_PAGE_SIZE')) if os.getenv('BC_PAGE_SIZE') else None,
+            page_size_cache = os.getenv('BC_PAGE_SIZE_CACHE') or DEFAULT_PAGE_SIZE_CACHE
 
         )
 
@@ -59,7 +72,12 @@ class Config:
             username = os.getenv('SQL_USER'),
             password = os.getenv('SQL_PASSWORD'),
             server = os.getenv('SERVER'),
-            database = os.getenv('DATABASE')
+            database = os.getenv('DATABASE'),
+            pool_size = int(os.getenv('SQL_POOL_SIZE')) if os.getenv('SQL_POOL_SIZE') else None,
+            pool_recycle = int(os.getenv('SQL_POOL_RECYCLE') or 1800),
+            pool_pre_ping = (os.getenv('SQL_POOL_PRE_PING') or 'true').lower() in ('1','true','yes'),
+            key_index_cache = os.getenv('SQL_KEY_INDEX_CACHE') or DEFAULT_KEY_INDEX_CACHE,
+            backend = os.getenv('SQL_BACKEND') or 'mssql'
         )
 
         return cls(api=api_config, db=db_config)
@@ -83,7 +101,9 @@ class Config:
             group = block.group,
             version = block.version,
             client_id = block.client_id.get_secret_value(),
-            client_secret = block.client_secret.get_secret_value()
+            client_secret = block.client_secret.get_secret_value(),
+            page_size = block.page_size,
+            page_size_cache = block.page_size_cache or DEFAULT_PAGE_SIZE_CACHE
 
         )
 
@@ -92,7 +112,12 @@ class Config:
             username = block.username.get_secret_value(),
             password = block.password.get_secret_value(),
             server = block.server,
-            database = block.database
+            database = block.database,
+            pool_size = block.pool_size,
+            pool_recycle = block.pool_recycle,
+            pool_pre_ping = block.pool_pre_ping,
+            key_index_cache = block.key_index_cache or DEFAULT_KEY_INDEX_CACHE,
+            backend = block.backend
         )
 
         return cls(api=api_config, db=db_config)
@@ -115,10 +140,17 @@ class Config:
             version = os.getenv('API_VERSION'),
             client_id = os.getenv('CLIENT_ID'),
             client_secret = os.getenv('CLIENT_SECRET'),
+            page_size = os.getenv('BC_PAGE_SIZE') or None,
+            page_size_cache = os.getenv('BC_PAGE_SIZE_CACHE') or None,
             username = os.getenv('SQL_USER'),
             password = os.getenv('SQL_PASSWORD'),
             server = os.getenv('SERVER'),
-            database = os.getenv('DATABASE')
+            database = os.getenv('DATABASE'),
+            pool_size = os.getenv('SQL_POOL_SIZE') or None,
+            pool_recycle = os.getenv('SQL_POOL_RECYCLE') or 1800,
+            pool_pre_ping = (os.getenv('SQL_POOL_PRE_PING') or 'true').lower() in ('1','true','yes'),
+            key_index_cache = os.getenv('SQL_KEY_INDEX_CACHE') or None,
+            backend = os.getenv('SQL_BACKEND') or 'mssql'
         )
         valid_block_name = block_name.lower().replace('_','-')
         block.save(valid_block_name,overwrite=overwrite_block)
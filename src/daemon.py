@@ -0,0 +1,144 @@
+from main import sync_table, create_sync_resources
+from models.db_model import Tables
+from models.base import Base
+from models.tasks import get_models_to_sync
+from config.settings import Config
+from config.logging_config import setup_logging
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from typing import Optional, Dict, List, Type
+import threading
+import logging
+import random
+import signal
+import time
+import click
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+#sync interval in seconds of each entity, entities not listed use the default interval (reference data).
+DEFAULT_INTERVALS : Dict[str,int] = {
+    Tables.customerLedgerEntries.name : 120,
+    Tables.vendorLedgerEntries.name : 120,
+    Tables.salesInvoices.name : 300,
+    Tables.salesInvoiceLines.name : 300,
+    Tables.salesCreditMemos.name : 300,
+    Tables.salesCreditMemoLines.name : 300,
+    Tables.purchaseInvoices.name : 300,
+    Tables.purchaseInvoiceLines.name : 300,
+    Tables.purchaseCreditMemos.name : 300,
+    Tables.purchaseCreditMemoLines.name : 300,
+    Tables.purchaseOrders.name : 300,
+    Tables.purchaseOrderLines.name : 300,
+    Tables.purchaseReceipts.name : 300,
+    Tables.purchaseReceiptLines.name : 300,
+    Tables.customers.name : 900,
+    Tables.vendors.name : 900,
+    Tables.items.name : 900,
+    Tables.exchangeRates.name : 900,
+}
+DEFAULT_INTERVAL = 3600
+
+
+@dataclass
+class TableSchedule:
+    model : Type[Base]
+    interval : float
+    next_run : float = 0.0
+
+    def reschedule(self, jitter : float) -> None:
+        """Schedules the next run one interval after now, so runs missed while syncing or overdue are coalesced into one."""
+
+        self.next_run = time.monotonic() + self.interval * (1 + random.uniform(0, jitter))
+
+
+def build_schedules(models : List[Type[Base]], intervals : Dict[str,float], default_interval : float, jitter : float) -> List[TableSchedule]:
+    """Creates the schedule of each model, first runs are spread over the jitter window to avoid a burst at startup."""
+
+    schedules = []
+    for model in models:
+        interval = intervals.get(model.__name__, default_interval)
+        schedules.append(TableSchedule(model, interval, time.monotonic() + interval * random.uniform(0, jitter)))
+
+    return schedules
+
+
+def run_daemon(config : Config, intervals : Dict[str,float], default_interval : float = DEFAULT_INTERVAL, jitter : float = 0.1,
+               table_concurrency : int = 1, memory_budget_mb : Optional[int] = None, stop_event : Optional[threading.Event] = None) -> None:
+    """Syncs each model on its own interval, keeping the API client, its token and the engine pool warm between runs."""
+
+    stop_event = stop_event or threading.Event()
+    Session, api_client = create_sync_resources(config, table_concurrency)
+    schedules = build_schedules(get_models_to_sync(), intervals, default_interval, jitter)
+    running : Dict[Future,TableSchedule] = {}
+
+    def sync(model : Type[Base]) -> None:
+        with Session() as db:
+            sync_table.fn(model, api_client, db, memory_budget_mb)
+
+    logger.info(f'Daemon started, intervals (s) :\n {[(s.model.__tablename__, s.interval) for s in schedules]}')
+
+    with ThreadPoolExecutor(max_workers=table_concurrency) as executor:
+
+        while not stop_event.is_set():
+
+            now = time.monotonic()
+            busy = {schedule.model for schedule in running.values()}
+            due = sorted((s for s in schedules if s.next_run <= now and s.model not in busy), key=lambda s: s.next_run)
+
+            for schedule in due[:table_concurrency - len(running)]:
+                running[executor.submit(sync, schedule.model)] = schedule
+
+            busy = {schedule.model for schedule in running.values()}
+            idle = [s.next_run for s in schedules if s.model not in busy]
+            timeout = max(0.0, min(idle, default=now + default_interval) - time.monotonic())
+
+            if running:
+                done, _ = wait(list(running), timeout=min(timeout, 1.0), return_when=FIRST_COMPLETED)
+                for future in done:
+                    schedule = running.pop(future)
+                    if future.exception():
+                        logger.error(f'Sync of table {schedule.model.__tablename__} failed : {future.exception()}')
+                    schedule.reschedule(jitter)
+            else:
+                stop_event.wait(min(timeout, 1.0))
+
+        logger.info('Stopping daemon, waiting for running table syncs to finish.')
+
+
+def parse_intervals(values : List[str]) -> Dict[str,float]:
+
+    intervals = dict(DEFAULT_INTERVALS)
+    for value in values:
+        name, _, seconds = value.partition('=')
+        if name not in Tables.__members__:
+            raise click.BadParameter(f'{name} is not a table, valid values : {list(Tables.__members__)}')
+        intervals[name] = float(seconds)
+
+    return intervals
+
+
+@click.command('daemon')
+@click.option('--config_block', default=None, help='Prefect configuration block, environment variables are used if omitted.')
+@click.option('--queue_logging', is_flag=True, help='Write logs as JSON lines from a listener thread, sampling the request logs.')
+@click.option('--interval', 'interval_overrides', multiple=True, help='Sync interval of a table in seconds, e.g. --interval customerLedgerEntries=120')
+@click.option('--default_interval', default=DEFAULT_INTERVAL, type=float, help='Sync interval in seconds of the tables without a specific interval.')
+@click.option('--jitter', default=0.1, type=float, help='Random delay added to each interval, as a fraction of it.')
+@click.option('--table_concurrency', default=1, type=int)
+@click.option('--memory_budget_mb', default=None, type=int)
+def main(config_block : Optional[str], queue_logging : bool, interval_overrides : List[str], default_interval : float, jitter : float,
+         table_concurrency : int, memory_budget_mb : Optional[int]):
+
+    setup_logging(queued=queue_logging)
+    config = Config.load_from_block(config_block) if config_block else Config.load_from_env()
+
+    stop_event = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop_event.set())
+
+    run_daemon(config, parse_intervals(interval_overrides), default_interval, jitter, table_concurrency, memory_budget_mb, stop_event)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import threading
+import tracemalloc
+import logging
+import time
+import sys
+import os
+import re
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+#profiles are written next to the learned page sizes, outside the working directory cloned on every deployment run.
+DEFAULT_PROFILE_DIR = os.path.join(os.path.expanduser('~'),'.bc_sync','profiles')
+SAMPLE_INTERVAL = 0.005
+TOP_N = 25
+
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+#whether tracemalloc was started by a profiler, tracing started by someone else is left running
+_tracemalloc_owned = False
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__','?')}.{getattr(code,'co_qualname',code.co_name)}"
+
+
+class TableProfiler:
+    """Sampling profiler of the thread entering it and of the helper threads named after the profiled table
+       (e.g. fetch-<name>-created, writer-<name>_0, lease-<name>), with tracemalloc allocation tracking.
+       Samples are wall clock, a helper thread waiting on a queue or a socket is sampled in its waiting frame.
+       On exit writes the sampled stacks in folded format (input of flamegraph.pl and speedscope) to output_dir
+       and builds a markdown report of the hot functions and allocation sites.
+       tracemalloc is process wide, allocations of tables synced concurrently are included in the report."""
+
+    def __init__(self, name : str, output_dir : Optional[str] = DEFAULT_PROFILE_DIR, interval : float = SAMPLE_INTERVAL, top_n : int = TOP_N):
+
+        self.name = name
+        self.output_dir = output_dir
+        self.interval = interval
+        self.top_n = top_n
+        self.stacks : Counter = Counter()
+        self.samples = 0
+        self.elapsed = 0.0
+        self.peak_memory = 0
+        self.allocations : List[tracemalloc.StatisticDiff] = []
+        self.folded_path : Optional[str] = None
+        self._stop = threading.Event()
+        self._thread : Optional[threading.Thread] = None
+        self._target = None
+        self._helpers = re.compile(rf'\w+-{re.escape(name)}(-\w+|_\d+)?')
+        self._started = 0.0
+        self._snapshot : Optional[tracemalloc.Snapshot] = None
+
+    def __enter__(self) -> 'TableProfiler':
+
+        global _tracemalloc_users, _tracemalloc_owned
+        with _tracemalloc_lock:
+            if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _tracemalloc_owned = True
+            _tracemalloc_users += 1
+            tracemalloc.reset_peak()
+        self._snapshot = tracemalloc.take_snapshot()
+
+        self._target = threading.get_ident()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample, name=f'profiler-{self.name}', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+
+        global _tracemalloc_users, _tracemalloc_owned
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self._started
+
+        snapshot = tracemalloc.take_snapshot()
+        self.peak_memory = tracemalloc.get_traced_memory()[1]
+        with _tracemalloc_lock:
+            _tracemalloc_users -= 1
+            if _tracemalloc_users == 0 and _tracemalloc_owned:
+                tracemalloc.stop()
+                _tracemalloc_owned = False
+
+        ignored = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        self.allocations = snapshot.filter_traces(ignored).compare_to(self._snapshot.filter_traces(ignored), 'lineno')[:self.top_n]
+        self._snapshot = None
+
+        try:
+            self.folded_path = self.write_folded()
+        except OSError as e:
+            logger.warning(f'Unable to write the profile of {self.name} at {self.output_dir} : {e}')
+
+    def _sample(self) -> None:
+
+        while not self._stop.wait(self.interval):
+            targets = {self._target} | {thread.ident for thread in threading.enumerate()
+                                        if self._helpers.fullmatch(thread.name) and thread is not self._thread}
+            for ident, frame in sys._current_frames().items():
+                if ident not in targets:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if stack:
+                    self.stacks[tuple(reversed(stack))] += 1
+                    self.samples += 1
+
+    def hot_functions(self) -> Tuple[List[Tuple[str,int]],List[Tuple[str,int]]]:
+        """Returns the top functions by self samples (leaf of the stack) and by cumulative samples (anywhere in the stack)."""
+
+        own : Dict[str,int] = Counter()
+        cumulative : Dict[str,int] = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for label in set(stack):
+                cumulative[label] += count
+
+        return own.most_common(self.top_n), cumulative.most_common(self.top_n)
+
+    def write_folded(self) -> Optional[str]:
+
+        if not self.output_dir or not self.stacks:
+            return None
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{self.name}-{datetime.now().strftime('%Y%m%dT%H%M%S')}.folded")
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{';'.join(stack)} {count}\n")
+
+        return path
+
+    def report(self) -> str:
+        """Markdown report of the profile, published as a flow artifact."""
+
+        own, cumulative = self.hot_functions()
+        pct = lambda count: f'{100 * count / max(self.samples, 1):.1f}%'
+
+        lines = [f'# Perfil de sincronizacion : {self.name}', '',
+                 f'- duracion : {self.elapsed:.1f} s, muestras : {self.samples} cada {self.interval * 1000:.0f} ms',
+                 f'- memoria pico (tracemalloc) : {self.peak_memory / 1024 / 1024:.1f} MB']
+        if self.folded_path:
+            lines.append(f'- flame graph (folded stacks) : `{self.folded_path}`')
+
+        lines += ['', '## Funciones con mas tiempo propio', '', '| funcion | muestras | % |', '|---|---|---|']
+        lines += [f'| `{label}` | {count} | {pct(count)} |' for label, count in own]
+        lines += ['', '## Funciones con mas tiempo acumulado', '', '| funcion | muestras | % |', '|---|---|---|']
+        lines += [f'| `{label}` | {count} | {pct(count)} |' for label, count in cumulative]
+        lines += ['', '## Sitios de asignacion de memoria', '', '| linea | KB | asignaciones |', '|---|---|---|']
+        lines += [f'| `{stat.traceback[0].filename}:{stat.traceback[0].lineno}` | {stat.size_diff / 1024:.1f} | {stat.count_diff} |'
+                  for stat in self.allocations]
+
+        return '\n'.join(lines)
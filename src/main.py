@@ -2,94 +2,317 @@ from business_central_api.client import BusinessCentralAPIClient
 from sqlalchemy.orm import sessionmaker, Session
 from models.db_model import Tables
 from models.base import Base
-from models.tasks import get_models_to_sync, create_db_engine, filter_duplicates_by_index
+from models.tasks import get_models_to_sync, get_db_engine, filter_duplicates_by_index, probe_changes, order_by_volume
 from models.exceptions import SyncTableError
+from models.record_store import RecordStore
+from models.key_index import get_key_index
+from models.writer_pool import ParallelWriter
+from models.aggregates import AggregateMaintainer, rebuild_aggregates
+from models.transform import TransformPool
+from models.backends import get_backend
+from models.lease import TableLease
+from models.storage import write_batch_rows, rebatch
+from models.pipeline import PagePrefetcher
+from models.completions import get_completions, is_completed, record_completion
+from diagnostics.profiler import TableProfiler, DEFAULT_PROFILE_DIR
 from prefect import task, flow
-from prefect.artifacts import create_table_artifact
+from prefect.artifacts import create_table_artifact, create_markdown_artifact
 from prefect.logging import get_run_logger
+from prefect.context import FlowRunContext, TaskRunContext
+from prefect.exceptions import MissingContextError
 from config.settings import Config
-from typing import Optional, List, Type
+from config.logging_config import enable_queue_logging, log_sample_summary
+from typing import Optional, List, Type, Dict, Any
+import logging
+import re
+
+#seconds of a round of checks of the running table syncs while waiting for a free slot.
+WAIT_POLL_SECONDS = 1.0
+
+
+def get_logger() -> logging.Logger:
+    """Returns the prefect run logger, or a module logger when running outside of a flow (e.g. in daemon mode)."""
+
+    try:
+        return get_run_logger()
+    except MissingContextError:
+        return logging.getLogger(__name__)
+
+def publish_table_artifact(table : List[Dict[str,Any]], key : str) -> None:
+    """Creates a table artifact when running inside a flow or task run."""
+
+    if FlowRunContext.get() or TaskRunContext.get():
+        create_table_artifact(table, key)
+
+def publish_markdown_artifact(markdown : str, key : str) -> None:
+    """Creates a markdown artifact when running inside a flow or task run, keys only allow lowercase letters, numbers and dashes."""
+
+    if FlowRunContext.get() or TaskRunContext.get():
+        create_markdown_artifact(markdown, re.sub(r'[^a-z0-9-]+', '-', key.lower()))
+
+
+def create_sync_resources(config : Config, table_concurrency : int = 1):
+    """Returns the Session factory, bound to the pooled engine of the target database, and the API client.
+       Sessions carry the key index cache directory in their info dictionary."""
+
+    engine = get_db_engine(config.db.server,config.db.database,config.db.username,config.db.password,
+                           concurrency=table_concurrency,pool_size=config.db.pool_size,
+                           pool_pre_ping=config.db.pool_pre_ping,pool_recycle=config.db.pool_recycle,backend=config.db.backend)
+    api_client = BusinessCentralAPIClient(config.api.tenant_id,config.api.environment,config.api.publisher,
+                                        config.api.group,config.api.version,config.api.company_id,
+                                        config.api.client_id,config.api.client_secret,
+                                        page_size=config.api.page_size,page_size_cache=config.api.page_size_cache)
+
+    return sessionmaker(engine,info={'key_index_cache' : config.db.key_index_cache}), api_client
 
 
 @task(task_run_name = 'sincronizar-tabla-{model.__tablename__}',log_prints=True)
-def sync_table(model : Type[Base], api_client : BusinessCentralAPIClient, db: Session):
-    """Syncs a specific SQL model with its API endpoint, by inserting/updating records created and modified after last sync."""
+def sync_table(model : Type[Base], api_client : BusinessCentralAPIClient, db: Session, memory_budget_mb : Optional[int] = None, chunk_size : int = 5000,
+               expected_changes : Optional[int] = None, profile : bool = False, profile_dir : Optional[str] = DEFAULT_PROFILE_DIR,
+               db_writers : int = 1, transform_workers : int = 0, lease_ttl : int = 300, lease_wait : int = 0,
+               prefetch_pages : int = 4, run_key : Optional[str] = None, probe : bool = True):
+    """Syncs a specific SQL model with its API endpoint, by inserting/updating records created and modified after last sync.
+       New and modified records are fetched in background threads up to prefetch_pages pages ahead, while the fetched pages are written.
+       Fetched records are buffered up to memory_budget_mb (split between new and modified records) and spilled to disk above it.
+       The table is skipped when the change probe, or the expected_changes already probed by the flow, finds no changes.
+       Without expected_changes the table is probed, unless probe is False because the flow already tried and its probe failed.
+       With profile set the sync runs under a sampling profiler and tracemalloc, its report is published as an artifact.
+       Deltas above chunk_size, or of unknown size when the change probe fails, are staged through db_writers connections
+       in parallel when db_writers is above one, then merged into the table by the sync session.
+       Aggregates fed by the model (models.aggregates) are updated with the deltas in the same transaction.
+       With transform_workers above zero, pages are decoded and normalized in that many worker processes.
+       The table is synced under a lease of lease_ttl seconds (models.lease), a table leased by another run is waited on
+       for up to lease_wait seconds and skipped afterwards.
+       In the queue logging mode the sampled request logs of the table are summarized in a single record at the end.
+       With a run_key, a successful sync records the timestamps range it reached (models.completions), so the run can be resumed."""
+
+    lease = TableLease(db.get_bind(), api_client.company_id, model.__tablename__, lease_ttl)
+    if not lease.acquire(lease_wait):
+        owner, expires_at = lease.holder() or (None, None)
+        get_logger().warning(f'La tabla {model.__tablename__} esta siendo sincronizada por otra ejecucion ({owner}, vence {expires_at}), se omite la tabla.')
+        return
+
+    try:
+        with lease:
+            start = model.get_sync_timestamps(db) if run_key else None
+
+            if not profile:
+                _sync_table(model, api_client, db, memory_budget_mb, chunk_size, expected_changes, db_writers, transform_workers, lease, prefetch_pages, probe)
+            else:
+                profiler = TableProfiler(model.__tablename__, profile_dir)
+                try:
+                    with profiler:
+                        _sync_table(model, api_client, db, memory_budget_mb, chunk_size, expected_changes, db_writers, transform_workers, lease, prefetch_pages, probe)
+                finally:
+                    get_logger().info(f'Perfil de la tabla {model.__tablename__} guardado en : {profiler.folded_path}')
+                    publish_markdown_artifact(profiler.report(), f'perfil-{model.__tablename__}')
+
+            if run_key:
+                try:
+                    record_completion(db, run_key, api_client.company_id, model, start, model.get_sync_timestamps(db))
+                except Exception as e:
+                    db.rollback()
+                    get_logger().warning(f'No se pudo registrar la sincronizacion de la tabla {model.__tablename__}, se repetira al reanudar la ejecucion : {e}')
+    finally:
+        log_sample_summary(get_logger(), model.__name__, f'Peticiones a la entidad {model.__name__} durante la sincronizacion de la tabla {model.__tablename__}')
+
+
+def _sync_table(model : Type[Base], api_client : BusinessCentralAPIClient, db: Session, memory_budget_mb : Optional[int], chunk_size : int,
+                expected_changes : Optional[int], db_writers : int, transform_workers : int = 0, lease : Optional[TableLease] = None,
+                prefetch_pages : int = 4, probe : bool = True):
     
-    logger = get_run_logger()
+    logger = get_logger()
 
     table_name = model.__tablename__
     api_endpoint = model.__name__
     api_fields = model.__mapper__.c.keys()
     api_fields.remove('id')
+    update_keys = model.get_update_keys()
+    memory_budget = memory_budget_mb * 1024 * 1024 // 2 if memory_budget_mb else None
 
+    backend = get_backend(db.get_bind().dialect.name)
+    backend.prepare_table(model, db.get_bind())
     timestamps = model.get_sync_timestamps(db)
 
+    #pages are fetched raw and transformed in worker processes, or decoded and normalized in this process
+    pool = TransformPool(model, transform_workers, backend.parse_timestamps) if transform_workers > 0 else None
+    def fetch_pages(**params):
+        if pool:
+            return pool.imap(api_client.iter_raw_with_params(endpoint = api_endpoint, **params))
+        return api_client.iter_with_params(endpoint = api_endpoint, **params)
+
     logger.info(f'Iniciando proceso de sincronizacion.\n tabla : {table_name}')
 
-    new_records = api_client.get_with_params(
-        endpoint = api_endpoint,
-        last_created_at = timestamps['last_created'],
-        select = api_fields)
+    #empty table: a single ordered fetch (ordered windows for keyset cursors) loaded page by page, committing after each page
+    if timestamps['last_created'] is None and timestamps['last_modified'] is None:
+        logger.info(f'La tabla {table_name} esta vacia, iniciando carga inicial.')
+        pages = model.__cursor__.initial_pages(model, fetch_pages, api_fields)
+        try:
+            loaded = model.load_initial_records(pages, db)
+            rebuild_aggregates(model, db)
+            if lease:
+                lease.ensure_held()
+            db.commit()
+        except Exception as e:
+            raise SyncTableError(f'No se pudo realizar la carga inicial de la tabla {table_name} debido al siguiente error : {e}')
+        logger.info(f'carga inicial finalizada correctamente, {loaded} registros insertados en la tabla {table_name}.')
+        return
+
+    if expected_changes is None and probe:
+        expected_changes = probe_changes(model, api_client, timestamps)
+
+    if expected_changes == 0:
+        logger.info(f'No se encontraron cambios en la entidad {api_endpoint}, se omite la tabla {table_name}.')
+        return
 
-    modified_records = api_client.get_with_params(
-        endpoint = api_endpoint,
+    key_index = get_key_index(model, db, db.info.get('key_index_cache'))
+    aggregates = AggregateMaintainer.for_model(model, db)
+
+    #large deltas are staged by db_writers sessions in parallel and merged into the table by this session,
+    #a failed probe leaves the volume unknown and is treated as a large delta, like the flow schedules it first
+    writer = None
+    if db_writers > 1 and (expected_changes is None or expected_changes > chunk_size):
+        logger.info(f'Escritura paralela de la tabla {table_name} con {db_writers} conexiones.')
+        writer = ParallelWriter(model, db, db_writers, key_index)
+
+    #both fetches run in background threads up to prefetch_pages pages ahead, while this thread writes the pages already fetched
+    created_pages = PagePrefetcher(model.__cursor__.new_pages(model, fetch_pages, db, timestamps, api_fields),
+                                   prefetch_pages, f'fetch-{table_name}-created')
+    modified_pages = PagePrefetcher(fetch_pages(
         last_modified_at = timestamps['last_modified'],
-        select = api_fields)
+        select = api_fields), prefetch_pages, f'fetch-{table_name}-modified')
 
-    #remove new records from list of modified records
-    modified_records = filter_duplicates_by_index(model,modified_records,new_records)
-    
-    #if the response returns records, attempt to insert and/or update
-    try:
-        if new_records or modified_records:
+    with RecordStore(update_keys, memory_budget) as new_records, RecordStore(update_keys, memory_budget) as modified_records, created_pages, modified_pages:
+
+        def collect(pages, store, exclude = None):
+            for page in pages:
+                #modified pages are only read once every new record was written, so new records are removed from each of them
+                if exclude is not None:
+                    page = filter_duplicates_by_index(model, page, exclude)
+                store.extend(page)
+                yield page
+
+        try:
+            chunks = rebatch(collect(created_pages, new_records), write_batch_rows(model, chunk_size))
+            if aggregates:
+                chunks = aggregates.tap_inserts(chunks, db)
+            if writer:
+                writer.insert(chunks)
+            else:
+                for chunk in chunks:
+                    model.insert_records(chunk, db, key_index)
             if new_records:
-                logger.info(f'{len(new_records)} registros nuevos encontrados para insertar en la tabla {table_name}')
-                model.insert_records(new_records, db)
-                logger.info('operacion de insercion finalizada correctamente.')
-                create_table_artifact(new_records, 'registros-nuevos')
+                logger.info(f'{len(new_records)} registros nuevos insertados en la tabla {table_name}')
+                publish_table_artifact(new_records.preview(), 'registros-nuevos')
 
+            #aggregates read the values before update of each chunk, so chunks are tapped before being written
+            chunks = rebatch(collect(modified_pages, modified_records, new_records), chunk_size)
+            if aggregates:
+                chunks = aggregates.tap_updates(chunks, db)
+            if writer:
+                writer.update(chunks)
+            else:
+                for chunk in chunks:
+                    model.update_records(chunk, db, key_index)
             if modified_records:
-                logger.info(f'{len(modified_records)} registros modificados encontrados para actualizar en la tabla {table_name}')
-                model.update_records(modified_records, db)
-                logger.info('operacion de actualizacion finalizada correctamente')
-                create_table_artifact(modified_records,'registros-actualizados')
-                
-            db.commit()
-        
-        else:
-            logger.info(f'No se encontraron registros para actualizar o modificar en la tabla {table_name}.')
+                logger.info(f'{len(modified_records)} registros modificados actualizados en la tabla {table_name}')
+                publish_table_artifact(modified_records.preview(),'registros-actualizados')
 
-    except Exception as e:
-        db.rollback()
-        raise SyncTableError(f'No se pudo actualizar la tabla {table_name} debido al siguiente error : {e}')
+            if new_records or modified_records:
+                if writer:
+                    writer.merge()
+                if lease:
+                    lease.ensure_held()
+                db.commit()
+                key_index.commit()
+
+            else:
+                logger.info(f'No se encontraron registros para actualizar o modificar en la tabla {table_name}.')
+
+        except Exception as e:
+            if writer:
+                writer.rollback()
+            db.rollback()
+            key_index.rollback()
+            raise SyncTableError(f'No se pudo actualizar la tabla {table_name} debido al siguiente error : {e}')
+
+        finally:
+            if writer:
+                writer.close()
     
 
+def wait_first_completed(futures : List[Any]) -> int:
+    """Waits until any of the submitted futures reaches a final state, returns its position."""
+
+    while True:
+        for position, future in enumerate(futures):
+            if future.wait(timeout=WAIT_POLL_SECONDS / len(futures)) is not None:
+                return position
+
+
 @flow(name='sincronizar_datos_bc',log_prints=True)
-def main(config_block : Optional[str] = None, table_filter : Optional[List[Tables]] = None):
-    """main function, performs the sync_table function for each model."""
+def main(config_block : Optional[str] = None, table_filter : Optional[List[Tables]] = None, table_concurrency : int = 1,
+         memory_budget_mb : Optional[int] = None, profile : Optional[List[Tables]] = None, profile_dir : Optional[str] = DEFAULT_PROFILE_DIR,
+         db_writers : int = 1, transform_workers : int = 0, lease_ttl : int = 300, lease_wait : int = 0, prefetch_pages : int = 4,
+         queue_logging : bool = False, resume_run : Optional[str] = None):
+    """main function, performs the sync_table function for each model, running up to table_concurrency tables at a time,
+       each writing large deltas through up to db_writers connections.
+       With transform_workers above zero, the pages of each table are decoded and normalized by its own TransformPool,
+       whose worker processes are started once per process and reused by every table.
+       Tables still leased by an overlapping run are waited on for up to lease_wait seconds and skipped afterwards.
+       The tables listed in profile are synced under the profiler, writing their flame graph stacks to profile_dir.
+       With queue_logging set, module logs are written by a listener thread as JSON lines and request logs are sampled.
+       Tables completed by this flow run, or by the run id given in resume_run, are skipped while their sync timestamps did not move,
+       so retries and resumed runs only sync the failed and remaining tables."""
 
     logger = get_run_logger()
+    if queue_logging:
+        enable_queue_logging()
 
     try:
         #load config from prefect block on prod, from environment vars on local:
         config = Config.load_from_block(config_block) if config_block else Config.load_from_env()
 
         #initialize Engine, Session factory and API client:
-        engine = create_db_engine(config.db.server,config.db.database,config.db.username,config.db.password)
-        Session = sessionmaker(engine)
-        api_client = BusinessCentralAPIClient(config.api.tenant_id,config.api.environment,config.api.publisher,
-                                            config.api.group,config.api.version,config.api.company_id,
-                                            config.api.client_id,config.api.client_secret)       
+        Session, api_client = create_sync_resources(config,table_concurrency * (db_writers + 1 if db_writers > 1 else 1))
     except Exception as e:
         logger.critical(f'No se puede ejecutar el flujo debido a un error critico.\n {e}')
         raise 
         
     models = get_models_to_sync(table_filter)
+    profiled = {tbl.name for tbl in profile or []}
+
+    run_key = resume_run or str(FlowRunContext.get().flow_run.id)
+
+    #probe each table for changes, tables completed by the run or unchanged are skipped and the largest deltas start first:
+    with Session() as db:
+        completions = get_completions(db,run_key,api_client.company_id)
+        timestamps = {tbl : tbl.get_sync_timestamps(db) for tbl in models}
+    completed = [tbl for tbl in models if is_completed(completions,tbl,timestamps[tbl])]
+    if completed:
+        logger.info(f'Tablas ya sincronizadas por la ejecucion {run_key}, se omiten :\n {[tbl.__tablename__ for tbl in completed]}')
+    models = [tbl for tbl in models if tbl not in completed]
+    volumes = {tbl : probe_changes(tbl,api_client,timestamps[tbl]) for tbl in models}
+    models = order_by_volume(models,volumes)
+    logger.info(f'Tablas con cambios, en orden de sincronizacion :\n {[(tbl.__tablename__,volumes[tbl]) for tbl in models]}')
     
-    #for each model, apply sync_table function:
+    #for each model, apply sync_table function, each running task holds its own session:
+    running = []
     for tbl in models:
-        with Session() as db:
-            sync_table.submit(tbl,api_client,db).wait()
+        db = Session()
+        running.append((sync_table.submit(tbl,api_client,db,memory_budget_mb,expected_changes=volumes[tbl],
+                                         profile=tbl.__name__ in profiled,profile_dir=profile_dir,db_writers=db_writers,
+                                         transform_workers=transform_workers,lease_ttl=lease_ttl,lease_wait=lease_wait,
+                                         prefetch_pages=prefetch_pages,run_key=run_key,probe=False),db))
+
+        #a slot is freed by whichever table finishes first, a slow table does not hold back the rest
+        if len(running) >= table_concurrency:
+            _, db = running.pop(wait_first_completed([future for future, _ in running]))
+            db.close()
+
+    for future, db in running:
+        future.wait()
+        db.close()
 
 
 if __name__ == '__main__':
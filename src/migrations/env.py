@@ -0,0 +1,73 @@
+from alembic import context
+from sqlalchemy import create_engine, pool
+from logging.config import fileConfig
+from models.base import Base
+from models import db_model, aggregates, lease, completions
+from models.tasks import get_connection_url
+from models.types import CustomString
+
+#Schema migrations for the sync target, generated from the Base subclasses declared in models.db_model.
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def get_url() -> str:
+    """Resolves the target url from -x url=..., -x config_block=... or the environment variables used by main."""
+
+    x_args = context.get_x_argument(as_dictionary=True)
+
+    if 'url' in x_args:
+        return x_args['url']
+
+    from config.settings import Config
+    settings = Config.load_from_block(x_args['config_block']) if 'config_block' in x_args else Config.load_from_env()
+
+    return get_connection_url(settings.db.server,settings.db.database,settings.db.username,settings.db.password,settings.db.backend)
+
+
+def render_item(type_, obj, autogen_context):
+    """Renders model specific column types as their sqlalchemy base type, so revisions do not import the models."""
+
+    if type_ == 'type' and isinstance(obj, CustomString):
+        return f'sa.String(length={obj.length})'
+
+    return False
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Columnstore indexes are created by the hand written revision 0005, which mirrors the __storage__ options of the models,
+       and the staging tables of models.writer_pool only exist while a sync runs."""
+
+    if type_ == 'table' and reflected and compare_to is None and name and name.startswith('stg_'):
+        return False
+    return not (type_ == 'index' and reflected and compare_to is None and name and name.startswith('csi_'))
+
+
+def run_migrations_offline() -> None:
+
+    context.configure(url=get_url(), target_metadata=target_metadata, literal_binds=True, compare_type=True, render_item=render_item, include_object=include_object)
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+
+    engine = create_engine(get_url(), poolclass=pool.NullPool)
+
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata, compare_type=True, render_item=render_item, include_object=include_object)
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,485 @@
+"""initial schema
+
+Tables as declared by the models before migrations were managed. Existing databases adopt the
+migration history with: alembic stamp 0001, their length-less string columns are bounded by 0001a.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('country',
+    sa.Column('country_code', sa.String(length=10), nullable=False),
+    sa.Column('country_name', sa.String(length=100), nullable=True),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('country_code')
+    )
+    op.create_table('currency',
+    sa.Column('currency_code', sa.String(length=10), nullable=False),
+    sa.Column('currency_name', sa.String(length=100), nullable=True),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('currency_code')
+    )
+    op.create_table('customer',
+    sa.Column('customer_code', sa.String(length=20), nullable=False),
+    sa.Column('customer_name', sa.String(length=100), nullable=True),
+    sa.Column('contact_code', sa.String(length=20), nullable=True),
+    sa.Column('customer_posting_group_code', sa.String(length=20), nullable=True),
+    sa.Column('customer_price_group_code', sa.String(length=20), nullable=True),
+    sa.Column('payment_terms_code', sa.String(length=20), nullable=True),
+    sa.Column('country_code', sa.String(length=10), nullable=True),
+    sa.Column('location_code', sa.String(length=20), nullable=True),
+    sa.Column('salesperson_code', sa.String(length=20), nullable=True),
+    sa.Column('rfc_code', sa.String(length=13), nullable=True),
+    sa.Column('is_blocked', sa.String(length=100), nullable=True),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('customer_code')
+    )
+    op.create_table('customer_ledger',
+    sa.Column('entry_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('posting_date', sa.Date(), nullable=False),
+    sa.Column('document_date', sa.Date(), nullable=False),
+    sa.Column('document_type', sa.String(length=100), nullable=True),
+    sa.Column('document_no', sa.String(length=25), nullable=False),
+    sa.Column('customer_code', sa.String(length=20), nullable=False),
+    sa.Column('currency_code', sa.String(length=10), nullable=True),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('remaining_amount', sa.Float(), nullable=False),
+    sa.Column('is_positive', sa.Boolean(), nullable=False),
+    sa.Column('transaction_no', sa.Integer(), nullable=False),
+    sa.Column('external_document_no', sa.String(length=35), nullable=True),
+    sa.Column('apply_to_external_document_no', sa.String(length=35), nullable=True),
+    sa.Column('closed_by_entry', sa.Integer(), nullable=False),
+    sa.Column('is_open', sa.Boolean(), nullable=False),
+    sa.Column('is_reversed', sa.Boolean(), nullable=False),
+    sa.Column('reversed_by_entry', sa.Integer(), nullable=False),
+    sa.Column('reversed_entry', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('entry_id')
+    )
+    op.create_table('customer_posting_group',
+    sa.Column('customer_posting_group_code', sa.String(length=20), nullable=False),
+    sa.Column('customer_posting_group_name', sa.String(length=100), nullable=True),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('customer_posting_group_code')
+    )
+    op.create_table('customer_price_group',
+    sa.Column('customer_price_group_code', sa.String(length=10), nullable=False),
+    sa.Column('customer_price_group_name', sa.String(length=100), nullable=True),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('customer_price_group_code')
+    )
+    op.create_table('exchange_rate',
+    sa.Column('starting_date', sa.Date(), nullable=False),
+    sa.Column('currency_code', sa.String(length=10), nullable=False),
+    sa.Column('related_currency_code', sa.String(length=10), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('inventory_posting_group',
+    sa.Column('inventory_posting_group_code', sa.String(length=20), nullable=False),
+    sa.Column('inventory_posting_group_name', sa.String(length=100), nullable=True),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('inventory_posting_group_code')
+    )
+    op.create_table('item',
+    sa.Column('item_code', sa.String(length=20), nullable=False),
+    sa.Column('item_name', sa.String(length=100), nullable=True),
+    sa.Column('measure_unit', sa.String(length=50), nullable=True),
+    sa.Column('item_type', sa.String(length=100), nullable=True),
+    sa.Column('inventory_posting_group_code', sa.String(length=20), nullable=True),
+    sa.Column('item_category_code', sa.String(length=20), nullable=True),
+    sa.Column('unit_price', sa.Float(), nullable=True),
+    sa.Column('unit_cost', sa.Float(), nullable=True),
+    sa.Column('gross_weight', sa.Float(), nullable=True),
+    sa.Column('net_weight', sa.Float(), nullable=True),
+    sa.Column('is_blocked', sa.Boolean(), nullable=True),
+    sa.Column('sales_blocked', sa.Boolean(), nullable=True),
+    sa.Column('purchase_blocked', sa.Boolean(), nullable=True),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('item_code')
+    )
+    op.create_table('item_category',
+    sa.Column('item_category_code', sa.String(length=20), nullable=False),
+    sa.Column('item_category_name', sa.String(length=100), nullable=True),
+    sa.Column('has_children', sa.Boolean(), nullable=True),
+    sa.Column('parent_category', sa.String(length=100), nullable=True),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('item_category_code')
+    )
+    op.create_table('location',
+    sa.Column('location_code', sa.String(length=20), nullable=False),
+    sa.Column('location_name', sa.String(length=100), nullable=True),
+    sa.Column('country_code', sa.String(length=10), nullable=True),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('location_code')
+    )
+    op.create_table('payment_method',
+    sa.Column('payment_method_code', sa.String(length=20), nullable=False),
+    sa.Column('payment_method_name', sa.String(length=100), nullable=True),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('payment_method_code')
+    )
+    op.create_table('payment_terms',
+    sa.Column('payment_terms_code', sa.String(length=10), nullable=False),
+    sa.Column('payment_terms_name', sa.String(length=100), nullable=True),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('payment_terms_code')
+    )
+    op.create_table('purchase_cr_memo',
+    sa.Column('document_no', sa.String(length=25), nullable=False),
+    sa.Column('entry_id', sa.Integer(), nullable=False),
+    sa.Column('posting_date', sa.Date(), nullable=False),
+    sa.Column('document_date', sa.Date(), nullable=False),
+    sa.Column('vendor_code', sa.String(length=20), nullable=False),
+    sa.Column('payment_method_code', sa.String(length=20), nullable=True),
+    sa.Column('currency_code', sa.String(length=10), nullable=True),
+    sa.Column('purchaser_code', sa.String(length=20), nullable=True),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('amount_with_vat', sa.Float(), nullable=False),
+    sa.Column('return_order_no', sa.String(length=25), nullable=True),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('document_no')
+    )
+    op.create_table('purchase_cr_memo_line',
+    sa.Column('document_no', sa.String(length=25), nullable=False),
+    sa.Column('line_no', sa.Integer(), nullable=False),
+    sa.Column('item_type', sa.String(length=100), nullable=True),
+    sa.Column('item_code', sa.String(length=20), nullable=True),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('unit_cost', sa.Float(), nullable=False),
+    sa.Column('discount_percentage', sa.Float(), nullable=False),
+    sa.Column('discount_amount', sa.Float(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('amount_with_vat', sa.Float(), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('purchase_invoice',
+    sa.Column('document_no', sa.String(length=25), nullable=False),
+    sa.Column('entry_id', sa.Integer(), nullable=False),
+    sa.Column('posting_date', sa.Date(), nullable=False),
+    sa.Column('document_date', sa.Date(), nullable=False),
+    sa.Column('vendor_code', sa.String(length=20), nullable=False),
+    sa.Column('payment_method_code', sa.String(length=20), nullable=True),
+    sa.Column('currency_code', sa.String(length=10), nullable=True),
+    sa.Column('purchaser_code', sa.String(length=20), nullable=True),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('amount_with_vat', sa.Float(), nullable=False),
+    sa.Column('order_no', sa.String(length=25), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('document_no')
+    )
+    op.create_table('purchase_invoice_line',
+    sa.Column('document_no', sa.String(length=25), nullable=False),
+    sa.Column('line_no', sa.Integer(), nullable=False),
+    sa.Column('item_type', sa.String(length=100), nullable=True),
+    sa.Column('item_code', sa.String(length=20), nullable=True),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('unit_cost', sa.Float(), nullable=False),
+    sa.Column('discount_percentage', sa.Float(), nullable=False),
+    sa.Column('discount_amount', sa.Float(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('amount_with_vat', sa.Float(), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('purchase_order',
+    sa.Column('document_no', sa.String(length=25), nullable=False),
+    sa.Column('document_type', sa.String(length=100), nullable=False),
+    sa.Column('document_status', sa.String(length=25), nullable=True),
+    sa.Column('posting_date', sa.Date(), nullable=False),
+    sa.Column('document_date', sa.Date(), nullable=False),
+    sa.Column('vendor_code', sa.String(length=20), nullable=False),
+    sa.Column('payment_method_code', sa.String(length=20), nullable=True),
+    sa.Column('currency_code', sa.String(length=10), nullable=True),
+    sa.Column('purchaser_code', sa.String(length=20), nullable=True),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('amount_with_vat', sa.Float(), nullable=False),
+    sa.Column('is_partially_invoiced', sa.Boolean(), nullable=False),
+    sa.Column('is_completely_received', sa.Boolean(), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('purchase_order_line',
+    sa.Column('document_no', sa.String(length=25), nullable=False),
+    sa.Column('line_no', sa.Integer(), nullable=False),
+    sa.Column('item_type', sa.String(length=100), nullable=True),
+    sa.Column('item_code', sa.String(length=20), nullable=True),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('unit_cost', sa.Float(), nullable=False),
+    sa.Column('discount_percentage', sa.Float(), nullable=False),
+    sa.Column('discount_amount', sa.Float(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('amount_with_vat', sa.Float(), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('purchase_receipt',
+    sa.Column('document_no', sa.String(length=25), nullable=False),
+    sa.Column('posting_date', sa.Date(), nullable=False),
+    sa.Column('document_date', sa.Date(), nullable=False),
+    sa.Column('expected_receipt_date', sa.Date(), nullable=False),
+    sa.Column('order_no', sa.String(length=25), nullable=True),
+    sa.Column('vendor_code', sa.String(length=20), nullable=False),
+    sa.Column('location_code', sa.String(length=20), nullable=True),
+    sa.Column('currency_code', sa.String(length=10), nullable=True),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('purchase_receipt_line',
+    sa.Column('document_no', sa.String(length=25), nullable=False),
+    sa.Column('line_no', sa.Integer(), nullable=False),
+    sa.Column('item_type', sa.String(length=100), nullable=True),
+    sa.Column('item_code', sa.String(length=20), nullable=True),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('unit_cost', sa.Float(), nullable=False),
+    sa.Column('order_line_no', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('sales_cr_memo',
+    sa.Column('document_no', sa.String(length=25), nullable=False),
+    sa.Column('entry_id', sa.Integer(), nullable=False),
+    sa.Column('posting_date', sa.Date(), nullable=False),
+    sa.Column('document_date', sa.Date(), nullable=False),
+    sa.Column('customer_code', sa.String(length=20), nullable=False),
+    sa.Column('ship_to_code', sa.String(length=10), nullable=True),
+    sa.Column('payment_method_code', sa.String(length=20), nullable=True),
+    sa.Column('shipment_method_code', sa.String(length=20), nullable=True),
+    sa.Column('location_code', sa.String(length=20), nullable=True),
+    sa.Column('currency_code', sa.String(length=10), nullable=True),
+    sa.Column('salesperson_code', sa.String(length=20), nullable=True),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('amount_with_vat', sa.Float(), nullable=False),
+    sa.Column('return_order_no', sa.String(length=25), nullable=True),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('document_no')
+    )
+    op.create_table('sales_cr_memo_line',
+    sa.Column('document_no', sa.String(length=25), nullable=False),
+    sa.Column('line_no', sa.Integer(), nullable=False),
+    sa.Column('item_type', sa.String(length=100), nullable=True),
+    sa.Column('item_code', sa.String(length=20), nullable=True),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('unit_price', sa.Float(), nullable=False),
+    sa.Column('discount_percentage', sa.Float(), nullable=False),
+    sa.Column('discount_amount', sa.Float(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('amount_with_vat', sa.Float(), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('sales_invoice',
+    sa.Column('document_no', sa.String(length=25), nullable=False),
+    sa.Column('entry_id', sa.Integer(), nullable=False),
+    sa.Column('posting_date', sa.Date(), nullable=False),
+    sa.Column('document_date', sa.Date(), nullable=False),
+    sa.Column('customer_code', sa.String(length=20), nullable=False),
+    sa.Column('ship_to_code', sa.String(length=10), nullable=True),
+    sa.Column('payment_method_code', sa.String(length=20), nullable=True),
+    sa.Column('shipment_method_code', sa.String(length=20), nullable=True),
+    sa.Column('location_code', sa.String(length=20), nullable=True),
+    sa.Column('currency_code', sa.String(length=10), nullable=True),
+    sa.Column('salesperson_code', sa.String(length=20), nullable=True),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('amount_with_vat', sa.Float(), nullable=False),
+    sa.Column('order_no', sa.String(length=25), nullable=True),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('document_no')
+    )
+    op.create_table('sales_invoice_line',
+    sa.Column('document_no', sa.String(length=25), nullable=False),
+    sa.Column('line_no', sa.Integer(), nullable=False),
+    sa.Column('item_type', sa.String(length=100), nullable=True),
+    sa.Column('item_code', sa.String(length=25), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('unit_price', sa.Float(), nullable=True),
+    sa.Column('discount_percentage', sa.Float(), nullable=True),
+    sa.Column('discount_amount', sa.Float(), nullable=True),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('amount_with_vat', sa.Float(), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('salesperson',
+    sa.Column('salesperson_code', sa.String(length=20), nullable=False),
+    sa.Column('salesperson_name', sa.String(length=100), nullable=True),
+    sa.Column('is_blocked', sa.Boolean(), nullable=True),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('salesperson_code')
+    )
+    op.create_table('shipment_method',
+    sa.Column('shipment_method_code', sa.String(length=10), nullable=False),
+    sa.Column('shipment_method_name', sa.String(length=100), nullable=True),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('shipment_method_code')
+    )
+    op.create_table('vendor',
+    sa.Column('vendor_code', sa.String(length=20), nullable=False),
+    sa.Column('vendor_name', sa.String(length=100), nullable=True),
+    sa.Column('contact_code', sa.String(length=20), nullable=True),
+    sa.Column('vendor_posting_group', sa.String(length=20), nullable=True),
+    sa.Column('payment_terms_code', sa.String(length=20), nullable=True),
+    sa.Column('country_code', sa.String(length=20), nullable=True),
+    sa.Column('location_code', sa.String(length=20), nullable=True),
+    sa.Column('purchaser_code', sa.String(length=20), nullable=True),
+    sa.Column('rfc_code', sa.String(length=13), nullable=True),
+    sa.Column('is_blocked', sa.String(length=100), nullable=True),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('vendor_code')
+    )
+    op.create_table('vendor_ledger',
+    sa.Column('entry_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('posting_date', sa.Date(), nullable=False),
+    sa.Column('document_date', sa.Date(), nullable=False),
+    sa.Column('document_type', sa.String(length=100), nullable=False),
+    sa.Column('document_no', sa.String(length=25), nullable=False),
+    sa.Column('vendor_code', sa.String(length=20), nullable=False),
+    sa.Column('currency_code', sa.String(length=10), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('remaining_amount', sa.Float(), nullable=False),
+    sa.Column('is_positive', sa.Boolean(), nullable=True),
+    sa.Column('transaction_no', sa.Integer(), nullable=False),
+    sa.Column('external_document_no', sa.String(length=35), nullable=False),
+    sa.Column('apply_to_external_document_no', sa.String(length=35), nullable=False),
+    sa.Column('closed_by_entry', sa.Integer(), nullable=False),
+    sa.Column('is_open', sa.Boolean(), nullable=False),
+    sa.Column('is_reversed', sa.Boolean(), nullable=False),
+    sa.Column('reversed_by_entry', sa.Integer(), nullable=False),
+    sa.Column('reversed_entry', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('entry_id')
+    )
+    op.create_table('vendor_posting_group',
+    sa.Column('vendor_posting_group_code', sa.String(length=20), nullable=False),
+    sa.Column('vendor_posting_group_name', sa.String(length=100), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('modified_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('vendor_posting_group_code')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('vendor_posting_group')
+    op.drop_table('vendor_ledger')
+    op.drop_table('vendor')
+    op.drop_table('shipment_method')
+    op.drop_table('salesperson')
+    op.drop_table('sales_invoice_line')
+    op.drop_table('sales_invoice')
+    op.drop_table('sales_cr_memo_line')
+    op.drop_table('sales_cr_memo')
+    op.drop_table('purchase_receipt_line')
+    op.drop_table('purchase_receipt')
+    op.drop_table('purchase_order_line')
+    op.drop_table('purchase_order')
+    op.drop_table('purchase_invoice_line')
+    op.drop_table('purchase_invoice')
+    op.drop_table('purchase_cr_memo_line')
+    op.drop_table('purchase_cr_memo')
+    op.drop_table('payment_terms')
+    op.drop_table('payment_method')
+    op.drop_table('location')
+    op.drop_table('item_category')
+    op.drop_table('item')
+    op.drop_table('inventory_posting_group')
+    op.drop_table('exchange_rate')
+    op.drop_table('customer_price_group')
+    op.drop_table('customer_posting_group')
+    op.drop_table('customer_ledger')
+    op.drop_table('customer')
+    op.drop_table('currency')
+    op.drop_table('country')
@@ -0,0 +1,105 @@
+"""string lengths
+
+The tables deployed before migrations were managed declared their string columns as String[N], which built length-less
+strings (VARCHAR(max) on SQL Server). SQL Server can not index those columns, so databases adopted with alembic stamp 0001
+get the lengths of 0001 here, before 0002 indexes the update keys. Columns that already have a length are left untouched,
+so databases created by 0001 are not altered. Unique constraints of 0001 missing from an adopted database are created too.
+
+Revision ID: 0001a
+Revises: 0001
+Create Date: 2026-10-19 09:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001a'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+#length of each string column declared by 0001
+STRING_COLUMNS = {
+    'country' : {'country_code' : 10, 'country_name' : 100},
+    'currency' : {'currency_code' : 10, 'currency_name' : 100},
+    'customer' : {'customer_code' : 20, 'customer_name' : 100, 'contact_code' : 20, 'customer_posting_group_code' : 20, 'customer_price_group_code' : 20, 'payment_terms_code' : 20, 'country_code' : 10, 'location_code' : 20, 'salesperson_code' : 20, 'rfc_code' : 13, 'is_blocked' : 100},
+    'customer_ledger' : {'document_type' : 100, 'document_no' : 25, 'customer_code' : 20, 'currency_code' : 10, 'external_document_no' : 35, 'apply_to_external_document_no' : 35},
+    'customer_posting_group' : {'customer_posting_group_code' : 20, 'customer_posting_group_name' : 100},
+    'customer_price_group' : {'customer_price_group_code' : 10, 'customer_price_group_name' : 100},
+    'exchange_rate' : {'currency_code' : 10, 'related_currency_code' : 10},
+    'inventory_posting_group' : {'inventory_posting_group_code' : 20, 'inventory_posting_group_name' : 100},
+    'item' : {'item_code' : 20, 'item_name' : 100, 'measure_unit' : 50, 'item_type' : 100, 'inventory_posting_group_code' : 20, 'item_category_code' : 20},
+    'item_category' : {'item_category_code' : 20, 'item_category_name' : 100, 'parent_category' : 100},
+    'location' : {'location_code' : 20, 'location_name' : 100, 'country_code' : 10},
+    'payment_method' : {'payment_method_code' : 20, 'payment_method_name' : 100},
+    'payment_terms' : {'payment_terms_code' : 10, 'payment_terms_name' : 100},
+    'purchase_cr_memo' : {'document_no' : 25, 'vendor_code' : 20, 'payment_method_code' : 20, 'currency_code' : 10, 'purchaser_code' : 20, 'return_order_no' : 25},
+    'purchase_cr_memo_line' : {'document_no' : 25, 'item_type' : 100, 'item_code' : 20},
+    'purchase_invoice' : {'document_no' : 25, 'vendor_code' : 20, 'payment_method_code' : 20, 'currency_code' : 10, 'purchaser_code' : 20, 'order_no' : 25},
+    'purchase_invoice_line' : {'document_no' : 25, 'item_type' : 100, 'item_code' : 20},
+    'purchase_order' : {'document_no' : 25, 'document_type' : 100, 'document_status' : 25, 'vendor_code' : 20, 'payment_method_code' : 20, 'currency_code' : 10, 'purchaser_code' : 20},
+    'purchase_order_line' : {'document_no' : 25, 'item_type' : 100, 'item_code' : 20},
+    'purchase_receipt' : {'document_no' : 25, 'order_no' : 25, 'vendor_code' : 20, 'location_code' : 20, 'currency_code' : 10},
+    'purchase_receipt_line' : {'document_no' : 25, 'item_type' : 100, 'item_code' : 20},
+    'sales_cr_memo' : {'document_no' : 25, 'customer_code' : 20, 'ship_to_code' : 10, 'payment_method_code' : 20, 'shipment_method_code' : 20, 'location_code' : 20, 'currency_code' : 10, 'salesperson_code' : 20, 'return_order_no' : 25},
+    'sales_cr_memo_line' : {'document_no' : 25, 'item_type' : 100, 'item_code' : 20},
+    'sales_invoice' : {'document_no' : 25, 'customer_code' : 20, 'ship_to_code' : 10, 'payment_method_code' : 20, 'shipment_method_code' : 20, 'location_code' : 20, 'currency_code' : 10, 'salesperson_code' : 20, 'order_no' : 25},
+    'sales_invoice_line' : {'document_no' : 25, 'item_type' : 100, 'item_code' : 25},
+    'salesperson' : {'salesperson_code' : 20, 'salesperson_name' : 100},
+    'shipment_method' : {'shipment_method_code' : 10, 'shipment_method_name' : 100},
+    'vendor' : {'vendor_code' : 20, 'vendor_name' : 100, 'contact_code' : 20, 'vendor_posting_group' : 20, 'payment_terms_code' : 20, 'country_code' : 20, 'location_code' : 20, 'purchaser_code' : 20, 'rfc_code' : 13, 'is_blocked' : 100},
+    'vendor_ledger' : {'document_type' : 100, 'document_no' : 25, 'vendor_code' : 20, 'currency_code' : 10, 'external_document_no' : 35, 'apply_to_external_document_no' : 35},
+    'vendor_posting_group' : {'vendor_posting_group_code' : 20, 'vendor_posting_group_name' : 100},
+}
+UNIQUE_COLUMNS = {
+    'country' : ['country_code'],
+    'currency' : ['currency_code'],
+    'customer' : ['customer_code'],
+    'customer_ledger' : ['entry_id'],
+    'customer_posting_group' : ['customer_posting_group_code'],
+    'customer_price_group' : ['customer_price_group_code'],
+    'inventory_posting_group' : ['inventory_posting_group_code'],
+    'item' : ['item_code'],
+    'item_category' : ['item_category_code'],
+    'location' : ['location_code'],
+    'payment_method' : ['payment_method_code'],
+    'payment_terms' : ['payment_terms_code'],
+    'purchase_cr_memo' : ['document_no'],
+    'purchase_invoice' : ['document_no'],
+    'sales_cr_memo' : ['document_no'],
+    'sales_invoice' : ['document_no'],
+    'salesperson' : ['salesperson_code'],
+    'shipment_method' : ['shipment_method_code'],
+    'vendor' : ['vendor_code'],
+    'vendor_ledger' : ['entry_id'],
+    'vendor_posting_group' : ['vendor_posting_group_code'],
+}
+
+
+def upgrade() -> None:
+
+    inspector = sa.inspect(op.get_bind())
+
+    for table, lengths in STRING_COLUMNS.items():
+        columns = {column['name'] : column for column in inspector.get_columns(table)}
+        unbounded = [name for name in lengths if name in columns and getattr(columns[name]['type'], 'length', None) is None]
+
+        unique = {tuple(constraint['column_names']) for constraint in inspector.get_unique_constraints(table)}
+        unique |= {tuple(index['column_names']) for index in inspector.get_indexes(table) if index['unique']}
+        missing = [name for name in UNIQUE_COLUMNS.get(table, []) if (name,) not in unique]
+
+        if not unbounded and not missing:
+            continue
+
+        with op.batch_alter_table(table) as batch_op:
+            for name in unbounded:
+                batch_op.alter_column(name, type_=sa.String(length=lengths[name]), existing_type=sa.String(),
+                                      existing_nullable=columns[name]['nullable'])
+            for name in missing:
+                batch_op.create_unique_constraint(f'uq_{table}_{name}', [name])
+
+
+def downgrade() -> None:
+    #the deployed length-less columns are not restored, the bounded ones hold every value they held
+    pass
@@ -0,0 +1,163 @@
+"""sync indexes
+
+Indexes the watermark columns read by get_sync_timestamps and adds unique indexes on the
+update keys of models whose keys are not already unique. Duplicate keys left by earlier
+syncs must be removed before upgrading.
+
+Revision ID: 0002
+Revises: 0001a
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_country_created_at', 'country', ['created_at'], unique=False)
+    op.create_index('ix_country_modified_at', 'country', ['modified_at'], unique=False)
+    op.create_index('ix_currency_created_at', 'currency', ['created_at'], unique=False)
+    op.create_index('ix_currency_modified_at', 'currency', ['modified_at'], unique=False)
+    op.create_index('ix_customer_created_at', 'customer', ['created_at'], unique=False)
+    op.create_index('ix_customer_modified_at', 'customer', ['modified_at'], unique=False)
+    op.create_index('ix_customer_ledger_created_at', 'customer_ledger', ['created_at'], unique=False)
+    op.create_index('ix_customer_ledger_modified_at', 'customer_ledger', ['modified_at'], unique=False)
+    op.create_index('ix_customer_posting_group_created_at', 'customer_posting_group', ['created_at'], unique=False)
+    op.create_index('ix_customer_posting_group_modified_at', 'customer_posting_group', ['modified_at'], unique=False)
+    op.create_index('ix_customer_price_group_created_at', 'customer_price_group', ['created_at'], unique=False)
+    op.create_index('ix_customer_price_group_modified_at', 'customer_price_group', ['modified_at'], unique=False)
+    op.create_index('ix_exchange_rate_created_at', 'exchange_rate', ['created_at'], unique=False)
+    op.create_index('ix_exchange_rate_modified_at', 'exchange_rate', ['modified_at'], unique=False)
+    op.create_index('uq_exchange_rate_update_keys', 'exchange_rate', ['starting_date', 'currency_code', 'related_currency_code'], unique=True)
+    op.create_index('ix_inventory_posting_group_created_at', 'inventory_posting_group', ['created_at'], unique=False)
+    op.create_index('ix_inventory_posting_group_modified_at', 'inventory_posting_group', ['modified_at'], unique=False)
+    op.create_index('ix_item_created_at', 'item', ['created_at'], unique=False)
+    op.create_index('ix_item_modified_at', 'item', ['modified_at'], unique=False)
+    op.create_index('ix_item_category_created_at', 'item_category', ['created_at'], unique=False)
+    op.create_index('ix_item_category_modified_at', 'item_category', ['modified_at'], unique=False)
+    op.create_index('ix_location_created_at', 'location', ['created_at'], unique=False)
+    op.create_index('ix_location_modified_at', 'location', ['modified_at'], unique=False)
+    op.create_index('ix_payment_method_created_at', 'payment_method', ['created_at'], unique=False)
+    op.create_index('ix_payment_method_modified_at', 'payment_method', ['modified_at'], unique=False)
+    op.create_index('ix_payment_terms_created_at', 'payment_terms', ['created_at'], unique=False)
+    op.create_index('ix_payment_terms_modified_at', 'payment_terms', ['modified_at'], unique=False)
+    op.create_index('ix_purchase_cr_memo_created_at', 'purchase_cr_memo', ['created_at'], unique=False)
+    op.create_index('ix_purchase_cr_memo_modified_at', 'purchase_cr_memo', ['modified_at'], unique=False)
+    op.create_index('ix_purchase_cr_memo_line_created_at', 'purchase_cr_memo_line', ['created_at'], unique=False)
+    op.create_index('ix_purchase_cr_memo_line_modified_at', 'purchase_cr_memo_line', ['modified_at'], unique=False)
+    op.create_index('uq_purchase_cr_memo_line_update_keys', 'purchase_cr_memo_line', ['document_no', 'line_no'], unique=True)
+    op.create_index('ix_purchase_invoice_created_at', 'purchase_invoice', ['created_at'], unique=False)
+    op.create_index('ix_purchase_invoice_modified_at', 'purchase_invoice', ['modified_at'], unique=False)
+    op.create_index('ix_purchase_invoice_line_created_at', 'purchase_invoice_line', ['created_at'], unique=False)
+    op.create_index('ix_purchase_invoice_line_modified_at', 'purchase_invoice_line', ['modified_at'], unique=False)
+    op.create_index('uq_purchase_invoice_line_update_keys', 'purchase_invoice_line', ['document_no', 'line_no'], unique=True)
+    op.create_index('ix_purchase_order_created_at', 'purchase_order', ['created_at'], unique=False)
+    op.create_index('ix_purchase_order_modified_at', 'purchase_order', ['modified_at'], unique=False)
+    op.create_index('uq_purchase_order_update_keys', 'purchase_order', ['document_no'], unique=True)
+    op.create_index('ix_purchase_order_line_created_at', 'purchase_order_line', ['created_at'], unique=False)
+    op.create_index('ix_purchase_order_line_modified_at', 'purchase_order_line', ['modified_at'], unique=False)
+    op.create_index('uq_purchase_order_line_update_keys', 'purchase_order_line', ['document_no', 'line_no'], unique=True)
+    op.create_index('ix_purchase_receipt_created_at', 'purchase_receipt', ['created_at'], unique=False)
+    op.create_index('ix_purchase_receipt_modified_at', 'purchase_receipt', ['modified_at'], unique=False)
+    op.create_index('uq_purchase_receipt_update_keys', 'purchase_receipt', ['document_no'], unique=True)
+    op.create_index('ix_purchase_receipt_line_created_at', 'purchase_receipt_line', ['created_at'], unique=False)
+    op.create_index('ix_purchase_receipt_line_modified_at', 'purchase_receipt_line', ['modified_at'], unique=False)
+    op.create_index('uq_purchase_receipt_line_update_keys', 'purchase_receipt_line', ['document_no', 'line_no'], unique=True)
+    op.create_index('ix_sales_cr_memo_created_at', 'sales_cr_memo', ['created_at'], unique=False)
+    op.create_index('ix_sales_cr_memo_modified_at', 'sales_cr_memo', ['modified_at'], unique=False)
+    op.create_index('ix_sales_cr_memo_line_created_at', 'sales_cr_memo_line', ['created_at'], unique=False)
+    op.create_index('ix_sales_cr_memo_line_modified_at', 'sales_cr_memo_line', ['modified_at'], unique=False)
+    op.create_index('uq_sales_cr_memo_line_update_keys', 'sales_cr_memo_line', ['document_no', 'line_no'], unique=True)
+    op.create_index('ix_sales_invoice_created_at', 'sales_invoice', ['created_at'], unique=False)
+    op.create_index('ix_sales_invoice_modified_at', 'sales_invoice', ['modified_at'], unique=False)
+    op.create_index('ix_sales_invoice_line_created_at', 'sales_invoice_line', ['created_at'], unique=False)
+    op.create_index('ix_sales_invoice_line_modified_at', 'sales_invoice_line', ['modified_at'], unique=False)
+    op.create_index('uq_sales_invoice_line_update_keys', 'sales_invoice_line', ['document_no', 'line_no'], unique=True)
+    op.create_index('ix_salesperson_created_at', 'salesperson', ['created_at'], unique=False)
+    op.create_index('ix_salesperson_modified_at', 'salesperson', ['modified_at'], unique=False)
+    op.create_index('ix_shipment_method_created_at', 'shipment_method', ['created_at'], unique=False)
+    op.create_index('ix_shipment_method_modified_at', 'shipment_method', ['modified_at'], unique=False)
+    op.create_index('ix_vendor_created_at', 'vendor', ['created_at'], unique=False)
+    op.create_index('ix_vendor_modified_at', 'vendor', ['modified_at'], unique=False)
+    op.create_index('ix_vendor_ledger_created_at', 'vendor_ledger', ['created_at'], unique=False)
+    op.create_index('ix_vendor_ledger_modified_at', 'vendor_ledger', ['modified_at'], unique=False)
+    op.create_index('ix_vendor_posting_group_created_at', 'vendor_posting_group', ['created_at'], unique=False)
+    op.create_index('ix_vendor_posting_group_modified_at', 'vendor_posting_group', ['modified_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vendor_posting_group_modified_at', table_name='vendor_posting_group')
+    op.drop_index('ix_vendor_posting_group_created_at', table_name='vendor_posting_group')
+    op.drop_index('ix_vendor_ledger_modified_at', table_name='vendor_ledger')
+    op.drop_index('ix_vendor_ledger_created_at', table_name='vendor_ledger')
+    op.drop_index('ix_vendor_modified_at', table_name='vendor')
+    op.drop_index('ix_vendor_created_at', table_name='vendor')
+    op.drop_index('ix_shipment_method_modified_at', table_name='shipment_method')
+    op.drop_index('ix_shipment_method_created_at', table_name='shipment_method')
+    op.drop_index('ix_salesperson_modified_at', table_name='salesperson')
+    op.drop_index('ix_salesperson_created_at', table_name='salesperson')
+    op.drop_index('uq_sales_invoice_line_update_keys', table_name='sales_invoice_line')
+    op.drop_index('ix_sales_invoice_line_modified_at', table_name='sales_invoice_line')
+    op.drop_index('ix_sales_invoice_line_created_at', table_name='sales_invoice_line')
+    op.drop_index('ix_sales_invoice_modified_at', table_name='sales_invoice')
+    op.drop_index('ix_sales_invoice_created_at', table_name='sales_invoice')
+    op.drop_index('uq_sales_cr_memo_line_update_keys', table_name='sales_cr_memo_line')
+    op.drop_index('ix_sales_cr_memo_line_modified_at', table_name='sales_cr_memo_line')
+    op.drop_index('ix_sales_cr_memo_line_created_at', table_name='sales_cr_memo_line')
+    op.drop_index('ix_sales_cr_memo_modified_at', table_name='sales_cr_memo')
+    op.drop_index('ix_sales_cr_memo_created_at', table_name='sales_cr_memo')
+    op.drop_index('uq_purchase_receipt_line_update_keys', table_name='purchase_receipt_line')
+    op.drop_index('ix_purchase_receipt_line_modified_at', table_name='purchase_receipt_line')
+    op.drop_index('ix_purchase_receipt_line_created_at', table_name='purchase_receipt_line')
+    op.drop_index('uq_purchase_receipt_update_keys', table_name='purchase_receipt')
+    op.drop_index('ix_purchase_receipt_modified_at', table_name='purchase_receipt')
+    op.drop_index('ix_purchase_receipt_created_at', table_name='purchase_receipt')
+    op.drop_index('uq_purchase_order_line_update_keys', table_name='purchase_order_line')
+    op.drop_index('ix_purchase_order_line_modified_at', table_name='purchase_order_line')
+    op.drop_index('ix_purchase_order_line_created_at', table_name='purchase_order_line')
+    op.drop_index('uq_purchase_order_update_keys', table_name='purchase_order')
+    op.drop_index('ix_purchase_order_modified_at', table_name='purchase_order')
+    op.drop_index('ix_purchase_order_created_at', table_name='purchase_order')
+    op.drop_index('uq_purchase_invoice_line_update_keys', table_name='purchase_invoice_line')
+    op.drop_index('ix_purchase_invoice_line_modified_at', table_name='purchase_invoice_line')
+    op.drop_index('ix_purchase_invoice_line_created_at', table_name='purchase_invoice_line')
+    op.drop_index('ix_purchase_invoice_modified_at', table_name='purchase_invoice')
+    op.drop_index('ix_purchase_invoice_created_at', table_name='purchase_invoice')
+    op.drop_index('uq_purchase_cr_memo_line_update_keys', table_name='purchase_cr_memo_line')
+    op.drop_index('ix_purchase_cr_memo_line_modified_at', table_name='purchase_cr_memo_line')
+    op.drop_index('ix_purchase_cr_memo_line_created_at', table_name='purchase_cr_memo_line')
+    op.drop_index('ix_purchase_cr_memo_modified_at', table_name='purchase_cr_memo')
+    op.drop_index('ix_purchase_cr_memo_created_at', table_name='purchase_cr_memo')
+    op.drop_index('ix_payment_terms_modified_at', table_name='payment_terms')
+    op.drop_index('ix_payment_terms_created_at', table_name='payment_terms')
+    op.drop_index('ix_payment_method_modified_at', table_name='payment_method')
+    op.drop_index('ix_payment_method_created_at', table_name='payment_method')
+    op.drop_index('ix_location_modified_at', table_name='location')
+    op.drop_index('ix_location_created_at', table_name='location')
+    op.drop_index('ix_item_category_modified_at', table_name='item_category')
+    op.drop_index('ix_item_category_created_at', table_name='item_category')
+    op.drop_index('ix_item_modified_at', table_name='item')
+    op.drop_index('ix_item_created_at', table_name='item')
+    op.drop_index('ix_inventory_posting_group_modified_at', table_name='inventory_posting_group')
+    op.drop_index('ix_inventory_posting_group_created_at', table_name='inventory_posting_group')
+    op.drop_index('uq_exchange_rate_update_keys', table_name='exchange_rate')
+    op.drop_index('ix_exchange_rate_modified_at', table_name='exchange_rate')
+    op.drop_index('ix_exchange_rate_created_at', table_name='exchange_rate')
+    op.drop_index('ix_customer_price_group_modified_at', table_name='customer_price_group')
+    op.drop_index('ix_customer_price_group_created_at', table_name='customer_price_group')
+    op.drop_index('ix_customer_posting_group_modified_at', table_name='customer_posting_group')
+    op.drop_index('ix_customer_posting_group_created_at', table_name='customer_posting_group')
+    op.drop_index('ix_customer_ledger_modified_at', table_name='customer_ledger')
+    op.drop_index('ix_customer_ledger_created_at', table_name='customer_ledger')
+    op.drop_index('ix_customer_modified_at', table_name='customer')
+    op.drop_index('ix_customer_created_at', table_name='customer')
+    op.drop_index('ix_currency_modified_at', table_name='currency')
+    op.drop_index('ix_currency_created_at', table_name='currency')
+    op.drop_index('ix_country_modified_at', table_name='country')
+    op.drop_index('ix_country_created_at', table_name='country')
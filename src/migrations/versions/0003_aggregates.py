@@ -0,0 +1,48 @@
+"""aggregates
+
+Summary tables maintained by sync_table from the deltas of sales invoices, sales credit memos
+and customer/vendor ledger entries. They are filled from the source tables on the next sync.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('agg_sales_by_customer_day',
+    sa.Column('customer_code', sa.String(length=20), nullable=False),
+    sa.Column('posting_date', sa.Date(), nullable=False),
+    sa.Column('document_type', sa.String(length=20), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('amount_with_vat', sa.Float(), nullable=False),
+    sa.Column('document_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('customer_code', 'posting_date', 'document_type')
+    )
+    op.create_table('agg_customer_balance',
+    sa.Column('customer_code', sa.String(length=20), nullable=False),
+    sa.Column('open_amount', sa.Float(), nullable=False),
+    sa.Column('open_entries', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('customer_code')
+    )
+    op.create_table('agg_vendor_balance',
+    sa.Column('vendor_code', sa.String(length=20), nullable=False),
+    sa.Column('open_amount', sa.Float(), nullable=False),
+    sa.Column('open_entries', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('vendor_code')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('agg_vendor_balance')
+    op.drop_table('agg_customer_balance')
+    op.drop_table('agg_sales_by_customer_day')
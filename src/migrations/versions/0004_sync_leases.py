@@ -0,0 +1,32 @@
+"""sync leases
+
+Lease table taken by sync_table for each company and table, so overlapping flow runs skip or wait on the tables in progress.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('sync_leases',
+    sa.Column('company_id', sa.String(length=50), nullable=False),
+    sa.Column('table_name', sa.String(length=100), nullable=False),
+    sa.Column('owner', sa.String(length=200), nullable=False),
+    sa.Column('acquired_at', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('company_id', 'table_name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('sync_leases')
@@ -0,0 +1,68 @@
+"""columnstore storage
+
+Non-clustered columnstore indexes on the ledger and document line tables, declared by the __storage__ options of the models.
+The ledger indexes are partitioned by posting month, MSSQLBackend.prepare_table adds the months after PARTITION_END before each sync.
+Only applies to SQL Server targets.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+from datetime import date
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+PARTITION_START = date(2015, 1, 1)
+PARTITION_END = date(2027, 10, 1)
+
+
+def _create_monthly_partitions(table : str) -> None:
+
+    boundaries = []
+    current = PARTITION_START
+    while current <= PARTITION_END:
+        boundaries.append(f"'{current.isoformat()}'")
+        current = date(current.year + current.month // 12, current.month % 12 + 1, 1)
+
+    op.execute(f'CREATE PARTITION FUNCTION [pf_{table}_month] (date) AS RANGE RIGHT FOR VALUES ({", ".join(boundaries)})')
+    op.execute(f'CREATE PARTITION SCHEME [ps_{table}_month] AS PARTITION [pf_{table}_month] ALL TO ([PRIMARY])')
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'mssql':
+        return
+
+    _create_monthly_partitions('customer_ledger')
+    op.execute('CREATE NONCLUSTERED COLUMNSTORE INDEX [csi_customer_ledger] ON [customer_ledger] ([entry_id], [posting_date], [document_date], [document_type], [document_no], [customer_code], [currency_code], [amount], [remaining_amount], [is_positive], [transaction_no], [external_document_no], [apply_to_external_document_no], [closed_by_entry], [is_open], [is_reversed], [reversed_by_entry], [reversed_entry], [id], [created_at], [modified_at]) ON [ps_customer_ledger_month] ([posting_date])')
+    op.execute('CREATE NONCLUSTERED COLUMNSTORE INDEX [csi_purchase_cr_memo_line] ON [purchase_cr_memo_line] ([document_no], [line_no], [item_type], [item_code], [quantity], [unit_cost], [discount_percentage], [discount_amount], [amount], [amount_with_vat], [id], [created_at], [modified_at])')
+    op.execute('CREATE NONCLUSTERED COLUMNSTORE INDEX [csi_purchase_invoice_line] ON [purchase_invoice_line] ([document_no], [line_no], [item_type], [item_code], [quantity], [unit_cost], [discount_percentage], [discount_amount], [amount], [amount_with_vat], [id], [created_at], [modified_at])')
+    op.execute('CREATE NONCLUSTERED COLUMNSTORE INDEX [csi_purchase_order_line] ON [purchase_order_line] ([document_no], [line_no], [item_type], [item_code], [quantity], [unit_cost], [discount_percentage], [discount_amount], [amount], [amount_with_vat], [id], [created_at], [modified_at])')
+    op.execute('CREATE NONCLUSTERED COLUMNSTORE INDEX [csi_purchase_receipt_line] ON [purchase_receipt_line] ([document_no], [line_no], [item_type], [item_code], [quantity], [unit_cost], [order_line_no], [id], [created_at], [modified_at])')
+    op.execute('CREATE NONCLUSTERED COLUMNSTORE INDEX [csi_sales_cr_memo_line] ON [sales_cr_memo_line] ([document_no], [line_no], [item_type], [item_code], [quantity], [unit_price], [discount_percentage], [discount_amount], [amount], [amount_with_vat], [id], [created_at], [modified_at])')
+    op.execute('CREATE NONCLUSTERED COLUMNSTORE INDEX [csi_sales_invoice_line] ON [sales_invoice_line] ([document_no], [line_no], [item_type], [item_code], [quantity], [unit_price], [discount_percentage], [discount_amount], [amount], [amount_with_vat], [id], [created_at], [modified_at])')
+    _create_monthly_partitions('vendor_ledger')
+    op.execute('CREATE NONCLUSTERED COLUMNSTORE INDEX [csi_vendor_ledger] ON [vendor_ledger] ([entry_id], [posting_date], [document_date], [document_type], [document_no], [vendor_code], [currency_code], [amount], [remaining_amount], [is_positive], [transaction_no], [external_document_no], [apply_to_external_document_no], [closed_by_entry], [is_open], [is_reversed], [reversed_by_entry], [reversed_entry], [id], [created_at], [modified_at]) ON [ps_vendor_ledger_month] ([posting_date])')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'mssql':
+        return
+
+    op.execute('DROP INDEX [csi_vendor_ledger] ON [vendor_ledger]')
+    op.execute('DROP PARTITION SCHEME [ps_vendor_ledger_month]')
+    op.execute('DROP PARTITION FUNCTION [pf_vendor_ledger_month]')
+    op.execute('DROP INDEX [csi_sales_invoice_line] ON [sales_invoice_line]')
+    op.execute('DROP INDEX [csi_sales_cr_memo_line] ON [sales_cr_memo_line]')
+    op.execute('DROP INDEX [csi_purchase_receipt_line] ON [purchase_receipt_line]')
+    op.execute('DROP INDEX [csi_purchase_order_line] ON [purchase_order_line]')
+    op.execute('DROP INDEX [csi_purchase_invoice_line] ON [purchase_invoice_line]')
+    op.execute('DROP INDEX [csi_purchase_cr_memo_line] ON [purchase_cr_memo_line]')
+    op.execute('DROP INDEX [csi_customer_ledger] ON [customer_ledger]')
+    op.execute('DROP PARTITION SCHEME [ps_customer_ledger_month]')
+    op.execute('DROP PARTITION FUNCTION [pf_customer_ledger_month]')
@@ -0,0 +1,35 @@
+"""sync completions
+
+Tables completed by each flow run with the sync timestamps range they reached, read by main to skip them on retries and resumed runs.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('sync_completions',
+    sa.Column('run_key', sa.String(length=100), nullable=False),
+    sa.Column('company_id', sa.String(length=50), nullable=False),
+    sa.Column('table_name', sa.String(length=100), nullable=False),
+    sa.Column('from_created', sa.DateTime(), nullable=True),
+    sa.Column('from_modified', sa.DateTime(), nullable=True),
+    sa.Column('to_created', sa.DateTime(), nullable=True),
+    sa.Column('to_modified', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('run_key', 'company_id', 'table_name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('sync_completions')
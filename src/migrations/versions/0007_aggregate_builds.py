@@ -0,0 +1,44 @@
+"""aggregate builds
+
+Aggregates built from their whole source table, read by sync_table instead of checking whether the aggregate is empty,
+so the aggregate of an empty source is not rebuilt on every sync. Aggregates already holding rows are recorded as built.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+#name of each aggregate of models.aggregates and the condition selecting its rows
+AGGREGATES = [
+    ('agg_sales_by_customer_day:document_type=invoice', 'agg_sales_by_customer_day', "document_type = 'invoice'"),
+    ('agg_sales_by_customer_day:document_type=credit_memo', 'agg_sales_by_customer_day', "document_type = 'credit_memo'"),
+    ('agg_customer_balance', 'agg_customer_balance', '1 = 1'),
+    ('agg_vendor_balance', 'agg_vendor_balance', '1 = 1'),
+]
+
+
+def upgrade() -> None:
+    op.create_table('aggregate_builds',
+    sa.Column('aggregate_name', sa.String(length=200), nullable=False),
+    sa.Column('built_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('aggregate_name')
+    )
+
+    for name, table, condition in AGGREGATES:
+        op.execute(
+            f"INSERT INTO aggregate_builds (aggregate_name, built_at) SELECT '{name}', CURRENT_TIMESTAMP "
+            f"WHERE EXISTS (SELECT 1 FROM {table} WHERE {condition})"
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('aggregate_builds')
@@ -0,0 +1,280 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import Table, Column, String, Date, DateTime, Float, Integer, select, insert, update, delete, and_, or_, case, func, bindparam, true
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Tuple, Type, Optional, Iterable, Iterator
+from .base import Base, MAX_ID_LOOKUP_PARAMETERS
+from .normalization import normalize_records
+from .backends import get_backend
+from . import db_model
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+#Summary tables maintained from the deltas of each sync, in the same transaction as the synced rows.
+
+sales_by_customer_day = Table(
+    'agg_sales_by_customer_day', Base.metadata,
+    Column('customer_code', String(20), primary_key=True),
+    Column('posting_date', Date, primary_key=True),
+    Column('document_type', String(20), primary_key=True),
+    Column('amount', Float, nullable=False, default=0),
+    Column('amount_with_vat', Float, nullable=False, default=0),
+    Column('document_count', Integer, nullable=False, default=0),
+)
+
+customer_balance = Table(
+    'agg_customer_balance', Base.metadata,
+    Column('customer_code', String(20), primary_key=True),
+    Column('open_amount', Float, nullable=False, default=0),
+    Column('open_entries', Integer, nullable=False, default=0),
+)
+
+vendor_balance = Table(
+    'agg_vendor_balance', Base.metadata,
+    Column('vendor_code', String(20), primary_key=True),
+    Column('open_amount', Float, nullable=False, default=0),
+    Column('open_entries', Integer, nullable=False, default=0),
+)
+
+#Aggregates built from their whole source table, an aggregate without a row here is rebuilt before its deltas are applied.
+
+aggregate_builds = Table(
+    'aggregate_builds', Base.metadata,
+    Column('aggregate_name', String(200), primary_key=True),
+    Column('built_at', DateTime, nullable=False),
+)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@dataclass(frozen=True)
+class Measure:
+    """Sums source (or counts rows when source is None) of the rows where the when attribute is true, multiplied by sign."""
+
+    column : str
+    source : Optional[str] = None
+    when : Optional[str] = None
+    sign : int = 1
+
+    def value(self, row : Dict[str,Any]) -> float:
+
+        if self.when and not row.get(self.when):
+            return 0
+        return self.sign * ((row.get(self.source) or 0) if self.source else 1)
+
+    def expression(self, model : Type[Base]):
+
+        value = getattr(model, self.source) if self.source else 1
+        if self.when:
+            value = case((getattr(model, self.when) == true(), value), else_=0)
+        return func.coalesce(func.sum(value), 0) * self.sign
+
+
+@dataclass(frozen=True)
+class Aggregate:
+    """Summary of a source model into a table: group_by maps the aggregate key columns to source attributes,
+       constants are key columns with a fixed value, so several sources can share a table without sharing rows."""
+
+    table : Table
+    group_by : Tuple[Tuple[str,str],...]
+    measures : Tuple[Measure,...]
+    constants : Tuple[Tuple[str,Any],...] = ()
+
+    @property
+    def name(self) -> str:
+        """Table and constants of the aggregate, e.g. agg_sales_by_customer_day:document_type=invoice."""
+        return ':'.join([self.table.name, *[f'{column}={value}' for column, value in self.constants]])
+
+    @property
+    def source_fields(self) -> List[str]:
+        return [source for _, source in self.group_by] + [field for m in self.measures for field in (m.source, m.when) if field]
+
+    def group_key(self, row : Dict[str,Any]) -> Optional[tuple]:
+
+        key = tuple(row.get(source) for _, source in self.group_by)
+        return None if any(value is None for value in key) else key
+
+    def rebuild(self, model : Type[Base], db : Session) -> None:
+        """Recomputes the summary rows of this source from the whole source table and records it as built."""
+
+        db.execute(delete(self.table).where(*[self.table.c[column] == value for column, value in self.constants]))
+
+        group_columns = [getattr(model, source) for _, source in self.group_by]
+        statement = select(
+            *group_columns,
+            *[bindparam(f'const_{column}', value) for column, value in self.constants],
+            *[measure.expression(model) for measure in self.measures]
+        ).where(*[column.is_not(None) for column in group_columns]).group_by(*group_columns)
+
+        target_columns = [column for column, _ in self.group_by] + [column for column, _ in self.constants] + [m.column for m in self.measures]
+        db.execute(insert(self.table).from_select(target_columns, statement))
+
+        db.execute(delete(aggregate_builds).where(aggregate_builds.c.aggregate_name == self.name))
+        db.execute(insert(aggregate_builds).values(aggregate_name=self.name, built_at=_utcnow()))
+
+    def apply(self, deltas : Dict[tuple,List[float]], db : Session) -> None:
+        """Adds the per group deltas to the summary rows, creating the groups not summarized yet."""
+
+        deltas = {key : values for key, values in deltas.items() if any(values)}
+        if not deltas:
+            return
+
+        key_columns = [column for column, _ in self.group_by]
+        constants = dict(self.constants)
+        existing = set()
+        keys = list(deltas)
+        chunk_size = max(1, MAX_ID_LOOKUP_PARAMETERS // len(key_columns))
+
+        for start in range(0, len(keys), chunk_size):
+            conditions = [and_(*[self.table.c[column] == value for column, value in zip(key_columns, key)]) for key in keys[start:start + chunk_size]]
+            statement = select(*[self.table.c[column] for column in key_columns]).where(
+                or_(*conditions), *[self.table.c[column] == value for column, value in constants.items()])
+            existing.update(tuple(row) for row in db.execute(statement))
+
+        parameters = lambda key, values: {**{f'k_{c}' : v for c, v in zip(key_columns, key)},
+                                          **{f'k_{c}' : v for c, v in constants.items()},
+                                          **{f'd_{m.column}' : v for m, v in zip(self.measures, values)}}
+
+        updates = [parameters(key, values) for key, values in deltas.items() if key in existing]
+        if updates:
+            statement = (
+                update(self.table)
+                .where(*[self.table.c[column] == bindparam(f'k_{column}') for column in key_columns + list(constants)])
+                .values({m.column : self.table.c[m.column] + bindparam(f'd_{m.column}') for m in self.measures})
+            )
+            db.execute(statement, updates)
+
+        inserts = [{**dict(zip(key_columns, key)), **constants, **{m.column : v for m, v in zip(self.measures, values)}}
+                   for key, values in deltas.items() if key not in existing]
+        if inserts:
+            db.execute(insert(self.table), inserts)
+
+    def is_built(self, db : Session) -> bool:
+        """Whether the aggregate was built, an empty aggregate of an empty source is built too."""
+        return db.execute(select(aggregate_builds.c.built_at).where(aggregate_builds.c.aggregate_name == self.name)).first() is not None
+
+
+def _sales_aggregate(document_type : str) -> Aggregate:
+    return Aggregate(
+        sales_by_customer_day,
+        group_by=(('customer_code','sellToCustomerNo'), ('posting_date','postingDate')),
+        measures=(Measure('amount','amount'), Measure('amount_with_vat','amountIncludingVAT'), Measure('document_count')),
+        constants=(('document_type', document_type),)
+    )
+
+def _balance_aggregate(table : Table, partner_column : str, partner_field : str) -> Aggregate:
+    return Aggregate(
+        table,
+        group_by=((partner_column, partner_field),),
+        measures=(Measure('open_amount','remainingAmount',when='open'), Measure('open_entries',when='open'))
+    )
+
+#aggregates fed by the deltas of each source model
+AGGREGATES : Dict[Type[Base],List[Aggregate]] = {
+    db_model.salesInvoices : [_sales_aggregate('invoice')],
+    db_model.salesCreditMemos : [_sales_aggregate('credit_memo')],
+    db_model.customerLedgerEntries : [_balance_aggregate(customer_balance, 'customer_code', 'customerNo')],
+    db_model.vendorLedgerEntries : [_balance_aggregate(vendor_balance, 'vendor_code', 'vendorNo')],
+}
+
+
+class AggregateMaintainer:
+    """Applies the inserted and modified records of a sync to the aggregates of its model.
+       Modified records are summarized as after minus before, with the before values read from the table before the update,
+       so tap_updates must see every chunk before it is written."""
+
+    def __init__(self, model : Type[Base], aggregates : List[Aggregate]):
+
+        self.model = model
+        self.aggregates = aggregates
+        self.key_fields = model.get_update_keys()
+
+    @classmethod
+    def for_model(cls, model : Type[Base], db : Session) -> Optional['AggregateMaintainer']:
+        """Returns the maintainer of a model with aggregates, rebuilding its aggregates first if they were never built."""
+
+        aggregates = AGGREGATES.get(model)
+        if not aggregates:
+            return None
+
+        for aggregate in aggregates:
+            if not aggregate.is_built(db):
+                logger.info(f'Building aggregate {aggregate.table.name} from table {model.__tablename__}')
+                aggregate.rebuild(model, db)
+
+        return cls(model, aggregates)
+
+    def tap_inserts(self, chunks : Iterable[List[Dict[str,Any]]], db : Session) -> Iterator[List[Dict[str,Any]]]:
+
+        for chunk in chunks:
+            self.add_inserted(chunk, db)
+            yield chunk
+
+    def tap_updates(self, chunks : Iterable[List[Dict[str,Any]]], db : Session) -> Iterator[List[Dict[str,Any]]]:
+
+        for chunk in chunks:
+            self.add_updated(chunk, db)
+            yield chunk
+
+    def add_inserted(self, records : List[Dict[str,Any]], db : Session) -> None:
+
+        rows = normalize_records(self.model, records)
+        for aggregate in self.aggregates:
+            deltas = {}
+            self._accumulate(aggregate, rows, 1, deltas)
+            aggregate.apply(deltas, db)
+
+    def add_updated(self, records : List[Dict[str,Any]], db : Session) -> None:
+        """Applies after - before of the modified records, records missing from the table only count when the backend upserts them."""
+
+        rows = normalize_records(self.model, records)
+        before = self._fetch_before(rows, db)
+        upserts = get_backend(db.get_bind().dialect.name).upserts_updates
+
+        key = lambda row: tuple(row.get(field) for field in self.key_fields)
+        after = [row for row in rows if upserts or key(row) in before]
+
+        for aggregate in self.aggregates:
+            deltas = {}
+            self._accumulate(aggregate, after, 1, deltas)
+            self._accumulate(aggregate, list(before.values()), -1, deltas)
+            aggregate.apply(deltas, db)
+
+    @staticmethod
+    def _accumulate(aggregate : Aggregate, rows : List[Dict[str,Any]], sign : int, deltas : Dict[tuple,List[float]]) -> None:
+
+        for row in rows:
+            group = aggregate.group_key(row)
+            if group is None:
+                continue
+            values = deltas.setdefault(group, [0] * len(aggregate.measures))
+            for position, measure in enumerate(aggregate.measures):
+                values[position] += sign * measure.value(row)
+
+    def _fetch_before(self, rows : List[Dict[str,Any]], db : Session) -> Dict[tuple,Dict[str,Any]]:
+        """Reads the current values of the aggregated fields of the rows, keyed by update key."""
+
+        fields = list(dict.fromkeys(self.key_fields + [f for aggregate in self.aggregates for f in aggregate.source_fields]))
+        chunk_size = max(1, MAX_ID_LOOKUP_PARAMETERS // len(self.key_fields))
+        before = {}
+
+        for start in range(0, len(rows), chunk_size):
+            conditions = [and_(*[getattr(self.model, field) == row.get(field) for field in self.key_fields]) for row in rows[start:start + chunk_size]]
+            statement = select(*[getattr(self.model, field) for field in fields]).where(or_(*conditions))
+            for result in db.execute(statement):
+                values = dict(zip(fields, result))
+                before[tuple(values[field] for field in self.key_fields)] = values
+
+        return before
+
+
+def rebuild_aggregates(model : Type[Base], db : Session) -> None:
+    """Recomputes every aggregate fed by a model, e.g. after its initial load."""
+
+    for aggregate in AGGREGATES.get(model, []):
+        logger.info(f'Rebuilding aggregate {aggregate.table.name} from table {model.__tablename__}')
+        aggregate.rebuild(model, db)
@@ -0,0 +1,245 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import insert, select, func, text, URL, Engine, Connection
+from sqlalchemy.types import Boolean, Date, DateTime, Float, Integer, BigInteger, Numeric
+from sqlalchemy.dialects import postgresql, sqlite
+from typing import List, Dict, Any, Type, Optional, Union, TYPE_CHECKING
+from datetime import date
+from abc import ABC, abstractmethod
+from .storage import get_storage, partition_function_name, partition_scheme_name, month_boundaries, month_start, add_months, PARTITION_MONTHS_AHEAD
+import logging
+
+if TYPE_CHECKING:
+    from .base import Base
+    from .key_index import KeyIndex
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class TargetBackend(ABC):
+    """Database specific write paths of the sync target, the default implementations use plain SQLAlchemy statements.
+       Rows received by the backend are already normalized by models.normalization."""
+
+    name = 'generic'
+    #timestamps are parsed into datetimes before binding, except on drivers that parse the ISO strings of the api themselves.
+    parse_timestamps = True
+    #updates are written as INSERT ... ON CONFLICT on the update keys instead of an UPDATE by the queried surrogate ids.
+    upserts_updates = False
+
+    @abstractmethod
+    def connection_url(self, server : str, database : str, username : str, password : str) -> str:
+        """Returns the sqlalchemy url of a configured target."""
+
+    def insert(self, model : Type['Base'], rows : List[Dict[str,Any]], db : Session, key_index : Optional['KeyIndex'] = None) -> None:
+        """Inserts the rows, when a key index is given the ids are returned by the insert and staged on it."""
+
+        statement = insert(model).execution_options(render_nulls=True)
+        if key_index is None:
+            db.execute(statement, rows)
+        else:
+            key_columns = [getattr(model,key) for key in key_index.key_fields]
+            key_index.stage(db.execute(statement.returning(model.id,*key_columns), rows).fetchall())
+
+    def prepare_table(self, model : Type['Base'], engine : Engine) -> None:
+        """Runs before each sync of the table, on its own connection outside of the sync transaction."""
+        pass
+
+    def begin_initial_load(self, model : Type['Base'], db : Session) -> None:
+        pass
+
+    def load_chunk(self, model : Type['Base'], rows : List[Dict[str,Any]], db : Session) -> None:
+        self.insert(model, rows, db)
+
+    def end_initial_load(self, model : Type['Base'], db : Session) -> None:
+        pass
+
+
+class MSSQLBackend(TargetBackend):
+    """SQL Server through pyodbc: initial loads disable the non-unique non-clustered indexes and insert under a table lock with fast_executemany.
+       Tables with columnstore storage (models.storage) get their monthly partitions created ahead of each sync."""
+
+    name = 'mssql'
+    parse_timestamps = False
+
+    def connection_url(self, server : str, database : str, username : str, password : str) -> str:
+        return f"mssql+pyodbc://{username}:{password}@{server}/{database}?driver=ODBC+Driver+17+for+SQL+Server"
+
+    def prepare_table(self, model : Type['Base'], engine : Engine) -> None:
+        """Rebuilds the indexes left disabled by an initial load whose process was killed before end_initial_load,
+           then splits the partition function of the model up to PARTITION_MONTHS_AHEAD months after the current one.
+           Boundaries are added ahead of the data, so a split cuts the empty last partition and moves no rows."""
+
+        with engine.begin() as conn:
+            for name in self._alter_nonclustered_indexes(model, 'REBUILD', conn):
+                logger.warning(f'Rebuilt index {name} of table {model.__tablename__}, left disabled by an interrupted initial load.')
+
+        storage = get_storage(model)
+        if not storage or not storage.partition_by:
+            return
+
+        function = partition_function_name(model)
+        statement = text(
+            "SELECT MAX(CAST(prv.value AS date)) FROM sys.partition_range_values prv "
+            "JOIN sys.partition_functions pf ON pf.function_id = prv.function_id WHERE pf.name = :name"
+        )
+
+        with engine.begin() as conn:
+            last = conn.execute(statement, {'name' : function}).scalar()
+            if last is None:
+                logger.warning(f'Partition function {function} not found, the storage of table {model.__tablename__} was not migrated.')
+                return
+
+            for boundary in month_boundaries(add_months(last, 1), add_months(month_start(date.today()), PARTITION_MONTHS_AHEAD)):
+                conn.execute(text(f'ALTER PARTITION SCHEME [{partition_scheme_name(model)}] NEXT USED [PRIMARY]'))
+                conn.execute(text(f"ALTER PARTITION FUNCTION [{function}]() SPLIT RANGE ('{boundary.isoformat()}')"))
+                logger.info(f'Added partition {boundary} to table {model.__tablename__}')
+
+    def begin_initial_load(self, model : Type['Base'], db : Session) -> None:
+        self._alter_nonclustered_indexes(model, 'DISABLE', db)
+
+    def load_chunk(self, model : Type['Base'], rows : List[Dict[str,Any]], db : Session) -> None:
+        """Inserts normalized rows with a TABLOCK hint using the parameter arrays of pyodbc fast_executemany."""
+
+        columns = [model.__mapper__.columns[key].name for key in rows[0]]
+        statement = (
+            f'INSERT INTO [{model.__tablename__}] WITH (TABLOCK) ({", ".join(f"[{c}]" for c in columns)}) '
+            f'VALUES ({", ".join("?" * len(columns))})'
+        )
+
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.fast_executemany = True
+            cursor.executemany(statement, [tuple(row.values()) for row in rows])
+        finally:
+            cursor.close()
+
+    def end_initial_load(self, model : Type['Base'], db : Session) -> None:
+        """Rebuilds the disabled indexes, the non-clustered columnstore included."""
+
+        self._alter_nonclustered_indexes(model, 'REBUILD', db)
+
+    @staticmethod
+    def _alter_nonclustered_indexes(model : Type['Base'], action : str, db : Union[Session, Connection]) -> List[str]:
+        """Disables the enabled non-clustered indexes of the table, columnstore included, or rebuilds the disabled ones.
+           Unique indexes are never disabled, so the update keys stay enforced during the load. Returns the altered indexes."""
+
+        statement = text(
+            "SELECT name FROM sys.indexes WHERE object_id = OBJECT_ID(:table_name) "
+            "AND type_desc IN ('NONCLUSTERED', 'NONCLUSTERED COLUMNSTORE') AND is_primary_key = 0 AND is_disabled = :is_disabled"
+            + ("" if action == 'REBUILD' else " AND is_unique = 0 AND is_unique_constraint = 0")
+        )
+        index_names = db.execute(statement, {'table_name' : model.__tablename__, 'is_disabled' : int(action == 'REBUILD')}).scalars().all()
+
+        for name in index_names:
+            db.execute(text(f'ALTER INDEX [{name}] ON [{model.__tablename__}] {action}'))
+
+        return index_names
+
+
+class _UpsertBackend(TargetBackend):
+    """Backends writing updates as INSERT ... ON CONFLICT (update keys) DO UPDATE, which needs no surrogate id lookup.
+       Rows inserted by an upsert are picked up by the incremental load of the key index on the next sync."""
+
+    upserts_updates = True
+    dialect_insert = None
+
+    def upsert(self, model : Type['Base'], rows : List[Dict[str,Any]], db : Session) -> None:
+
+        key_fields = model.get_update_keys()
+        statement = self.dialect_insert(model)
+        columns = {model.__mapper__.columns[key].name : statement.excluded[model.__mapper__.columns[key].name]
+                   for key in rows[0] if key not in key_fields and key != 'id'}
+        statement = statement.on_conflict_do_update(index_elements=[model.__mapper__.columns[key] for key in key_fields], set_=columns)
+
+        db.execute(statement.execution_options(render_nulls=True), rows)
+
+
+class PostgreSQLBackend(_UpsertBackend):
+    """PostgreSQL through psycopg 3: inserts and initial loads are streamed with binary COPY in the session transaction."""
+
+    name = 'postgresql'
+    dialect_insert = staticmethod(postgresql.insert)
+
+    def connection_url(self, server : str, database : str, username : str, password : str) -> str:
+
+        host, _, port = (server or '').partition(':')
+        url = URL.create('postgresql+psycopg', username=username, password=password, host=host or None,
+                         port=int(port) if port else None, database=database)
+        return url.render_as_string(hide_password=False)
+
+    def insert(self, model : Type['Base'], rows : List[Dict[str,Any]], db : Session, key_index : Optional['KeyIndex'] = None) -> None:
+        """COPY returns no ids, when a key index is given the rows above the largest id read before the copy are staged on it.
+           The table lease keeps other runs from inserting into the table meanwhile."""
+
+        last_id = (db.scalar(select(func.max(model.id))) or 0) if key_index is not None else None
+
+        keys = list(rows[0])
+        columns = [model.__mapper__.columns[key] for key in keys]
+        quoted = ', '.join(f'"{column.name}"' for column in columns)
+        statement = f'COPY "{model.__tablename__}" ({quoted}) FROM STDIN (FORMAT BINARY)'
+
+        cursor = db.connection().connection.cursor()
+        try:
+            with cursor.copy(statement) as copy:
+                copy.set_types([self._copy_type(column.type) for column in columns])
+                for row in rows:
+                    copy.write_row([row[key] for key in keys])
+        finally:
+            cursor.close()
+
+        if key_index is not None:
+            key_columns = [getattr(model, key) for key in key_index.key_fields]
+            key_index.stage(db.execute(select(model.id, *key_columns).where(model.id > last_id)).fetchall())
+
+    @staticmethod
+    def _copy_type(column_type) -> str:
+        """Name of the postgres type whose binary format is written for a column type."""
+
+        if isinstance(column_type, Boolean):
+            return 'bool'
+        if isinstance(column_type, DateTime):
+            return 'timestamp'
+        if isinstance(column_type, Date):
+            return 'date'
+        if isinstance(column_type, BigInteger):
+            return 'int8'
+        if isinstance(column_type, Integer):
+            return 'int4'
+        if isinstance(column_type, Float):
+            return 'float8'
+        if isinstance(column_type, Numeric):
+            return 'numeric'
+        return 'text'
+
+
+class SQLiteBackend(_UpsertBackend):
+    """SQLite file target for development and benchmarking, database is the path of the file and server is ignored."""
+
+    name = 'sqlite'
+    dialect_insert = staticmethod(sqlite.insert)
+
+    def connection_url(self, server : str, database : str, username : str, password : str) -> str:
+        return f'sqlite:///{database}'
+
+
+class GenericBackend(TargetBackend):
+    """Default write paths for sessions bound to other dialects, the url uses the default driver of the dialect."""
+
+    def __init__(self, name : str):
+        self.name = name
+
+    def connection_url(self, server : str, database : str, username : str, password : str) -> str:
+
+        host, _, port = (server or '').partition(':')
+        url = URL.create(self.name, username=username, password=password, host=host or None,
+                         port=int(port) if port else None, database=database)
+        return url.render_as_string(hide_password=False)
+
+
+BACKENDS : Dict[str,TargetBackend] = {backend.name : backend for backend in (MSSQLBackend(), PostgreSQLBackend(), SQLiteBackend())}
+
+
+def get_backend(name : str) -> TargetBackend:
+    """Returns the backend of a configured name or of a session's dialect name, a GenericBackend for other dialects."""
+
+    return BACKENDS.get(name) or GenericBackend(name)
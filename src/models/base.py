@@ -1,21 +1,50 @@
-from sqlalchemy.orm import DeclarativeBaseNoMeta, Session, Mapped, mapped_column
+from sqlalchemy.orm import DeclarativeBaseNoMeta, Session, Mapped, mapped_column, declared_attr
 from sqlalchemy.types import DateTime, Integer
-from sqlalchemy import func, insert, update,  and_, or_,select
+from sqlalchemy import func, update,  and_, or_,select, Index
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Iterable, Optional, TYPE_CHECKING
 from abc import ABC, abstractmethod
 from .exceptions import InsertOperationError, UpdateOperationError
+from .normalization import normalize_records
+from .backends import get_backend
+from .storage import StorageOptions, COLUMNSTORE_BATCH_ROWS, rebatch
+from .cursors import TimestampCursor
+
+if TYPE_CHECKING:
+    from .key_index import KeyIndex
+
+#bound parameters per id lookup query, below the 2100 parameter limit of SQL Server.
+MAX_ID_LOOKUP_PARAMETERS = 2000
 
 class Base(DeclarativeBaseNoMeta, ABC):
     """Base class for sqlalchemy orm models.
        Each subclass of the Base class represents a table on the sql database."""
 
     __abstract__ = True
+    #columnstore and partitioning of the table on SQL Server, see models.storage.
+    __storage__ : Optional[StorageOptions] = None
+    #how new records are requested from the api, see models.cursors.
+    __cursor__ : TimestampCursor = TimestampCursor()
     
     id : Mapped[int]= mapped_column(primary_key=True,autoincrement=True,nullable=False)
     systemCreatedAt : Mapped[datetime] = mapped_column('created_at',DateTime)
     systemModifiedAt : Mapped[datetime] = mapped_column('modified_at',DateTime)
 
+    @declared_attr.directive
+    def __table_args__(cls) -> tuple:
+        """Indexes required by the sync queries: the watermark columns read by get_sync_timestamps
+           and the update keys matched by _add_ids_to_update_set, unless the key column is already unique."""
+
+        key_columns = [cls.__dict__[key].column for key in cls.get_update_keys()]
+        indexes = [
+            Index(f'ix_{cls.__tablename__}_created_at','created_at'),
+            Index(f'ix_{cls.__tablename__}_modified_at','modified_at')
+        ]
+        if len(key_columns) > 1 or not key_columns[0].unique:
+            indexes.append(Index(f'uq_{cls.__tablename__}_update_keys',*[c.name for c in key_columns],unique=True))
+
+        return tuple(indexes)
+
     @classmethod
     def _get_last_created_timestamp(cls, db : Session) -> datetime:
         return db.query(func.max(cls.systemCreatedAt)).scalar()
@@ -33,34 +62,77 @@ class Base(DeclarativeBaseNoMeta, ABC):
         }
     
     @classmethod
-    def insert_records(cls, records : List[Dict[str,str]], db : Session) -> None:
+    def insert_records(cls, records : List[Dict[str,str]], db : Session, key_index : Optional['KeyIndex'] = None) -> None:
+        """Inserts the records through the bulk path of the target backend, staging the returned ids on the key index when given."""
 
         if records:
 
-            api_tag = '@odata.etag'
-            for obj in records:
-                if api_tag in obj:
-                    del obj[api_tag]
+            backend = get_backend(db.get_bind().dialect.name)
+            rows = normalize_records(cls, records, backend.parse_timestamps)
             try:
-                db.execute(
-                    insert(cls).execution_options(render_nulls=True),
-                    records
-                    )
+                backend.insert(cls, rows, db, key_index)
             except Exception as e:
                 raise InsertOperationError from e
 
     @classmethod
-    def update_records(cls, records : List[Dict[str,str]], db : Session) -> None:
+    def load_initial_records(cls, chunks : Iterable[List[Dict[str,str]]], db : Session) -> int:
+        """Loads every chunk into an empty table, committing after each one instead of holding a single transaction.
+           The target backend prepares the table before the load (e.g. disabling the non-unique non-clustered indexes on SQL Server),
+           writes each chunk through its bulk path and restores the table afterwards.
+           Chunks of columnstore tables are regrouped into batches of a rowgroup."""
+
+        backend = get_backend(db.get_bind().dialect.name)
+        loaded = 0
+        if cls.__storage__ and cls.__storage__.columnstore:
+            chunks = rebatch(chunks, COLUMNSTORE_BATCH_ROWS)
+
+        backend.begin_initial_load(cls, db)
+        db.commit()
+
+        try:
+            for chunk in chunks:
+                rows = normalize_records(cls, chunk, backend.parse_timestamps)
+                if not rows:
+                    continue
+                backend.load_chunk(cls, rows, db)
+                db.commit()
+                loaded += len(rows)
+
+        except Exception as e:
+            db.rollback()
+            raise InsertOperationError from e
+
+        finally:
+            backend.end_initial_load(cls, db)
+            db.commit()
+
+        return loaded
+
+    @classmethod
+    def update_records(cls, records : List[Dict[str,str]], db : Session, key_index : Optional['KeyIndex'] = None) -> None:
+        """Updates the records by surrogate id, resolved from the key index when given and queried for the keys it misses.
+           Backends with upserts write the records as INSERT ... ON CONFLICT on the update keys instead."""
 
         if records:
             
+            backend = get_backend(db.get_bind().dialect.name)
             update_keys = cls.get_update_keys()
-            records_with_ids = cls._add_ids_to_update_set(update_keys, records, db)
+            rows = normalize_records(cls, records, backend.parse_timestamps)
+
+            if backend.upserts_updates:
+                try:
+                    backend.upsert(cls, rows, db)
+                except Exception as e:
+                    raise UpdateOperationError from e
+                return
+
+            if key_index is None:
+                records_with_ids = cls._add_ids_to_update_set(update_keys, rows, db)
+            else:
+                records_with_ids, missing = key_index.resolve(rows)
+                if missing:
+                    records_with_ids += cls._add_ids_to_update_set(update_keys, missing, db)
 
-            api_tag = '@odata.etag'
-            for obj in records_with_ids:
-                if api_tag in obj:
-                    del obj[api_tag]
             try:
 
                 db.execute(
@@ -72,32 +144,38 @@ class Base(DeclarativeBaseNoMeta, ABC):
 
     @classmethod
     def _add_ids_to_update_set(cls, update_keys : List[str], records : List[Dict[str,str]], db : Session):
+        """Sets the surrogate id of each record, querying the ids in chunks so the lookup map and the bound parameters stay bounded.
+           The records are updated in place, callers pass rows owned by the update operation."""
 
-        lookup_map = {}
-        for rec in records:
-            lookup_map[tuple(rec[key] for key in update_keys)] = rec
+        chunk_size = max(1, MAX_ID_LOOKUP_PARAMETERS // len(update_keys))
+        records_with_ids = []
 
-        conditions = []
-        for rec in records:
-            record_conditions = []  
-            for key in update_keys:
-                record_conditions.append(getattr(cls,key) == rec[key])
-            conditions.append(and_(*record_conditions))
+        for start in range(0, len(records), chunk_size):
+            chunk = records[start:start + chunk_size]
 
-        statement = (
-            select(cls.id,*[getattr(cls,key) for key in update_keys]).where(or_(*conditions))
-        )
+            lookup_map = {}
+            for rec in chunk:
+                lookup_map[tuple(rec[key] for key in update_keys)] = rec
 
-        result = db.execute(statement).fetchall()
+            conditions = []
+            for rec in chunk:
+                record_conditions = []  
+                for key in update_keys:
+                    record_conditions.append(getattr(cls,key) == rec[key])
+                conditions.append(and_(*record_conditions))
 
-        records_with_ids = []
+            statement = (
+                select(cls.id,*[getattr(cls,key) for key in update_keys]).where(or_(*conditions))
+            )
+
+            result = db.execute(statement).fetchall()
 
-        for r in result:
-            key_tuple = tuple(getattr(r,key) for key in update_keys)
-            if key_tuple in lookup_map:
-                original_record =   lookup_map[key_tuple].copy()
-                original_record['id'] = r.id
-                records_with_ids.append(original_record)
+            for r in result:
+                key_tuple = tuple(getattr(r,key) for key in update_keys)
+                if key_tuple in lookup_map:
+                    original_record = lookup_map[key_tuple]
+                    original_record['id'] = r.id
+                    records_with_ids.append(original_record)
 
         return records_with_ids
 
@@ -0,0 +1,60 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import Table, Column, String, DateTime, select, insert, delete
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Type
+from .base import Base
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+#days a completion is kept, runs older than this can not be resumed.
+COMPLETION_RETENTION_DAYS = 7
+
+#Tables synced successfully by each flow run, so retries and resumed runs skip them.
+
+sync_completions = Table(
+    'sync_completions', Base.metadata,
+    Column('run_key', String(100), primary_key=True),
+    Column('company_id', String(50), primary_key=True),
+    Column('table_name', String(100), primary_key=True),
+    Column('from_created', DateTime),
+    Column('from_modified', DateTime),
+    Column('to_created', DateTime),
+    Column('to_modified', DateTime),
+    Column('completed_at', DateTime, nullable=False),
+)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def get_completions(db : Session, run_key : str, company_id : str) -> Dict[str,Dict[str,Optional[datetime]]]:
+    """Returns the sync timestamps reached by each table completed by a run, keyed by table name."""
+
+    statement = select(sync_completions.c.table_name, sync_completions.c.to_created, sync_completions.c.to_modified).where(
+        sync_completions.c.run_key == run_key, sync_completions.c.company_id == company_id)
+
+    return {table_name : {'last_created' : to_created, 'last_modified' : to_modified} for table_name, to_created, to_modified in db.execute(statement)}
+
+def is_completed(completions : Dict[str,Dict[str,Optional[datetime]]], model : Type[Base], timestamps : Dict[str,Optional[datetime]]) -> bool:
+    """A table is completed when the run synced it and its sync timestamps did not move since, e.g. by another run."""
+
+    return completions.get(model.__tablename__) == timestamps
+
+def record_completion(db : Session, run_key : str, company_id : str, model : Type[Base],
+                      start : Dict[str,Optional[datetime]], end : Dict[str,Optional[datetime]]) -> None:
+    """Records the timestamps range synced by a run for a table, committing it and pruning the expired completions."""
+
+    conditions = (sync_completions.c.run_key == run_key, sync_completions.c.company_id == company_id,
+                  sync_completions.c.table_name == model.__tablename__)
+    now = _utcnow()
+
+    db.execute(delete(sync_completions).where(*conditions))
+    db.execute(insert(sync_completions).values(
+        run_key=run_key, company_id=company_id, table_name=model.__tablename__,
+        from_created=start['last_created'], from_modified=start['last_modified'],
+        to_created=end['last_created'], to_modified=end['last_modified'], completed_at=now))
+    db.execute(delete(sync_completions).where(sync_completions.c.completed_at < now - timedelta(days=COMPLETION_RETENTION_DAYS)))
+    db.commit()
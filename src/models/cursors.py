@@ -0,0 +1,62 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Dict, Any, Type, Optional, Callable, Iterator, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .base import Base
+
+#fetch_pages(**odata parameters) of sync_table, returning the pages of records of the model.
+PageFetcher = Callable[..., Iterator[List[Dict[str,Any]]]]
+
+
+@dataclass(frozen=True)
+class TimestampCursor:
+    """Finds the records created after the last sync by systemCreatedAt, relying on the server paging of a single request.
+       Declared as the __cursor__ attribute of a model, this is the strategy of every model by default."""
+
+    def initial_pages(self, model : Type['Base'], fetch_pages : PageFetcher, fields : List[str]) -> Iterator[List[Dict[str,Any]]]:
+        return fetch_pages(order_by = 'systemCreatedAt', select = fields)
+
+    def new_pages(self, model : Type['Base'], fetch_pages : PageFetcher, db : Session, timestamps : Dict[str,Optional[datetime]],
+                  fields : List[str]) -> Iterator[List[Dict[str,Any]]]:
+        return fetch_pages(last_created_at = timestamps['last_created'], select = fields)
+
+
+@dataclass(frozen=True)
+class KeysetCursor(TimestampCursor):
+    """Finds new records by a strictly increasing integer attribute: each request asks for the next window of records
+       'field gt N' ordered by field, N being the last key received, so requests are index ranges on the server
+       and their boundaries do not depend on how deep the load is. A load stopped between windows resumes from the
+       largest key already stored."""
+
+    field : str = 'entryNo'
+    window : int = 20000
+
+    def initial_pages(self, model : Type['Base'], fetch_pages : PageFetcher, fields : List[str]) -> Iterator[List[Dict[str,Any]]]:
+        return self._windows(fetch_pages, None, fields)
+
+    def new_pages(self, model : Type['Base'], fetch_pages : PageFetcher, db : Session, timestamps : Dict[str,Optional[datetime]],
+                  fields : List[str]) -> Iterator[List[Dict[str,Any]]]:
+        """The largest stored key is read here, the returned pages may be consumed by another thread than the one owning db."""
+
+        last_key = db.scalar(select(func.max(getattr(model, self.field))))
+        return self._windows(fetch_pages, last_key, fields)
+
+    def _windows(self, fetch_pages : PageFetcher, last_key : Optional[int], fields : List[str]) -> Iterator[List[Dict[str,Any]]]:
+
+        while True:
+            received = 0
+            for page in fetch_pages(
+                custom_filter = f'{self.field} gt {last_key}' if last_key is not None else None,
+                order_by = self.field,
+                limit = self.window,
+                select = fields):
+                if page:
+                    received += len(page)
+                    last_key = page[-1][self.field]
+                yield page
+
+            if received < self.window:
+                return
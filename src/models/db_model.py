@@ -1,27 +1,13 @@
 from .base import Base
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy.types import TypeDecorator, String, Integer, Float, Boolean, Date
+from .types import CustomString
+from .storage import StorageOptions
+from .cursors import KeysetCursor
+from sqlalchemy.types import String, Integer, Float, Boolean, Date
 from datetime import date
 from typing import List, Optional
 from enum import Enum
 
-class CustomString(TypeDecorator):
-    """Custom string type to map empty strings to NULL"""
-
-    impl = String
-    cache_ok = True
-
-    def process_bind_param(self,value,dialect):
-        if value == '' or value == ' ':
-            return None
-        return value
-    
-    def process_result_value(self, value, dialect):
-        return value
-    
-    def copy(self, **kw):
-        return CustomString(self.impl.length)
-
 
 #For each subclass of the base class the following is true:
 #The attribute name of a column matches with the corresponding api field name.
@@ -30,8 +16,8 @@ class CustomString(TypeDecorator):
 class currencies(Base):
     __tablename__ = 'currency'
  
-    code : Mapped[str] = mapped_column('currency_code',String[10],unique=True,nullable=False)
-    description : Mapped[Optional[str]] = mapped_column('currency_name',CustomString[100])
+    code : Mapped[str] = mapped_column('currency_code',String(10),unique=True,nullable=False)
+    description : Mapped[Optional[str]] = mapped_column('currency_name',CustomString(100))
 
     @classmethod
     def get_update_keys(cls):
@@ -41,8 +27,8 @@ class exchangeRates(Base):
     __tablename__ = 'exchange_rate'
 
     startingDate : Mapped[date] = mapped_column('starting_date',Date,nullable=False)
-    currencyCode : Mapped[str] = mapped_column('currency_code',String[10])
-    relationalCurrencyCode : Mapped[str] = mapped_column('related_currency_code',String[10])
+    currencyCode : Mapped[str] = mapped_column('currency_code',String(10))
+    relationalCurrencyCode : Mapped[str] = mapped_column('related_currency_code',String(10))
     exchangeRateAmount : Mapped[float] =  mapped_column('amount',Float)
 
     @classmethod    
@@ -52,8 +38,8 @@ class exchangeRates(Base):
 class paymentTerms(Base):
     __tablename__ = 'payment_terms'
 
-    code : Mapped[str] = mapped_column('payment_terms_code',String[10],unique=True,nullable=False)
-    description : Mapped[Optional[str]] = mapped_column('payment_terms_name',CustomString[100])
+    code : Mapped[str] = mapped_column('payment_terms_code',String(10),unique=True,nullable=False)
+    description : Mapped[Optional[str]] = mapped_column('payment_terms_name',CustomString(100))
 
     @classmethod
     def get_update_keys(cls):
@@ -62,8 +48,8 @@ class paymentTerms(Base):
 class countries(Base):
     __tablename__ = 'country'
 
-    code : Mapped[str]= mapped_column('country_code',String[10],unique=True,nullable=False)
-    name : Mapped[Optional[str]] = mapped_column('country_name',CustomString[100])
+    code : Mapped[str]= mapped_column('country_code',String(10),unique=True,nullable=False)
+    name : Mapped[Optional[str]] = mapped_column('country_name',CustomString(100))
 
     @classmethod
     def get_update_keys(cls):
@@ -72,8 +58,8 @@ class countries(Base):
 class shipmentMethods(Base):
     __tablename__ = 'shipment_method'
 
-    code : Mapped[str] = mapped_column('shipment_method_code',String[10],unique=True,nullable=False)
-    description : Mapped[Optional[str]] = mapped_column('shipment_method_name',CustomString[100])
+    code : Mapped[str] = mapped_column('shipment_method_code',String(10),unique=True,nullable=False)
+    description : Mapped[Optional[str]] = mapped_column('shipment_method_name',CustomString(100))
 
     @classmethod
     def get_update_keys(cls):
@@ -83,8 +69,8 @@ class shipmentMethods(Base):
 class priceGroups(Base):
     __tablename__ = 'customer_price_group'
 
-    code : Mapped[str] = mapped_column('customer_price_group_code',String[10],unique=True,nullable=False)
-    description : Mapped[Optional[str]] = mapped_column('customer_price_group_name',CustomString[100])
+    code : Mapped[str] = mapped_column('customer_price_group_code',String(10),unique=True,nullable=False)
+    description : Mapped[Optional[str]] = mapped_column('customer_price_group_name',CustomString(100))
 
     @classmethod
     def get_update_keys(cls):
@@ -93,9 +79,9 @@ class priceGroups(Base):
 class locations(Base):
     __tablename__ = 'location'
 
-    code : Mapped[str] = mapped_column('location_code',String[20],unique=True,nullable=False)
-    name : Mapped[Optional[str]] = mapped_column('location_name',CustomString[100])
-    countryRegionCode : Mapped[Optional[str]] = mapped_column('country_code',CustomString[10])
+    code : Mapped[str] = mapped_column('location_code',String(20),unique=True,nullable=False)
+    name : Mapped[Optional[str]] = mapped_column('location_name',CustomString(100))
+    countryRegionCode : Mapped[Optional[str]] = mapped_column('country_code',CustomString(10))
 
     @classmethod
     def get_update_keys(cls):
@@ -105,8 +91,8 @@ class locations(Base):
 class paymentMethods(Base):
     __tablename__ = 'payment_method'
 
-    code : Mapped[str] = mapped_column('payment_method_code',String[20],unique=True,nullable=False)
-    description : Mapped[Optional[str]] = mapped_column('payment_method_name',CustomString[100])
+    code : Mapped[str] = mapped_column('payment_method_code',String(20),unique=True,nullable=False)
+    description : Mapped[Optional[str]] = mapped_column('payment_method_name',CustomString(100))
 
     @classmethod
     def get_update_keys(cls):
@@ -116,10 +102,10 @@ class paymentMethods(Base):
 class itemCategories(Base):
     __tablename__ = 'item_category'
 
-    code : Mapped[str] = mapped_column('item_category_code',String[20],unique=True,nullable=False)
-    description : Mapped[Optional[str]] = mapped_column('item_category_name',CustomString[100])
+    code : Mapped[str] = mapped_column('item_category_code',String(20),unique=True,nullable=False)
+    description : Mapped[Optional[str]] = mapped_column('item_category_name',CustomString(100))
     hasChildren : Mapped[Optional[bool]] = mapped_column('has_children',Boolean)
-    parentCategory : Mapped[Optional[str]] = mapped_column('parent_category',CustomString[100])
+    parentCategory : Mapped[Optional[str]] = mapped_column('parent_category',CustomString(100))
 
     @classmethod
     def get_update_keys(cls):
@@ -129,8 +115,8 @@ class itemCategories(Base):
 class customerPostingGroups(Base):
     __tablename__ = 'customer_posting_group'
 
-    code : Mapped[str] = mapped_column('customer_posting_group_code',String[20],unique=True,nullable=False)
-    description : Mapped[Optional[str]] = mapped_column('customer_posting_group_name',CustomString[100])
+    code : Mapped[str] = mapped_column('customer_posting_group_code',String(20),unique=True,nullable=False)
+    description : Mapped[Optional[str]] = mapped_column('customer_posting_group_name',CustomString(100))
 
     @classmethod
     def get_update_keys(cls):
@@ -140,8 +126,8 @@ class customerPostingGroups(Base):
 class vendorPostingGroups(Base):
     __tablename__ = 'vendor_posting_group'
 
-    code : Mapped[str] = mapped_column('vendor_posting_group_code',String[20],unique=True, nullable=False)
-    description : Mapped[str] = mapped_column('vendor_posting_group_name',CustomString[100])
+    code : Mapped[str] = mapped_column('vendor_posting_group_code',String(20),unique=True, nullable=False)
+    description : Mapped[str] = mapped_column('vendor_posting_group_name',CustomString(100))
 
     @classmethod
     def get_update_keys(cls):
@@ -151,8 +137,8 @@ class vendorPostingGroups(Base):
 class inventoryPostingGroups(Base):
     __tablename__ = 'inventory_posting_group'
 
-    code : Mapped[str] = mapped_column('inventory_posting_group_code',String[20],unique=True,nullable=False)
-    description : Mapped[Optional[str]] = mapped_column('inventory_posting_group_name',CustomString[100])
+    code : Mapped[str] = mapped_column('inventory_posting_group_code',String(20),unique=True,nullable=False)
+    description : Mapped[Optional[str]] = mapped_column('inventory_posting_group_name',CustomString(100))
 
     @classmethod
     def get_update_keys(cls):
@@ -162,17 +148,17 @@ class inventoryPostingGroups(Base):
 class customers(Base):
     __tablename__ = 'customer'
 
-    no : Mapped[str] = mapped_column('customer_code',String[20],unique=True,nullable=False)
-    name : Mapped[Optional[str]] = mapped_column('customer_name',CustomString[100])
-    contact : Mapped[Optional[str]] = mapped_column('contact_code',CustomString[20])
-    customerPostingGroup : Mapped[Optional[str]] = mapped_column('customer_posting_group_code',CustomString[20])
-    customerPriceGroup : Mapped[Optional[str]] = mapped_column('customer_price_group_code',CustomString[20])
-    paymentTermsCode : Mapped[Optional[str]] = mapped_column('payment_terms_code',CustomString[20])
-    countryRegionCode : Mapped[Optional[str]] = mapped_column('country_code',CustomString[10])
-    locationCode : Mapped[Optional[str]] = mapped_column('location_code',CustomString[20])
-    salespersonCode : Mapped[Optional[str]] = mapped_column('salesperson_code',CustomString[20])
-    rfcNo : Mapped[Optional[str]] = mapped_column('rfc_code',CustomString[13])
-    blocked : Mapped[Optional[str]] = mapped_column('is_blocked',CustomString[100])
+    no : Mapped[str] = mapped_column('customer_code',String(20),unique=True,nullable=False)
+    name : Mapped[Optional[str]] = mapped_column('customer_name',CustomString(100))
+    contact : Mapped[Optional[str]] = mapped_column('contact_code',CustomString(20))
+    customerPostingGroup : Mapped[Optional[str]] = mapped_column('customer_posting_group_code',CustomString(20))
+    customerPriceGroup : Mapped[Optional[str]] = mapped_column('customer_price_group_code',CustomString(20))
+    paymentTermsCode : Mapped[Optional[str]] = mapped_column('payment_terms_code',CustomString(20))
+    countryRegionCode : Mapped[Optional[str]] = mapped_column('country_code',CustomString(10))
+    locationCode : Mapped[Optional[str]] = mapped_column('location_code',CustomString(20))
+    salespersonCode : Mapped[Optional[str]] = mapped_column('salesperson_code',CustomString(20))
+    rfcNo : Mapped[Optional[str]] = mapped_column('rfc_code',CustomString(13))
+    blocked : Mapped[Optional[str]] = mapped_column('is_blocked',CustomString(100))
 
     @classmethod
     def get_update_keys(cls):
@@ -182,16 +168,16 @@ class customers(Base):
 class vendors(Base):
     __tablename__ = 'vendor'
 
-    no : Mapped[str] = mapped_column('vendor_code',String[20],unique=True,nullable=False)
-    name : Mapped[Optional[str]] = mapped_column('vendor_name',CustomString[100])
-    primaryContactNo : Mapped[Optional[str]] = mapped_column('contact_code',CustomString[20])
-    vendorPostingGroup : Mapped[Optional[str]] = mapped_column('vendor_posting_group',CustomString[20])
-    paymentTermsCode : Mapped[Optional[str]] = mapped_column('payment_terms_code',CustomString[20])
-    countryRegionCode : Mapped[Optional[str]] = mapped_column('country_code',CustomString[20])
-    locationCode : Mapped[Optional[str]] = mapped_column('location_code',CustomString[20])
-    purchaserCode : Mapped[Optional[str]] = mapped_column('purchaser_code',CustomString[20])
-    rfcNo : Mapped[Optional[str]] = mapped_column('rfc_code',CustomString[13])
-    blocked : Mapped[Optional[str]] = mapped_column('is_blocked',CustomString[100])
+    no : Mapped[str] = mapped_column('vendor_code',String(20),unique=True,nullable=False)
+    name : Mapped[Optional[str]] = mapped_column('vendor_name',CustomString(100))
+    primaryContactNo : Mapped[Optional[str]] = mapped_column('contact_code',CustomString(20))
+    vendorPostingGroup : Mapped[Optional[str]] = mapped_column('vendor_posting_group',CustomString(20))
+    paymentTermsCode : Mapped[Optional[str]] = mapped_column('payment_terms_code',CustomString(20))
+    countryRegionCode : Mapped[Optional[str]] = mapped_column('country_code',CustomString(20))
+    locationCode : Mapped[Optional[str]] = mapped_column('location_code',CustomString(20))
+    purchaserCode : Mapped[Optional[str]] = mapped_column('purchaser_code',CustomString(20))
+    rfcNo : Mapped[Optional[str]] = mapped_column('rfc_code',CustomString(13))
+    blocked : Mapped[Optional[str]] = mapped_column('is_blocked',CustomString(100))
 
     @classmethod
     def get_update_keys(cls):
@@ -201,8 +187,8 @@ class vendors(Base):
 class salesmen(Base):
     __tablename__ = 'salesperson'
 
-    code : Mapped[str] = mapped_column('salesperson_code',String[20],unique=True,nullable=False)
-    name : Mapped[Optional[str]] = mapped_column('salesperson_name',CustomString[100])
+    code : Mapped[str] = mapped_column('salesperson_code',String(20),unique=True,nullable=False)
+    name : Mapped[Optional[str]] = mapped_column('salesperson_name',CustomString(100))
     blocked : Mapped[Optional[bool]] = mapped_column('is_blocked',Boolean)
 
     @classmethod
@@ -213,12 +199,12 @@ class salesmen(Base):
 class items(Base):
     __tablename__ = 'item'
 
-    no : Mapped[str] = mapped_column('item_code',String[20],unique=True,nullable=False)
-    description : Mapped[Optional[str]] = mapped_column('item_name',CustomString[100])
-    baseUnitOfMeasure : Mapped[Optional[str]] = mapped_column('measure_unit',CustomString[50])
-    type : Mapped[Optional[str]] = mapped_column('item_type',CustomString[100])
-    inventoryPostingGroup : Mapped[Optional[str]] =  mapped_column('inventory_posting_group_code',CustomString[20])
-    itemCategoryCode : Mapped[Optional[str]] = mapped_column('item_category_code',CustomString[20])
+    no : Mapped[str] = mapped_column('item_code',String(20),unique=True,nullable=False)
+    description : Mapped[Optional[str]] = mapped_column('item_name',CustomString(100))
+    baseUnitOfMeasure : Mapped[Optional[str]] = mapped_column('measure_unit',CustomString(50))
+    type : Mapped[Optional[str]] = mapped_column('item_type',CustomString(100))
+    inventoryPostingGroup : Mapped[Optional[str]] =  mapped_column('inventory_posting_group_code',CustomString(20))
+    itemCategoryCode : Mapped[Optional[str]] = mapped_column('item_category_code',CustomString(20))
     unitPrice : Mapped[Optional[float]] = mapped_column('unit_price',Float)
     unitCost : Mapped[Optional[float]] = mapped_column('unit_cost',Float)
     grossWeight : Mapped[Optional[float]] = mapped_column('gross_weight',Float)
@@ -233,20 +219,22 @@ class items(Base):
 
 class customerLedgerEntries(Base):
     __tablename__ = 'customer_ledger'
+    __storage__ = StorageOptions(partition_by='postingDate', columnstore='nonclustered')
+    __cursor__ = KeysetCursor('entryNo')
 
     entryNo : Mapped[int] = mapped_column('entry_id',Integer,unique=True,nullable=False,autoincrement=False)
     postingDate : Mapped[date] = mapped_column('posting_date',Date)
     documentDate : Mapped[date] = mapped_column('document_date',Date)
-    documentType : Mapped[Optional[str]] = mapped_column('document_type',CustomString[100])
-    documentNo : Mapped[str] = mapped_column('document_no',String[25],nullable=False)
-    customerNo : Mapped[str] = mapped_column('customer_code',CustomString[20])
-    currencyCode : Mapped[Optional[str]] = mapped_column('currency_code',String[10])
+    documentType : Mapped[Optional[str]] = mapped_column('document_type',CustomString(100))
+    documentNo : Mapped[str] = mapped_column('document_no',String(25),nullable=False)
+    customerNo : Mapped[str] = mapped_column('customer_code',CustomString(20))
+    currencyCode : Mapped[Optional[str]] = mapped_column('currency_code',String(10))
     amount : Mapped[float] = mapped_column('amount',Float)
     remainingAmount : Mapped[float] = mapped_column('remaining_amount',Float)
     positive : Mapped[bool] = mapped_column('is_positive',Boolean)
     transactionNo : Mapped[int] = mapped_column('transaction_no',Integer)
-    externalDocumentNo : Mapped[Optional[str]] = mapped_column('external_document_no',CustomString[35])
-    appliesToExtDocNo : Mapped[Optional[str]] = mapped_column('apply_to_external_document_no',CustomString[35])
+    externalDocumentNo : Mapped[Optional[str]] = mapped_column('external_document_no',CustomString(35))
+    appliesToExtDocNo : Mapped[Optional[str]] = mapped_column('apply_to_external_document_no',CustomString(35))
     closedByEntryNo : Mapped[int]= mapped_column('closed_by_entry',Integer)
     open : Mapped[bool] = mapped_column('is_open',Boolean)
     reversed : Mapped[bool] = mapped_column('is_reversed',Boolean)
@@ -260,20 +248,22 @@ class customerLedgerEntries(Base):
 
 class vendorLedgerEntries(Base):
     __tablename__ = 'vendor_ledger'
+    __storage__ = StorageOptions(partition_by='postingDate', columnstore='nonclustered')
+    __cursor__ = KeysetCursor('entryNo')
 
     entryNo : Mapped[int] = mapped_column('entry_id',Integer,unique=True,nullable=False,autoincrement=False)
     postingDate : Mapped[date] = mapped_column('posting_date',Date)
     documentDate : Mapped[date] = mapped_column('document_date',Date)
-    documentType : Mapped[date] = mapped_column('document_type',CustomString[100])
-    documentNo : Mapped[str] = mapped_column('document_no', String[25],nullable=False)
-    vendorNo : Mapped[str] = mapped_column('vendor_code',CustomString[20])
-    currencyCode : Mapped[str] = mapped_column('currency_code',String[10])
+    documentType : Mapped[date] = mapped_column('document_type',CustomString(100))
+    documentNo : Mapped[str] = mapped_column('document_no', String(25),nullable=False)
+    vendorNo : Mapped[str] = mapped_column('vendor_code',CustomString(20))
+    currencyCode : Mapped[str] = mapped_column('currency_code',String(10))
     amount : Mapped[float] = mapped_column('amount',Float)
     remainingAmount : Mapped[float] = mapped_column('remaining_amount',Float)
     positive : Mapped[Optional[bool]] = mapped_column('is_positive',Boolean)
     transactionNo : Mapped[int] = mapped_column('transaction_no',Integer)
-    externalDocumentNo : Mapped[str] = mapped_column('external_document_no',CustomString[35])
-    appliesToExtDocNo : Mapped[str] = mapped_column('apply_to_external_document_no',CustomString[35])
+    externalDocumentNo : Mapped[str] = mapped_column('external_document_no',CustomString(35))
+    appliesToExtDocNo : Mapped[str] = mapped_column('apply_to_external_document_no',CustomString(35))
     closedByEntryNo : Mapped[Integer] = mapped_column('closed_by_entry',Integer)
     open : Mapped[bool] = mapped_column('is_open',Boolean)
     reversed : Mapped[bool] = mapped_column('is_reversed',Boolean)
@@ -288,20 +278,20 @@ class vendorLedgerEntries(Base):
 class salesInvoices(Base):
     __tablename__ = 'sales_invoice'
 
-    no : Mapped[str] = mapped_column('document_no',String[25],unique=True,nullable=False)
+    no : Mapped[str] = mapped_column('document_no',String(25),unique=True,nullable=False)
     custLedgerEntryNo : Mapped[int] = mapped_column('entry_id',Integer,nullable=False)
     postingDate : Mapped[date] = mapped_column('posting_date', Date)
     documentDate : Mapped[date] = mapped_column('document_date',Date)
-    sellToCustomerNo : Mapped[str] = mapped_column('customer_code',CustomString[20])
-    shipToCode : Mapped[Optional[str]] = mapped_column('ship_to_code',CustomString[10])
-    paymentMethodCode : Mapped[Optional[str]] = mapped_column('payment_method_code',CustomString[20])
-    shipmentMethodCode : Mapped[Optional[str]] = mapped_column('shipment_method_code',CustomString[20])
-    locationCode : Mapped[Optional[str]] = mapped_column('location_code',CustomString[20])
-    currencyCode : Mapped[Optional[str]] = mapped_column('currency_code',CustomString[10])
-    salespersonCode : Mapped[Optional[str]]= mapped_column('salesperson_code',CustomString[20])
+    sellToCustomerNo : Mapped[str] = mapped_column('customer_code',CustomString(20))
+    shipToCode : Mapped[Optional[str]] = mapped_column('ship_to_code',CustomString(10))
+    paymentMethodCode : Mapped[Optional[str]] = mapped_column('payment_method_code',CustomString(20))
+    shipmentMethodCode : Mapped[Optional[str]] = mapped_column('shipment_method_code',CustomString(20))
+    locationCode : Mapped[Optional[str]] = mapped_column('location_code',CustomString(20))
+    currencyCode : Mapped[Optional[str]] = mapped_column('currency_code',CustomString(10))
+    salespersonCode : Mapped[Optional[str]]= mapped_column('salesperson_code',CustomString(20))
     amount : Mapped[float]= mapped_column('amount',Float)
     amountIncludingVAT : Mapped[float] = mapped_column('amount_with_vat',Float)
-    orderNo : Mapped[Optional[str]] = mapped_column('order_no',CustomString[25])
+    orderNo : Mapped[Optional[str]] = mapped_column('order_no',CustomString(25))
 
     @classmethod
     def get_update_keys(cls):
@@ -309,11 +299,12 @@ class salesInvoices(Base):
 
 class salesInvoiceLines(Base):
     __tablename__ = 'sales_invoice_line'
+    __storage__ = StorageOptions(columnstore='nonclustered')
 
-    documentNo : Mapped[str] = mapped_column('document_no', String[25], nullable=False)
+    documentNo : Mapped[str] = mapped_column('document_no', String(25), nullable=False)
     lineNo : Mapped[int] = mapped_column('line_no',Integer)
-    type : Mapped[Optional[str]] = mapped_column('item_type',CustomString[100])
-    no : Mapped[str] = mapped_column('item_code',CustomString[25])
+    type : Mapped[Optional[str]] = mapped_column('item_type',CustomString(100))
+    no : Mapped[str] = mapped_column('item_code',CustomString(25))
     quantity : Mapped[int] = mapped_column('quantity',Integer)
     unitPrice : Mapped[Optional[float]]= mapped_column('unit_price',Float)
     lineDiscount : Mapped[Optional[float]] = mapped_column('discount_percentage',Float)
@@ -329,20 +320,20 @@ class salesInvoiceLines(Base):
 class salesCreditMemos(Base):
     __tablename__ = 'sales_cr_memo'
 
-    no : Mapped[str] = mapped_column('document_no',String[25],unique=True,nullable=False)
+    no : Mapped[str] = mapped_column('document_no',String(25),unique=True,nullable=False)
     custLedgerEntryNo : Mapped[int] = mapped_column('entry_id',Integer,nullable=False)
     postingDate : Mapped[date] = mapped_column('posting_date',Date)
     documentDate : Mapped[date] = mapped_column('document_date',Date)
-    sellToCustomerNo : Mapped[str] = mapped_column('customer_code',CustomString[20])
-    shipToCode : Mapped[Optional[str]] = mapped_column('ship_to_code',CustomString[10])
-    paymentMethodCode : Mapped[Optional[str]] = mapped_column('payment_method_code',CustomString[20])
-    shipmentMethodCode : Mapped[Optional[str]] = mapped_column('shipment_method_code',CustomString[20])
-    locationCode : Mapped[Optional[str]] = mapped_column('location_code',CustomString[20])
-    currencyCode : Mapped[Optional[str]] = mapped_column('currency_code',String[10])
-    salespersonCode : Mapped[Optional[str]] = mapped_column('salesperson_code',CustomString[20])
+    sellToCustomerNo : Mapped[str] = mapped_column('customer_code',CustomString(20))
+    shipToCode : Mapped[Optional[str]] = mapped_column('ship_to_code',CustomString(10))
+    paymentMethodCode : Mapped[Optional[str]] = mapped_column('payment_method_code',CustomString(20))
+    shipmentMethodCode : Mapped[Optional[str]] = mapped_column('shipment_method_code',CustomString(20))
+    locationCode : Mapped[Optional[str]] = mapped_column('location_code',CustomString(20))
+    currencyCode : Mapped[Optional[str]] = mapped_column('currency_code',String(10))
+    salespersonCode : Mapped[Optional[str]] = mapped_column('salesperson_code',CustomString(20))
     amount : Mapped[float] = mapped_column('amount',Float)
     amountIncludingVAT : Mapped[float] = mapped_column('amount_with_vat',Float)
-    returnOrderNo : Mapped[Optional[str]] = mapped_column('return_order_no',CustomString[25])
+    returnOrderNo : Mapped[Optional[str]] = mapped_column('return_order_no',CustomString(25))
 
     @classmethod
     def get_update_keys(cls):
@@ -351,11 +342,12 @@ class salesCreditMemos(Base):
     
 class salesCreditMemoLines(Base):
     __tablename__ = 'sales_cr_memo_line'
+    __storage__ = StorageOptions(columnstore='nonclustered')
 
-    documentNo : Mapped[str] = mapped_column('document_no',String[25],nullable=False)
+    documentNo : Mapped[str] = mapped_column('document_no',String(25),nullable=False)
     lineNo : Mapped[int]  = mapped_column('line_no',Integer)
-    type : Mapped[Optional[str]] = mapped_column('item_type',CustomString[100])
-    no : Mapped[Optional[str]] = mapped_column('item_code',CustomString[20])
+    type : Mapped[Optional[str]] = mapped_column('item_type',CustomString(100))
+    no : Mapped[Optional[str]] = mapped_column('item_code',CustomString(20))
     quantity : Mapped[int] = mapped_column('quantity',Integer)
     unitPrice : Mapped[float] = mapped_column('unit_price', Float)
     lineDiscount : Mapped[float] = mapped_column('discount_percentage',Float)
@@ -371,17 +363,17 @@ class salesCreditMemoLines(Base):
 class purchaseInvoices(Base):
     __tablename__ = 'purchase_invoice'
 
-    no : Mapped[str] = mapped_column('document_no',String[25],unique=True,nullable=False)
+    no : Mapped[str] = mapped_column('document_no',String(25),unique=True,nullable=False)
     vendorLedgerEntryNo : Mapped[int] = mapped_column('entry_id',Integer,nullable=False)
     postingDate : Mapped[date] = mapped_column('posting_date', Date)
     documentDate : Mapped[date] = mapped_column('document_date',Date)
-    buyFromVendorNo : Mapped[str] = mapped_column('vendor_code',CustomString[20])
-    paymentMethodCode : Mapped[Optional[str]] = mapped_column('payment_method_code',CustomString[20])
-    currencyCode : Mapped[Optional[str]] = mapped_column('currency_code',String[10])
-    purchaserCode : Mapped[Optional[str]] = mapped_column('purchaser_code',CustomString[20])
+    buyFromVendorNo : Mapped[str] = mapped_column('vendor_code',CustomString(20))
+    paymentMethodCode : Mapped[Optional[str]] = mapped_column('payment_method_code',CustomString(20))
+    currencyCode : Mapped[Optional[str]] = mapped_column('currency_code',String(10))
+    purchaserCode : Mapped[Optional[str]] = mapped_column('purchaser_code',CustomString(20))
     amount : Mapped[float] = mapped_column('amount',Float)
     amountIncludingVAT : Mapped[float] = mapped_column('amount_with_vat',Float)
-    orderNo : Mapped[str] = mapped_column('order_no',CustomString[25])
+    orderNo : Mapped[str] = mapped_column('order_no',CustomString(25))
 
     @classmethod
     def get_update_keys(cls):
@@ -390,17 +382,17 @@ class purchaseInvoices(Base):
 class purchaseCreditMemos(Base):
     __tablename__ = 'purchase_cr_memo'
 
-    no : Mapped[str] = mapped_column('document_no',String[25], unique=True, nullable=False)
+    no : Mapped[str] = mapped_column('document_no',String(25), unique=True, nullable=False)
     vendorLedgerEntryNo : Mapped[int] = mapped_column('entry_id',Integer,nullable=False)
     postingDate : Mapped[date] = mapped_column('posting_date', Date)
     documentDate : Mapped[date] = mapped_column('document_date',Date)
-    buyFromVendorNo : Mapped[str] = mapped_column('vendor_code',CustomString[20])
-    paymentMethodCode : Mapped[Optional[str]] = mapped_column('payment_method_code',CustomString[20])
-    currencyCode : Mapped[Optional[str]] = mapped_column('currency_code',String[10])
-    purchaserCode : Mapped[Optional[str]] = mapped_column('purchaser_code',CustomString[20])
+    buyFromVendorNo : Mapped[str] = mapped_column('vendor_code',CustomString(20))
+    paymentMethodCode : Mapped[Optional[str]] = mapped_column('payment_method_code',CustomString(20))
+    currencyCode : Mapped[Optional[str]] = mapped_column('currency_code',String(10))
+    purchaserCode : Mapped[Optional[str]] = mapped_column('purchaser_code',CustomString(20))
     amount : Mapped[float] = mapped_column('amount',Float)
     amountIncludingVAT : Mapped[float] = mapped_column('amount_with_vat',Float)
-    returnOrderNo : Mapped[Optional[str]] = mapped_column('return_order_no',CustomString[25])
+    returnOrderNo : Mapped[Optional[str]] = mapped_column('return_order_no',CustomString(25))
 
     @classmethod
     def get_update_keys(cls):
@@ -408,11 +400,12 @@ class purchaseCreditMemos(Base):
 
 class purchaseInvoiceLines(Base):
     __tablename__ = 'purchase_invoice_line'
+    __storage__ = StorageOptions(columnstore='nonclustered')
 
-    documentNo : Mapped[str] = mapped_column('document_no',String[25],nullable=False)
+    documentNo : Mapped[str] = mapped_column('document_no',String(25),nullable=False)
     lineNo : Mapped[int] = mapped_column('line_no',Integer)
-    type : Mapped[Optional[str]] = mapped_column('item_type', CustomString[100])
-    no : Mapped[Optional[str]] = mapped_column('item_code',CustomString[20])
+    type : Mapped[Optional[str]] = mapped_column('item_type', CustomString(100))
+    no : Mapped[Optional[str]] = mapped_column('item_code',CustomString(20))
     quantity : Mapped[int] = mapped_column('quantity',Integer)
     unitCost : Mapped[float] = mapped_column('unit_cost',Float)
     lineDiscount : Mapped[float] = mapped_column('discount_percentage',Float)
@@ -426,11 +419,12 @@ class purchaseInvoiceLines(Base):
 
 class purchaseCreditMemoLines(Base):
     __tablename__ = 'purchase_cr_memo_line'
+    __storage__ = StorageOptions(columnstore='nonclustered')
 
-    documentNo : Mapped[str] = mapped_column('document_no',String[25],nullable=False)
+    documentNo : Mapped[str] = mapped_column('document_no',String(25),nullable=False)
     lineNo : Mapped[int] = mapped_column('line_no',Integer)
-    type : Mapped[Optional[str]] = mapped_column('item_type',CustomString[100])
-    no : Mapped[Optional[str]] = mapped_column('item_code',CustomString[20])
+    type : Mapped[Optional[str]] = mapped_column('item_type',CustomString(100))
+    no : Mapped[Optional[str]] = mapped_column('item_code',CustomString(20))
     quantity : Mapped[int] = mapped_column('quantity',Integer)
     unitCost : Mapped[float] = mapped_column('unit_cost',Float)
     lineDiscount : Mapped[float] = mapped_column('discount_percentage',Float)
@@ -446,15 +440,15 @@ class purchaseCreditMemoLines(Base):
 class purchaseOrders(Base):
     __tablename__ = 'purchase_order'
 
-    no : Mapped[str] = mapped_column('document_no',String[25],nullable=False)
-    documentType : Mapped[str] = mapped_column('document_type',CustomString[100])
-    status : Mapped[Optional[str]] = mapped_column('document_status',CustomString[25])
+    no : Mapped[str] = mapped_column('document_no',String(25),nullable=False)
+    documentType : Mapped[str] = mapped_column('document_type',CustomString(100))
+    status : Mapped[Optional[str]] = mapped_column('document_status',CustomString(25))
     postingDate : Mapped[date] = mapped_column('posting_date', Date)
     documentDate : Mapped[date] = mapped_column('document_date',Date)
-    payToVendorNo : Mapped[str] = mapped_column('vendor_code',CustomString[20])
-    paymentMethodCode : Mapped[Optional[str]] = mapped_column('payment_method_code',CustomString[20])
-    currencyCode : Mapped[Optional[str]] = mapped_column('currency_code',String[10])
-    purchaserCode : Mapped[Optional[str]] = mapped_column('purchaser_code',CustomString[20])
+    payToVendorNo : Mapped[str] = mapped_column('vendor_code',CustomString(20))
+    paymentMethodCode : Mapped[Optional[str]] = mapped_column('payment_method_code',CustomString(20))
+    currencyCode : Mapped[Optional[str]] = mapped_column('currency_code',String(10))
+    purchaserCode : Mapped[Optional[str]] = mapped_column('purchaser_code',CustomString(20))
     amount : Mapped[float] = mapped_column('amount',Float)
     amountIncludingVAT : Mapped[float] = mapped_column('amount_with_vat',Float)
     partiallyInvoiced : Mapped[bool] = mapped_column('is_partially_invoiced',Boolean)
@@ -467,11 +461,12 @@ class purchaseOrders(Base):
 
 class purchaseOrderLines(Base):
     __tablename__ = 'purchase_order_line'
+    __storage__ = StorageOptions(columnstore='nonclustered')
 
-    documentNo : Mapped[str] = mapped_column('document_no',String[25],nullable=False)
+    documentNo : Mapped[str] = mapped_column('document_no',String(25),nullable=False)
     lineNo : Mapped[int] = mapped_column('line_no',Integer)
-    type : Mapped[Optional[str]] = mapped_column('item_type',CustomString[100])
-    no : Mapped[Optional[str]] = mapped_column('item_code',CustomString[20])
+    type : Mapped[Optional[str]] = mapped_column('item_type',CustomString(100))
+    no : Mapped[Optional[str]] = mapped_column('item_code',CustomString(20))
     quantity : Mapped[int] = mapped_column('quantity',Integer)
     unitCost : Mapped[float] = mapped_column('unit_cost',Float)
     lineDiscount : Mapped[float] = mapped_column('discount_percentage',Float)
@@ -487,14 +482,14 @@ class purchaseOrderLines(Base):
 class purchaseReceipts(Base):
     __tablename__ = 'purchase_receipt'
 
-    no : Mapped[str] = mapped_column('document_no',String[25],nullable=False)
+    no : Mapped[str] = mapped_column('document_no',String(25),nullable=False)
     postingDate : Mapped[date] = mapped_column('posting_date',Date)
     documentDate : Mapped[date] = mapped_column('document_date',Date)
     expectedReceiptDate : Mapped[date] = mapped_column('expected_receipt_date',Date)
-    orderNo : Mapped[Optional[str]] = mapped_column('order_no',CustomString[25])
-    payToVendorNo : Mapped[date] = mapped_column('vendor_code',CustomString[20])
-    locationCode : Mapped[Optional[str]] = mapped_column('location_code',CustomString[20])
-    currencyCode : Mapped[Optional[str]] = mapped_column('currency_code',String[10])
+    orderNo : Mapped[Optional[str]] = mapped_column('order_no',CustomString(25))
+    payToVendorNo : Mapped[date] = mapped_column('vendor_code',CustomString(20))
+    locationCode : Mapped[Optional[str]] = mapped_column('location_code',CustomString(20))
+    currencyCode : Mapped[Optional[str]] = mapped_column('currency_code',String(10))
 
     @classmethod
     def get_update_keys(cls) -> List[str]:
@@ -503,11 +498,12 @@ class purchaseReceipts(Base):
 
 class purchaseReceiptLines(Base):
     __tablename__ = 'purchase_receipt_line'
+    __storage__ = StorageOptions(columnstore='nonclustered')
 
-    documentNo : Mapped[str] = mapped_column('document_no',String[25],nullable=False)
+    documentNo : Mapped[str] = mapped_column('document_no',String(25),nullable=False)
     lineNo : Mapped[int] = mapped_column('line_no',Integer)
-    type : Mapped[Optional[str]] = mapped_column('item_type',CustomString[100])
-    no : Mapped[Optional[str]] = mapped_column('item_code',CustomString[20])
+    type : Mapped[Optional[str]] = mapped_column('item_type',CustomString(100))
+    no : Mapped[Optional[str]] = mapped_column('item_code',CustomString(20))
     quantity : Mapped[int] = mapped_column('quantity',Integer)
     unitCost : Mapped[float] = mapped_column('unit_cost',Float)
     orderLineNo : Mapped[int] = mapped_column('order_line_no',Integer)
@@ -12,4 +12,10 @@ class UpdateOperationError(Exception):
     pass
 
 class SyncTableError(Exception):
+    pass
+
+class ParallelWriteError(Exception):
+    pass
+
+class LeaseLostError(Exception):
     pass
\ No newline at end of file
@@ -0,0 +1,267 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from typing import List, Dict, Any, Tuple, Type, Optional, Iterable
+from .normalization import get_column_normalizers
+import itertools
+import threading
+import logging
+import json
+import os
+import re
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+#rows fetched per round trip when loading an index from the table.
+LOAD_BATCH_SIZE = 50000
+
+#keys held by an index, the keys of the rows with the lowest ids are evicted above it.
+MAX_INDEXED_KEYS = 500000
+
+#process level registry, so the daemon and repeated flow runs in a worker keep their indexes warm.
+_index_registry : Dict[Tuple[str,str], 'KeyIndex'] = {}
+_index_registry_lock = threading.Lock()
+
+
+class KeyIndex:
+    """Business key -> surrogate id map of a model, used by update_records instead of querying the id of every modified record.
+       Single column keys are stored as scalars instead of 1-tuples to keep the map compact.
+       The map holds at most max_keys keys, those of the rows with the highest ids (the ones modified most often), i.e. the rows
+       of the id window from min_id to max_id. Keys evicted below min_id are resolved from the table by update_records.
+       The window is kept in sync with the table through a row count: rows with an id above max_id are loaded incrementally,
+       and a different count of rows inside the window (deleted rows) triggers a full reload. Rows are counted instead of keys,
+       so a table with duplicated business keys is not reloaded on every sync.
+       Ids of inserted rows are staged until commit, so a rolled back transaction never leaves ids of missing rows in the map.
+       When cache_path is set the map is persisted as a json snapshot followed by a log of the keys added by each commit,
+       and reused, after the same check, by the next process."""
+
+    def __init__(self, model : Type, cache_path : Optional[str] = None, max_keys : int = MAX_INDEXED_KEYS):
+
+        self.model = model
+        self.cache_path = cache_path
+        self.max_keys = max(1, max_keys)
+        self.key_fields = model.get_update_keys()
+        self.ids : Dict[Any,int] = {}
+        self.min_id = 0
+        self.max_id = 0
+        self.row_count = 0
+        self._pending : Dict[Any,int] = {}
+        self._pending_rows = 0
+        self._loaded = False
+        #saving rewrites the snapshot when set, otherwise it appends the entries added since the last save to the log
+        self._rewrite = True
+        self._appended : List[list] = []
+        self._logged = 0
+        self._generation = 0
+
+    def key(self, row : Dict[str,Any]) -> Any:
+
+        if len(self.key_fields) == 1:
+            return row[self.key_fields[0]]
+        return tuple(row[field] for field in self.key_fields)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def sync(self, db : Session) -> None:
+        """Validates the window against the table, loading new rows incrementally or reloading it when rows were removed."""
+
+        if not self._loaded:
+            self._load_cache()
+            self._loaded = True
+
+        if self.max_id:
+            row_count = self._count_rows(db)
+            if row_count != self.row_count:
+                logger.info(f'Key index of table {self.model.__tablename__} is out of sync ({self.row_count} indexed rows, {row_count} rows), reloading it.')
+                self.ids.clear()
+                self.min_id = self.max_id = self.row_count = 0
+                self._rewrite = True
+
+        evicted = self._load_rows(db, self.max_id)
+        if self._evict() or evicted:
+            self.row_count = self._count_rows(db)
+
+    def resolve(self, rows : List[Dict[str,Any]]) -> Tuple[List[Dict[str,Any]],List[Dict[str,Any]]]:
+        """Sets the id of the rows whose key is indexed, in place. Returns the rows with id and the rows not found."""
+
+        with_ids, missing = [], []
+        for row in rows:
+            row_id = self.ids.get(self.key(row))
+            if row_id is None:
+                missing.append(row)
+            else:
+                row['id'] = row_id
+                with_ids.append(row)
+
+        return with_ids, missing
+
+    def add(self, rows : Iterable[Any]) -> None:
+        """Indexes existing rows, each holding the id and the key fields."""
+
+        for row in rows:
+            values = row._mapping if hasattr(row, '_mapping') else row
+            self._put(self.key(values), values['id'])
+            self.row_count += 1
+
+    def stage(self, rows : Iterable[Any]) -> None:
+        """Holds the ids returned by an insert until the transaction is committed."""
+
+        for row in rows:
+            values = row._mapping if hasattr(row, '_mapping') else row
+            self._pending[self.key(values)] = values['id']
+            self._pending_rows += 1
+
+    def commit(self) -> None:
+
+        if self._pending:
+            for key, row_id in self._pending.items():
+                self._put(key, row_id)
+            self.row_count += self._pending_rows
+            self.max_id = max(self.max_id, max(self._pending.values()))
+            self.rollback()
+        self.save()
+
+    def rollback(self) -> None:
+
+        self._pending.clear()
+        self._pending_rows = 0
+
+    def _put(self, key : Any, row_id : int) -> None:
+        #keys are moved to the end when their id changes, so the map stays ordered by id and evicts from its start
+
+        self.ids.pop(key, None)
+        self.ids[key] = row_id
+        if not self._rewrite:
+            self._appended.append([*(key if isinstance(key, tuple) else (key,)), row_id])
+
+    def _evict(self) -> bool:
+        """Drops the keys of the lowest ids above max_keys, moving min_id to the lowest id left."""
+
+        excess = len(self.ids) - self.max_keys
+        if excess <= 0:
+            return False
+
+        for key in list(itertools.islice(self.ids, excess)):
+            del self.ids[key]
+        self.min_id = next(iter(self.ids.values()))
+        return True
+
+    def _count_rows(self, db : Session) -> int:
+        return db.scalar(select(func.count(self.model.id)).where(self.model.id.between(self.min_id, self.max_id)))
+
+    def _load_rows(self, db : Session, after_id : int) -> bool:
+        """Loads the rows above after_id, evicting after each batch so the map never grows beyond a batch above max_keys.
+           Returns whether keys were evicted, the rows of the window are then counted again."""
+
+        key_columns = [getattr(self.model, field) for field in self.key_fields]
+        last_id = after_id
+        evicted = False
+
+        while True:
+            statement = (
+                select(self.model.id, *key_columns)
+                .where(self.model.id > last_id)
+                .order_by(self.model.id)
+                .limit(LOAD_BATCH_SIZE)
+            )
+            rows = db.execute(statement).fetchall()
+            if not rows:
+                break
+            self.add(rows)
+            evicted = self._evict() or evicted
+            last_id = rows[-1].id
+
+        self.max_id = max(self.max_id, last_id)
+        return evicted
+
+    def save(self) -> None:
+        """Rewrites the snapshot after a reload or once the log holds more entries than the map, otherwise appends to the log."""
+
+        if not self.cache_path:
+            return
+
+        header = {'min_id' : self.min_id, 'max_id' : self.max_id, 'row_count' : self.row_count}
+        log_path = self.cache_path + '.log'
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+
+            if self._rewrite or self._logged > len(self.ids):
+                self._generation += 1
+                entries = [[*(key if isinstance(key, tuple) else (key,)), row_id] for key, row_id in self.ids.items()]
+                with open(self.cache_path + '.tmp', 'w') as f:
+                    json.dump({'key_fields' : self.key_fields, 'generation' : self._generation, **header, 'entries' : entries}, f, default=str)
+                os.replace(self.cache_path + '.tmp', self.cache_path)
+                if os.path.exists(log_path):
+                    os.remove(log_path)
+                self._logged = 0
+
+            elif self._appended:
+                with open(log_path, 'a') as f:
+                    f.write(json.dumps({'generation' : self._generation, **header, 'entries' : self._appended}, default=str) + '\n')
+                self._logged += len(self._appended)
+
+            self._appended = []
+            self._rewrite = False
+        except OSError as e:
+            logger.warning(f'Unable to persist the key index of table {self.model.__tablename__} at {self.cache_path} : {e}')
+
+    def _load_cache(self) -> None:
+        """Restores the snapshot and replays the log lines written after it, lines of an older snapshot are ignored."""
+
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+
+        try:
+            with open(self.cache_path) as f:
+                cache = json.load(f)
+            if cache['key_fields'] != self.key_fields:
+                return
+            self._generation = cache['generation']
+
+            log = []
+            if os.path.exists(self.cache_path + '.log'):
+                with open(self.cache_path + '.log') as f:
+                    log = [line for line in map(json.loads, f) if line['generation'] == self._generation]
+
+            #values are restored with the same converters used for api records, e.g. ISO strings back to dates
+            normalizers = dict(get_column_normalizers(self.model))
+            converters = [normalizers.get(field) or (lambda value: value) for field in self.key_fields]
+            for part in [cache, *log]:
+                for entry in part['entries']:
+                    key = tuple(convert(value) for convert, value in zip(converters, entry[:-1]))
+                    key = key if len(key) > 1 else key[0]
+                    self.ids.pop(key, None)
+                    self.ids[key] = entry[-1]
+
+            last = log[-1] if log else cache
+            self.min_id, self.max_id, self.row_count = last['min_id'], last['max_id'], last['row_count']
+            self.ids = {key : row_id for key, row_id in self.ids.items() if row_id >= self.min_id}
+            self._logged = sum(len(line['entries']) for line in log)
+            self._rewrite = False
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f'Ignoring unreadable key index cache at {self.cache_path} : {e}')
+            self.ids.clear()
+            self.min_id = self.max_id = self.row_count = 0
+            self._logged = 0
+            self._rewrite = True
+
+
+def get_key_index(model : Type, db : Session, cache_dir : Optional[str] = None) -> KeyIndex:
+    """Returns the key index of a model for the database bound to db, synced with the table.
+       Indexes are cached per database in cache_dir when given."""
+
+    url = db.get_bind().url
+    database = f'{url.host or ""}_{url.database or ""}'
+    registry_key = (database, model.__tablename__)
+
+    with _index_registry_lock:
+        index = _index_registry.get(registry_key)
+        if index is None:
+            cache_path = None
+            if cache_dir:
+                cache_path = os.path.join(cache_dir, re.sub(r'[^\w.-]+', '_', f'{database}_{model.__tablename__}') + '.json')
+            index = _index_registry[registry_key] = KeyIndex(model, cache_path)
+
+    index.sync(db)
+    return index
@@ -0,0 +1,165 @@
+from sqlalchemy import Table, Column, String, DateTime, Engine, Connection, select, insert, update, delete, func, and_, or_
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from .base import Base
+from .exceptions import LeaseLostError
+import threading
+import socket
+import uuid
+import time
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+#seconds between attempts while waiting on a lease held by another run.
+LEASE_POLL_SECONDS = 15
+
+#Leases of the (company, table) pairs being synced, so overlapping runs never sync the same table at the same time.
+
+sync_leases = Table(
+    'sync_leases', Base.metadata,
+    Column('company_id', String(50), primary_key=True),
+    Column('table_name', String(100), primary_key=True),
+    Column('owner', String(200), nullable=False),
+    Column('acquired_at', DateTime, nullable=False),
+    Column('expires_at', DateTime, nullable=False),
+)
+
+
+def _db_now(conn : Connection) -> datetime:
+    """Current time of the database server, so the expiry of a lease never depends on the clocks of the hosts running the syncs."""
+
+    now = conn.scalar(select(func.current_timestamp()))
+    if now.tzinfo is not None:
+        now = now.astimezone(timezone.utc).replace(tzinfo=None)
+    return now
+
+def default_owner() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+
+class TableLease:
+    """Lease of a company table in the target database, renewed by a heartbeat thread every third of its ttl.
+       Each statement runs in its own short transaction, apart from the sync session. A lease is taken over only once expired,
+       so a crashed run blocks the table for at most ttl seconds. Expiries are computed with the clock of the database,
+       and a lease not renewed for ttl seconds, e.g. while the database is unreachable, is considered lost by its holder."""
+
+    def __init__(self, engine : Engine, company_id : str, table_name : str, ttl : int = 300, owner : Optional[str] = None):
+
+        self.engine = engine
+        self.company_id = company_id
+        self.table_name = table_name
+        self.ttl = ttl
+        self.owner = owner or default_owner()
+        self.lost = False
+        #monotonic time of the last successful take or renewal, taken before the statement ran
+        self._renewed_at = 0.0
+        self._stop = threading.Event()
+        self._heartbeat : Optional[threading.Thread] = None
+
+    def __enter__(self) -> 'TableLease':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+    @property
+    def _where(self):
+        return and_(sync_leases.c.company_id == self.company_id, sync_leases.c.table_name == self.table_name)
+
+    def try_acquire(self) -> bool:
+        """Takes the lease when it is free, expired or already ours, and starts the heartbeat."""
+
+        started = time.monotonic()
+        with self.engine.begin() as conn:
+            now = _db_now(conn)
+            values = {'owner' : self.owner, 'acquired_at' : now, 'expires_at' : now + timedelta(seconds=self.ttl)}
+            taken = conn.execute(
+                update(sync_leases)
+                .where(self._where, or_(sync_leases.c.expires_at < now, sync_leases.c.owner == self.owner))
+                .values(values)
+            ).rowcount
+
+        if not taken:
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(insert(sync_leases).values(company_id=self.company_id, table_name=self.table_name, **values))
+            except IntegrityError:
+                return False
+
+        self.lost = False
+        self._renewed_at = started
+        self._stop.clear()
+        self._heartbeat = threading.Thread(target=self._renew, name=f'lease-{self.table_name}', daemon=True)
+        self._heartbeat.start()
+        return True
+
+    def acquire(self, wait : int = 0) -> bool:
+        """Tries to take the lease for up to wait seconds, returns False when another run still holds it."""
+
+        deadline = time.monotonic() + wait
+        while not self.try_acquire():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(LEASE_POLL_SECONDS, remaining))
+        return True
+
+    def holder(self) -> Optional[Tuple[str,datetime]]:
+        """Owner and expiry of the current lease of the table."""
+
+        with self.engine.connect() as conn:
+            row = conn.execute(select(sync_leases.c.owner, sync_leases.c.expires_at).where(self._where)).first()
+        return tuple(row) if row else None
+
+    def ensure_held(self) -> None:
+        """Raises LeaseLostError when the lease was taken over or not renewed within its ttl, e.g. before committing a sync."""
+
+        if self.lost or self._expired():
+            raise LeaseLostError(f'The lease of table {self.table_name} expired and may have been taken by another run.')
+
+    def release(self) -> None:
+
+        if self._heartbeat is None:
+            return
+
+        self._stop.set()
+        self._heartbeat.join()
+        self._heartbeat = None
+
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(delete(sync_leases).where(self._where, sync_leases.c.owner == self.owner))
+        except Exception as e:
+            logger.warning(f'Unable to release the lease of table {self.table_name}, it expires in {self.ttl} seconds : {e}')
+
+    def _expired(self) -> bool:
+        return time.monotonic() - self._renewed_at >= self.ttl
+
+    def _renew(self) -> None:
+
+        while not self._stop.wait(self.ttl / 3):
+            started = time.monotonic()
+            try:
+                with self.engine.begin() as conn:
+                    renewed = conn.execute(
+                        update(sync_leases)
+                        .where(self._where, sync_leases.c.owner == self.owner)
+                        .values(expires_at=_db_now(conn) + timedelta(seconds=self.ttl))
+                    ).rowcount
+            except Exception as e:
+                if self._expired():
+                    logger.error(f'The lease of table {self.table_name} expired without being renewed : {e}')
+                    self.lost = True
+                    return
+                logger.warning(f'Unable to renew the lease of table {self.table_name} : {e}')
+                continue
+
+            if not renewed:
+                logger.error(f'The lease of table {self.table_name} was taken over by another run.')
+                self.lost = True
+                return
+            self._renewed_at = started
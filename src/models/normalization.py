@@ -0,0 +1,90 @@
+from .types import CustomString
+from sqlalchemy.types import Date, DateTime, Float
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import List, Dict, Any, Type, Tuple, Callable, Optional
+
+class NormalizedRecord(dict):
+    """Record already converted by normalize_records in another process, normalize_records returns batches of them as received.
+       The subclass records whether the sync timestamps were parsed, since that depends on the target backend."""
+
+    parse_timestamps = False
+
+class TimestampNormalizedRecord(NormalizedRecord):
+    parse_timestamps = True
+
+
+#Business Central returns this date for empty date fields.
+NULL_DATE = '0001-01-01'
+EMPTY_STRINGS = frozenset(('',' '))
+
+
+def _empty_to_null(value : Any) -> Any:
+    return None if value in EMPTY_STRINGS else value
+
+@lru_cache(maxsize=4096)
+def _parse_date(value : str) -> Optional[date]:
+    #posting and document dates repeat heavily within a batch, so parsed values are memoized.
+    if value in EMPTY_STRINGS or value.startswith(NULL_DATE):
+        return None
+    return date.fromisoformat(value[:10])
+
+def _to_date(value : Any) -> Optional[date]:
+    if value is None or isinstance(value, date):
+        return value
+    return _parse_date(value)
+
+def _to_datetime(value : Any) -> Optional[datetime]:
+    #api timestamps are UTC, stored as naive datetimes like the driver does for the ISO strings bound on SQL Server
+    if value is None or isinstance(value, datetime):
+        return value
+    if value in EMPTY_STRINGS or value.startswith(NULL_DATE):
+        return None
+    return datetime.fromisoformat(value.replace('Z','+00:00')).astimezone(timezone.utc).replace(tzinfo=None)
+
+def _to_float(value : Any) -> Optional[float]:
+    if value is None or value in EMPTY_STRINGS:
+        return None
+    return float(value)
+
+
+def _get_converter(column_type, parse_timestamps : bool = False) -> Optional[Callable[[Any],Any]]:
+
+    if isinstance(column_type, DateTime):
+        return _to_datetime if parse_timestamps else None
+    if isinstance(column_type, CustomString):
+        return _empty_to_null
+    if isinstance(column_type, Date):
+        return _to_date
+    if isinstance(column_type, Float):
+        return _to_float
+    return None
+
+@lru_cache(maxsize=None)
+def get_column_normalizers(model : Type, parse_timestamps : bool = False) -> Tuple[Tuple[str, Optional[Callable[[Any],Any]]], ...]:
+    """Returns the (attribute name, converter) pairs of a model, converter is None for columns bound as received.
+       Sync timestamps are bound as received unless parse_timestamps is set, since the driver of SQL Server parses the ISO strings."""
+
+    return tuple((key, _get_converter(column.type, parse_timestamps)) for key, column in model.__mapper__.columns.items())
+
+def normalize_records(model : Type, records : List[Dict[str,Any]], parse_timestamps : bool = False) -> List[Dict[str,Any]]:
+    """Converts a batch of api records into plain, already typed values, one pass per column.
+       Returns new dictionaries holding only the mapped attributes, so api metadata like @odata.etag is dropped."""
+
+    if not records:
+        return []
+
+    first = records[0]
+    if isinstance(first, NormalizedRecord) and first.parse_timestamps == parse_timestamps:
+        return records
+    keys = []
+    columns = []
+
+    for key, convert in get_column_normalizers(model, parse_timestamps):
+        if key not in first:
+            continue
+        values = [rec.get(key) for rec in records]
+        keys.append(key)
+        columns.append(list(map(convert, values)) if convert else values)
+
+    return [dict(zip(keys, row)) for row in zip(*columns)]
@@ -0,0 +1,82 @@
+from typing import List, Dict, Any, Iterable, Iterator
+import threading
+import queue
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+#seconds between checks of the stop event while the queue is full.
+PUT_TIMEOUT = 0.5
+
+_DONE = object()
+
+
+class PagePrefetcher:
+    """Consumes a page iterator in a background thread, up to depth pages ahead of the consumer.
+       The bounded queue blocks the fetch while the writes fall behind, an error of the fetch is raised by the consumer
+       at the position of the failed page, and closing the prefetcher stops and closes the page iterator."""
+
+    def __init__(self, pages : Iterable[List[Dict[str,Any]]], depth : int = 4, name : str = 'prefetch'):
+
+        self._pages = pages
+        self._queue : queue.Queue = queue.Queue(maxsize=max(1, depth))
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._produce, name=name, daemon=True)
+        self._started = False
+
+    def __enter__(self) -> 'PagePrefetcher':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def start(self) -> None:
+
+        if not self._started:
+            self._started = True
+            self._thread.start()
+
+    def __iter__(self) -> Iterator[List[Dict[str,Any]]]:
+
+        self.start()
+        while True:
+            item = self._queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+    def close(self) -> None:
+        """Stops the fetch, unblocking a producer waiting on the full queue, and waits for its thread."""
+
+        self._stop.set()
+        if self._started:
+            self._thread.join()
+
+    def _put(self, item) -> bool:
+
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self) -> None:
+
+        pages = iter(self._pages)
+        try:
+            for page in pages:
+                if not self._put(page):
+                    return
+            self._put(_DONE)
+        except BaseException as e:
+            self._put(e)
+        finally:
+            close = getattr(pages, 'close', None)
+            if close:
+                close()
@@ -0,0 +1,175 @@
+import sqlite3
+import tempfile
+import json
+import os
+import sys
+import logging
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+#number of records sampled per page to estimate its in-memory size.
+SIZE_SAMPLE = 20
+#keys per membership query against the spilled store, below the sqlite variable limit.
+LOOKUP_CHUNK = 500
+
+
+def estimate_records_size(records : List[Dict[str,Any]]) -> int:
+    """Approximates the bytes held by a list of api records from a sample of its first rows."""
+
+    if not records:
+        return 0
+
+    sample = records[:SIZE_SAMPLE]
+    sample_size = sum(sys.getsizeof(rec) + sum(sys.getsizeof(v) for v in rec.values()) for rec in sample)
+
+    return sample_size * len(records) // len(sample)
+
+
+class RecordStore:
+    """Buffer of api records and their business keys for a single table sync.
+       Records are held in memory up to memory_budget bytes, above it every record and key is spilled to a temporary SQLite file,
+       so large deltas are processed in bounded chunks. A memory_budget of None keeps everything in memory."""
+
+    def __init__(self, key_fields : List[str], memory_budget : Optional[int] = None, spill_dir : Optional[str] = None):
+
+        self.key_fields = list(key_fields)
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        self._records : List[Dict[str,Any]] = []
+        self._keys : set = set()
+        self._size = 0
+        self._count = 0
+        self._path : Optional[str] = None
+        self._conn : Optional[sqlite3.Connection] = None
+
+    @property
+    def spilled(self) -> bool:
+        return self._conn is not None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Dict[str,Any]]:
+        for chunk in self.iter_chunks():
+            yield from chunk
+
+    def __enter__(self) -> 'RecordStore':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def key_of(self, record : Dict[str,Any]) -> Tuple:
+        return tuple(record[k] for k in self.key_fields)
+
+    def keys_of(self, records : List[Dict[str,Any]]) -> List[Tuple]:
+        """Business keys of a page, reusing the keys computed by the transform workers when present."""
+
+        keys = getattr(records, 'record_keys', None)
+        return keys if keys is not None and len(keys) == len(records) else [self.key_of(rec) for rec in records]
+
+    def extend(self, records : List[Dict[str,Any]]) -> None:
+        """Adds a page of records, spilling the store to disk once the memory budget is exceeded."""
+
+        if not records:
+            return
+
+        self._count += len(records)
+
+        if not self.spilled:
+            self._size += estimate_records_size(records)
+            self._records.extend(records)
+            self._keys.update(self.keys_of(records))
+
+            if self.memory_budget is not None and self._size > self.memory_budget:
+                self._spill()
+        else:
+            self._write(records)
+
+    def iter_chunks(self, chunk_size : int = 5000) -> Iterator[List[Dict[str,Any]]]:
+        """Yields the stored records in insertion order, in lists of at most chunk_size records."""
+
+        if not self.spilled:
+            for start in range(0, len(self._records), chunk_size):
+                yield self._records[start:start + chunk_size]
+            return
+
+        last_seq = 0
+        while True:
+            rows = self._conn.execute(
+                'SELECT seq, data FROM records WHERE seq > ? ORDER BY seq LIMIT ?', (last_seq, chunk_size)
+                ).fetchall()
+            if not rows:
+                return
+            last_seq = rows[-1][0]
+            yield [json.loads(data) for _, data in rows]
+
+    def preview(self, limit : int = 1000) -> List[Dict[str,Any]]:
+        """Returns the stored records if they are held in memory, otherwise the first limit records."""
+
+        if not self.spilled:
+            return self._records
+
+        return next(self.iter_chunks(limit), [])
+
+    def exclude_existing(self, records : Iterable[Dict[str,Any]]) -> List[Dict[str,Any]]:
+        """Returns the records whose business key is not in the store."""
+
+        keys = self.keys_of(records) if isinstance(records, list) else None
+        records = list(records)
+        keys = keys or [self.key_of(rec) for rec in records]
+
+        if not self.spilled:
+            return [rec for rec, key in zip(records, keys) if key not in self._keys]
+
+        existing = set()
+        encoded = [self._encode_key(key) for key in keys]
+        for start in range(0, len(encoded), LOOKUP_CHUNK):
+            chunk = encoded[start:start + LOOKUP_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            existing.update(row[0] for row in self._conn.execute(f'SELECT key FROM records WHERE key IN ({placeholders})', chunk))
+
+        return [rec for rec, key in zip(records, encoded) if key not in existing]
+
+    def close(self) -> None:
+        """Releases the in-memory records and removes the spill file, if any."""
+
+        self._records = []
+        self._keys = set()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self._path is not None:
+            os.remove(self._path)
+            self._path = None
+
+    def _encode_key(self, key : Tuple) -> str:
+        return json.dumps(key, default=str)
+
+    def _spill(self) -> None:
+
+        fd, self._path = tempfile.mkstemp(prefix='bc_sync_', suffix='.sqlite', dir=self.spill_dir)
+        os.close(fd)
+        logger.info(f'Memory budget of {self.memory_budget} bytes exceeded by {self._count} records, spilling to {self._path}')
+
+        self._conn = sqlite3.connect(self._path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=OFF')
+        self._conn.execute('PRAGMA synchronous=OFF')
+        self._conn.execute('CREATE TABLE records (seq INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL, data TEXT NOT NULL)')
+        self._conn.execute('CREATE INDEX ix_records_key ON records (key)')
+
+        records = self._records
+        self._records = []
+        self._keys = set()
+        self._size = 0
+        self._write(records)
+
+    def _write(self, records : List[Dict[str,Any]]) -> None:
+
+        self._conn.executemany(
+            'INSERT INTO records (key, data) VALUES (?, ?)',
+            ((self._encode_key(key), json.dumps(rec, default=str)) for rec, key in zip(records, self.keys_of(records)))
+            )
+        self._conn.commit()
@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Dict, Any, Type, Optional, Iterable, Iterator, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .base import Base
+
+#rows of a compressed columnstore rowgroup, inserts below it are left in the delta store.
+COLUMNSTORE_BATCH_ROWS = 102400
+#months partitioned ahead of the current one, the partition functions are created by migration 0005 and split by prepare_table.
+PARTITION_MONTHS_AHEAD = 12
+
+
+@dataclass(frozen=True)
+class StorageOptions:
+    """Physical storage of a model on SQL Server, declared as the __storage__ attribute of the model.
+       partition_by is the date attribute whose month partitions the columnstore index,
+       columnstore is 'nonclustered', an analytic copy of the rowstore table. The storage is created by migration 0005, written by hand
+       from these options, so a new or changed option needs its own revision."""
+
+    partition_by : Optional[str] = None
+    columnstore : Optional[str] = None
+
+    def __post_init__(self):
+        if self.columnstore not in (None, 'nonclustered'):
+            raise ValueError(f'Unknown columnstore option : {self.columnstore}')
+        if self.partition_by and not self.columnstore:
+            raise ValueError('partition_by partitions the columnstore index, a columnstore option is required.')
+
+
+def get_storage(model : Type['Base']) -> Optional[StorageOptions]:
+    return model.__storage__
+
+def partition_function_name(model : Type['Base']) -> str:
+    return f'pf_{model.__tablename__}_month'
+
+def partition_scheme_name(model : Type['Base']) -> str:
+    return f'ps_{model.__tablename__}_month'
+
+def columnstore_index_name(model : Type['Base']) -> str:
+    return f'csi_{model.__tablename__}'
+
+
+def month_start(value : date) -> date:
+    return value.replace(day=1)
+
+def add_months(value : date, months : int) -> date:
+    months = value.year * 12 + value.month - 1 + months
+    return date(months // 12, months % 12 + 1, 1)
+
+def month_boundaries(start : date, end : date) -> List[date]:
+    """First day of each month from start to end, both included."""
+
+    boundaries = []
+    current = month_start(start)
+    while current <= end:
+        boundaries.append(current)
+        current = add_months(current, 1)
+    return boundaries
+
+
+def write_batch_rows(model : Type['Base'], chunk_size : int) -> int:
+    """Rows per insert batch of a model, columnstore tables are written in batches of at least a rowgroup,
+       so each insert fills whole delta store rowgroups that the tuple mover compresses, instead of many partial ones.
+       These batches are held in memory outside the memory budget of the sync."""
+
+    storage = get_storage(model)
+    return max(chunk_size, COLUMNSTORE_BATCH_ROWS) if storage and storage.columnstore else chunk_size
+
+def rebatch(chunks : Iterable[List[Dict[str,Any]]], rows : int) -> Iterator[List[Dict[str,Any]]]:
+    """Regroups chunks of any size into lists of rows records, the last one may be smaller."""
+
+    batch = []
+    for chunk in chunks:
+        batch.extend(chunk)
+        while len(batch) >= rows:
+            yield batch[:rows]
+            batch = batch[rows:]
+    if batch:
+        yield batch
+
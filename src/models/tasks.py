@@ -1,15 +1,24 @@
 from .base import Base
 from .db_model import Tables
 from .exceptions import SQLEngineError,ModelRetrievalError
+from .record_store import RecordStore
+from .backends import BACKENDS
 import sqlalchemy
 import importlib
 import inspect
 import logging
-from typing import List, Dict, Type, Optional, Union
+import threading
+from typing import List, Dict, Type, Optional, Union, Tuple
+from datetime import datetime
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+#process level registry of engines, so repeated and parallel flow runs in a worker reuse warm pooled connections.
+#engines are keyed by connection url and pool size and never disposed while registered, another run may be using them.
+_engine_registry : Dict[Tuple[str,int], sqlalchemy.Engine] = {}
+_engine_registry_lock = threading.Lock()
+
 def get_models_to_sync(table_filter : Optional[Union[Tables,List[Tables]]] = None) -> List[Type[Base]]:
     
     models_module = importlib.import_module('.db_model',package='models')
@@ -26,20 +35,61 @@ def get_models_to_sync(table_filter : Optional[Union[Tables,List[Tables]]] = Non
     
     return models
 
-def create_db_engine(server : str, database : str, username : str, password : str) -> sqlalchemy.Engine:
+def get_connection_url(server : str, database : str, username : str, password : str, backend : str = 'mssql') -> str:
+    """Returns the connection url of the target backend: mssql (default), postgresql or sqlite (database is the file path)."""
+
+    if backend not in BACKENDS:
+        raise SQLEngineError(f'Unknown target backend "{backend}", valid values : {list(BACKENDS)}')
+
+    return BACKENDS[backend].connection_url(server, database, username, password)
 
-    connection_url = f"mssql+pyodbc://{username}:{password}@{server}/{database}?driver=ODBC+Driver+17+for+SQL+Server"
+def create_db_engine(server : str, database : str, username : str, password : str, pool_size : int = 5, max_overflow : int = 10,
+                     pool_pre_ping : bool = True, pool_recycle : int = 1800, backend : str = 'mssql') -> sqlalchemy.Engine:
+
+    connection_url = get_connection_url(server, database, username, password, backend)
     try:
-        engine = sqlalchemy.create_engine(connection_url)
+        engine = sqlalchemy.create_engine(connection_url, pool_size=pool_size, max_overflow=max_overflow,
+                                          pool_pre_ping=pool_pre_ping, pool_recycle=pool_recycle)
         connection = engine.connect()
         connection.close()
         logger.info(f'SQLAlchemy connection with context server : "{server}" database : "{database}" tested successfully.')
         return engine
     except Exception as e:
         raise SQLEngineError(f'Cannot create database engine with context:\n server : {server} \n database : {database}\n Error : {e}')
+
+def get_db_engine(server : str, database : str, username : str, password : str, concurrency : int = 1, pool_size : Optional[int] = None,
+                  max_overflow : int = 10, pool_pre_ping : bool = True, pool_recycle : int = 1800, backend : str = 'mssql') -> sqlalchemy.Engine:
+    """Returns a registered engine of the same url whose pool holds at least one connection per concurrent table sync,
+       creating and registering a new one otherwise. Engines with a smaller pool or other credentials are left to their users."""
+
+    url = get_connection_url(server, database, username, password, backend)
+    required_size = max(pool_size or 0, concurrency, 1)
+
+    with _engine_registry_lock:
+        sizes = [size for engine_url, size in _engine_registry if engine_url == url and size >= required_size]
+        if sizes:
+            logger.info(f'Reusing pooled engine for server : "{server}" database : "{database}".')
+            return _engine_registry[(url, min(sizes))]
+
+        engine = create_db_engine(server, database, username, password, pool_size=required_size, max_overflow=max_overflow,
+                                  pool_pre_ping=pool_pre_ping, pool_recycle=pool_recycle, backend=backend)
+        _engine_registry[(url, required_size)] = engine
+
+    return engine
+
+def dispose_db_engines() -> None:
+    """Closes the pooled connections of every registered engine and clears the registry."""
+
+    with _engine_registry_lock:
+        for engine in _engine_registry.values():
+            engine.dispose()
+        _engine_registry.clear()
         
-def filter_duplicates_by_index(model : Type[Base], modified_records : List[Dict[str,str]], new_records : List[Dict[str,str]]) -> List[Dict[str,str]]:
+def filter_duplicates_by_index(model : Type[Base], modified_records : List[Dict[str,str]], new_records : Union[RecordStore,List[Dict[str,str]]]) -> List[Dict[str,str]]:
     
+    if modified_records and isinstance(new_records, RecordStore):
+        return new_records.exclude_existing(modified_records)
+
     if modified_records and new_records:
 
         update_keys = model.get_update_keys()
@@ -49,3 +99,19 @@ def filter_duplicates_by_index(model : Type[Base], modified_records : List[Dict[
                 if tuple(row[str(k)] for k in update_keys) not in new_records_pks]
     
     return modified_records
+
+def probe_changes(model : Type[Base], api_client, timestamps : Dict[str,Optional[datetime]]) -> Optional[int]:
+    """Returns the number of api records created or modified after the sync timestamps of a model, None if the probe fails."""
+
+    try:
+        return api_client.count_changes(model.__name__, timestamps['last_created'], timestamps['last_modified'])
+    except Exception as e:
+        logger.warning(f'Unable to probe changes of entity {model.__name__}, it will be synced without probing : {e}')
+        return None
+
+def order_by_volume(models : List[Type[Base]], volumes : Dict[Type[Base],Optional[int]]) -> List[Type[Base]]:
+    """Drops models without changes and orders the rest by decreasing volume, so the largest deltas start first.
+       Models with an unknown volume are scheduled before the rest."""
+
+    changed = [model for model in models if volumes.get(model) != 0]
+    return sorted(changed, key=lambda model: -volumes[model] if volumes.get(model) is not None else float('-inf'))
@@ -0,0 +1,95 @@
+from concurrent.futures import ProcessPoolExecutor, Future
+from collections import deque
+from typing import List, Dict, Any, Tuple, Type, Iterable, Iterator
+from .normalization import normalize_records, NormalizedRecord, TimestampNormalizedRecord
+from . import db_model
+import multiprocessing
+import threading
+import logging
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+#pages submitted ahead of the one being consumed, per worker process.
+PAGES_IN_FLIGHT_PER_WORKER = 2
+
+#process level registry, worker processes are started once and shared by every table sync.
+_executors : Dict[int, ProcessPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+class TransformedPage(list):
+    """Normalized records of a page, with the business key of each record computed by the worker."""
+
+    def __init__(self, records : Iterable[Dict[str,Any]] = (), record_keys : List[tuple] = None):
+        super().__init__(records)
+        self.record_keys = record_keys if record_keys is not None else []
+
+
+def transform_page(model_name : str, payload : bytes, parse_timestamps : bool) -> Tuple[Tuple[str,...],List[tuple],List[tuple]]:
+    """Decodes and normalizes a page body in a worker process.
+       Returns the field names, the values of each record and its business key as tuples, which pickle far smaller than dicts."""
+
+    page = orjson.loads(payload) if orjson else json.loads(payload)
+    model = getattr(db_model, model_name)
+    rows = normalize_records(model, page.get('value', []), parse_timestamps)
+    if not rows:
+        return (), [], []
+
+    fields = tuple(rows[0])
+    key_fields = model.get_update_keys()
+    return fields, [tuple(row.values()) for row in rows], [tuple(row[key] for key in key_fields) for row in rows]
+
+
+def get_transform_executor(workers : int) -> ProcessPoolExecutor:
+
+    with _executors_lock:
+        if workers not in _executors:
+            logger.info(f'Starting {workers} transform worker processes.')
+            #spawned rather than forked, since the pool is started from a task thread while prefetch, heartbeat and logging threads
+            #may hold locks that a forked child would inherit locked
+            _executors[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        return _executors[workers]
+
+
+class TransformPool:
+    """Decodes and normalizes the raw pages of a model in worker processes, yielding them in page order.
+       Up to PAGES_IN_FLIGHT_PER_WORKER pages per worker are transformed ahead of the consumer."""
+
+    def __init__(self, model : Type, workers : int, parse_timestamps : bool = False):
+
+        self.model = model
+        self.workers = workers
+        self.parse_timestamps = parse_timestamps
+        self.record_type = TimestampNormalizedRecord if parse_timestamps else NormalizedRecord
+        self.executor = get_transform_executor(workers)
+
+    def imap(self, pages : Iterable[bytes]) -> Iterator[TransformedPage]:
+
+        in_flight : deque[Future] = deque()
+        pages = iter(pages)
+        exhausted = False
+
+        try:
+            while True:
+                while not exhausted and len(in_flight) < self.workers * PAGES_IN_FLIGHT_PER_WORKER:
+                    payload = next(pages, None)
+                    if payload is None:
+                        exhausted = True
+                        break
+                    in_flight.append(self.executor.submit(transform_page, self.model.__name__, payload, self.parse_timestamps))
+
+                if not in_flight:
+                    return
+
+                fields, rows, keys = in_flight.popleft().result()
+                yield TransformedPage((self.record_type(zip(fields, row)) for row in rows), keys)
+        finally:
+            for future in in_flight:
+                future.cancel()
@@ -0,0 +1,5 @@
+from sqlalchemy.types import String
+
+class CustomString(String):
+    """String type whose empty values are mapped to NULL.
+       The mapping is applied per batch by models.normalization before execution, not per bound value."""
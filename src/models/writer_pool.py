@@ -0,0 +1,130 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import Table, Column, MetaData, String, Index, insert, update, select, exists, and_
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterable, Type, Optional, TYPE_CHECKING
+from .exceptions import ParallelWriteError
+from .normalization import normalize_records
+from .backends import get_backend
+import logging
+import uuid
+
+if TYPE_CHECKING:
+    from .base import Base
+    from .key_index import KeyIndex
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+#prefix of the staging tables, a table left by a killed process can be dropped once no sync is running.
+STAGING_PREFIX = 'stg_'
+
+INSERT = 'I'
+UPDATE = 'U'
+
+
+class ParallelWriter:
+    """Writes the records of one table through several sessions, each on its own pooled connection and thread, into a staging table.
+       merge then applies the staging table to the table with two set based statements on the sync session, so the rows,
+       the aggregates and the sync timestamps are committed by a single transaction and a failed write leaves the table untouched.
+       The writer sessions only lock the staging table, the reads of the sync session on the table are never blocked by them.
+       The ids of the merged inserts are staged on key_index when given, like the inserts of insert_records."""
+
+    def __init__(self, model : Type['Base'], db : Session, writers : int, key_index : Optional['KeyIndex'] = None):
+
+        self.model = model
+        self.db = db
+        self.key_index = key_index
+        self.backend = get_backend(db.get_bind().dialect.name)
+        self.columns = {attribute.key : attribute.columns[0].name for attribute in model.__mapper__.column_attrs
+                        if attribute.columns[0].name != 'id'}
+        self.key_fields = model.get_update_keys()
+        self.key_columns = [self.columns[key] for key in self.key_fields]
+
+        self.staging = Table(f'{STAGING_PREFIX}{model.__tablename__}_{uuid.uuid4().hex[:8]}', MetaData(),
+                             *[Column(name, model.__table__.c[name].type) for name in self.columns.values()],
+                             Column('op', String(1), nullable=False))
+        self.staging.create(db.get_bind())
+
+        self.sessions = [Session(bind=db.get_bind(), info=db.info) for _ in range(writers)]
+        self._executor = ThreadPoolExecutor(max_workers=writers, thread_name_prefix=f'writer-{model.__tablename__}')
+
+    def __enter__(self) -> 'ParallelWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def insert(self, chunks : Iterable[List[Dict[str,Any]]]) -> int:
+        return self._write(chunks, INSERT)
+
+    def update(self, chunks : Iterable[List[Dict[str,Any]]]) -> int:
+        return self._write(chunks, UPDATE)
+
+    def merge(self) -> None:
+        """Commits the staged rows of every session and applies them to the table on the sync session, which the caller commits.
+           The staging table is indexed on the update keys once loaded, then staged updates are applied before the staged inserts.
+           Backends with upserts insert the updates of missing keys, they are turned into staged inserts first."""
+
+        for session in self.sessions:
+            try:
+                session.commit()
+            except Exception as e:
+                raise ParallelWriteError(f'Unable to stage the writes of table {self.model.__tablename__} : {e}') from e
+
+        table, staging = self.model.__table__, self.staging
+        names = list(self.columns.values())
+        matches = [table.c[name] == staging.c[name] for name in self.key_columns]
+
+        Index(f'ix_{staging.name}_keys', *[staging.c[name] for name in self.key_columns]).create(self.db.connection())
+
+        self.db.execute(
+            update(table)
+            .values({name : staging.c[name] for name in names if name not in self.key_columns})
+            .where(*matches, staging.c.op == UPDATE))
+
+        if self.backend.upserts_updates:
+            self.db.execute(update(staging).values(op=INSERT).where(staging.c.op == UPDATE, ~exists().where(*matches)))
+        self.db.execute(insert(table).from_select(names, select(*[staging.c[name] for name in names]).where(staging.c.op == INSERT)))
+
+        if self.key_index is not None:
+            self.key_index.stage(self.db.execute(
+                select(table.c.id, *[table.c[name].label(field) for field, name in zip(self.key_fields, self.key_columns)])
+                .where(*matches, staging.c.op == INSERT)
+            ).mappings())
+
+    def rollback(self) -> None:
+
+        for session in self.sessions:
+            session.rollback()
+
+    def close(self) -> None:
+        """Closes the sessions and drops the staging table, call it once the sync session committed or rolled back."""
+
+        self._executor.shutdown(wait=True)
+        for session in self.sessions:
+            session.close()
+        try:
+            self.staging.drop(self.db.get_bind(), checkfirst=True)
+        except Exception as e:
+            logger.warning(f'Unable to drop the staging table {self.staging.name} : {e}')
+
+    def _write(self, chunks : Iterable[List[Dict[str,Any]]], op : str) -> int:
+        """Splits each chunk in one slice per session and stages the slices concurrently, one chunk at a time."""
+
+        written = 0
+        for chunk in chunks:
+            if not chunk:
+                continue
+            step = -(-len(chunk) // len(self.sessions))
+            futures = [self._executor.submit(self._stage, chunk[start:start + step], session, op)
+                       for start, session in zip(range(0, len(chunk), step), self.sessions)]
+            for future in futures:
+                future.result()
+            written += len(chunk)
+
+        return written
+
+    def _stage(self, records : List[Dict[str,Any]], session : Session, op : str) -> None:
+
+        rows = normalize_records(self.model, records, self.backend.parse_timestamps)
+        session.execute(insert(self.staging), [{**{self.columns[key] : value for key, value in row.items() if key in self.columns}, 'op' : op} for row in rows])
@@ -0,0 +1,232 @@
+from main import sync_table, create_sync_resources
+from models.db_model import Tables
+from models.tasks import get_models_to_sync
+from config.settings import Config
+from config.logging_config import setup_logging
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import threading
+import logging
+import secrets
+import signal
+import hmac
+import json
+import time
+import uuid
+import requests
+import click
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+#subscriptions expire after three days, they are renewed well before that.
+RENEW_INTERVAL = 2 * 24 * 3600
+
+
+class ChangeDebouncer:
+    """Collects the entities named by notifications and triggers them once no notification arrived for debounce_seconds,
+       or max_delay after the first one, so a burst of changes results in a single targeted sync per entity."""
+
+    def __init__(self, trigger : Callable[[Set[str]],None], debounce_seconds : float = 5.0, max_delay : float = 60.0):
+
+        self.trigger = trigger
+        self.debounce_seconds = debounce_seconds
+        self.max_delay = max_delay
+        self._pending : Dict[str,Tuple[float,float]] = {}
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='webhook-debouncer', daemon=True)
+        self._thread.start()
+
+    def notify(self, entity : str) -> None:
+
+        with self._condition:
+            now = time.monotonic()
+            first_seen, _ = self._pending.get(entity, (now, now))
+            self._pending[entity] = (first_seen, now)
+            self._condition.notify()
+
+    def stop(self) -> None:
+
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _due(self, now : float) -> Set[str]:
+        return {entity for entity, (first_seen, last_seen) in self._pending.items()
+                if now - last_seen >= self.debounce_seconds or now - first_seen >= self.max_delay}
+
+    def _run(self) -> None:
+
+        while True:
+            with self._condition:
+                while not self._stopped and not self._due(time.monotonic()):
+                    self._condition.wait(self.debounce_seconds / 2 if self._pending else None)
+                if self._stopped:
+                    return
+                entities = self._due(time.monotonic())
+                for entity in entities:
+                    del self._pending[entity]
+
+            try:
+                self.trigger(entities)
+            except Exception as e:
+                logger.error(f'Targeted sync of {sorted(entities)} failed : {e}')
+
+
+class NotificationHandler(BaseHTTPRequestHandler):
+    """Answers the validation request of new subscriptions and forwards valid change notifications to the debouncer."""
+
+    server : 'WebhookReceiver'
+
+    def do_POST(self):
+
+        query = parse_qs(urlparse(self.path).query)
+        if 'validationToken' in query:
+            self._reply(200, query['validationToken'][0])
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            notifications = json.loads(self.rfile.read(length)).get('value', [])
+        except (ValueError, AttributeError):
+            self._reply(400, 'invalid notification payload')
+            return
+
+        authenticated = 0
+        for notification in notifications:
+            if not hmac.compare_digest(str(notification.get('clientState','')), self.server.client_state):
+                logger.warning(f"Ignoring notification with invalid client state for resource {notification.get('resource')}")
+                continue
+            authenticated += 1
+            entity = self.server.get_entity(notification.get('resource',''))
+            if entity:
+                self.server.debouncer.notify(entity)
+
+        self._reply(202 if authenticated or not notifications else 401, '')
+
+    def _reply(self, status : int, body : str) -> None:
+
+        payload = body.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+class WebhookReceiver(ThreadingHTTPServer):
+    """HTTP endpoint receiving Business Central notifications for the entities mapped in models.db_model."""
+
+    daemon_threads = True
+
+    def __init__(self, address : Tuple[str,int], client_state : str, company_id : str, debouncer : ChangeDebouncer):
+
+        super().__init__(address, NotificationHandler)
+        self.client_state = client_state
+        self.company_id = company_id
+        self.debouncer = debouncer
+
+    def get_entity(self, resource : str) -> Optional[str]:
+        """Returns the mapped entity of a notification resource, e.g. api/pub/grp/v1.0/companies(id)/customers -> customers."""
+
+        path = urlparse(resource).path or resource
+        if self.company_id and self.company_id.lower() not in path.lower():
+            return None
+
+        entity = path.rstrip('/').rsplit('/', 1)[-1].split('(', 1)[0]
+        return entity if entity in Tables.__members__ else None
+
+
+def register_subscriptions(api_client, notification_url : str, client_state : str, entities : List[str]) -> None:
+    """Creates the subscription of each entity, or renews it if one already points to notification_url."""
+
+    existing = {sub['resource'] : sub for sub in api_client.list_subscriptions() if sub.get('notificationUrl') == notification_url}
+
+    for entity in entities:
+        subscription = existing.get(api_client.get_resource_path(entity))
+        try:
+            if subscription:
+                api_client.renew_subscription(subscription, client_state)
+            else:
+                api_client.create_subscription(entity, notification_url, client_state)
+            logger.info(f'Webhook subscription active for entity {entity}')
+        except Exception as e:
+            logger.error(f'Unable to subscribe to changes of entity {entity}, it will only be synced by polling : {e}')
+
+
+def send_notifications(notification_url : str, resources : List[str], client_state : str, change_type : str = 'updated') -> requests.Response:
+    """Local stand-in for Business Central, posts change notifications for the given resource paths to a receiver."""
+
+    now = datetime.now(timezone.utc).isoformat()
+    payload = {'value' : [{
+        'subscriptionId' : uuid.uuid4().hex,
+        'clientState' : client_state,
+        'expirationDateTime' : now,
+        'resource' : resource,
+        'changeType' : change_type,
+        'lastModifiedDateTime' : now
+    } for resource in resources]}
+
+    return requests.post(notification_url, json=payload, timeout=10)
+
+
+def run_receiver(config : Config, host : str, port : int, notification_url : str, client_state : str,
+                 debounce_seconds : float = 5.0, max_delay : float = 60.0, stop_event : Optional[threading.Event] = None,
+                 subscribe : bool = True) -> None:
+    """Serves notifications and syncs only the changed entities, renewing the subscriptions until stop_event is set."""
+
+    stop_event = stop_event or threading.Event()
+    Session, api_client = create_sync_resources(config)
+    models = {model.__name__ : model for model in get_models_to_sync()}
+
+    def sync_entities(entities : Set[str]) -> None:
+        for entity in sorted(entities):
+            logger.info(f'Change notification received, syncing entity {entity}')
+            with Session() as db:
+                sync_table.fn(models[entity], api_client, db)
+
+    debouncer = ChangeDebouncer(sync_entities, debounce_seconds, max_delay)
+    receiver = WebhookReceiver((host, port), client_state, config.api.company_id, debouncer)
+    threading.Thread(target=receiver.serve_forever, name='webhook-receiver', daemon=True).start()
+    logger.info(f'Listening for Business Central notifications on {host}:{port}, public url : {notification_url}')
+
+    try:
+        while not stop_event.is_set():
+            if subscribe:
+                register_subscriptions(api_client, notification_url, client_state, list(models))
+            stop_event.wait(RENEW_INTERVAL)
+    finally:
+        receiver.shutdown()
+        debouncer.stop()
+
+
+@click.command('webhooks')
+@click.option('--config_block', default=None, help='Prefect configuration block, environment variables are used if omitted.')
+@click.option('--queue_logging', is_flag=True, help='Write logs as JSON lines from a listener thread, sampling the request logs.')
+@click.option('--notification_url', required=True, help='Public https url of this receiver, registered on each subscription.')
+@click.option('--host', default='0.0.0.0')
+@click.option('--port', default=8080, type=int)
+@click.option('--client_state', envvar='BC_WEBHOOK_CLIENT_STATE', default=None, help='Shared secret sent back on every notification.')
+@click.option('--debounce', default=5.0, type=float, help='Seconds without notifications before an entity is synced.')
+@click.option('--max_delay', default=60.0, type=float, help='Maximum seconds between the first notification and the sync of an entity.')
+def main(config_block : Optional[str], queue_logging : bool, notification_url : str, host : str, port : int, client_state : Optional[str], debounce : float, max_delay : float):
+
+    setup_logging(queued=queue_logging)
+    config = Config.load_from_block(config_block) if config_block else Config.load_from_env()
+
+    stop_event = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop_event.set())
+
+    run_receiver(config, host, port, notification_url, client_state or secrets.token_urlsafe(32), debounce, max_delay, stop_event)
+
+
+if __name__ == '__main__':
+    main()
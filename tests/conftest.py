@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+#modules are imported relative to src, as when running main.py, daemon.py or webhooks.py from it.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
@@ -0,0 +1,52 @@
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from models.aggregates import AggregateMaintainer, customer_balance, rebuild_aggregates
+from models.backends import get_backend
+from models.base import Base
+from models.db_model import customerLedgerEntries
+
+
+def _entry(entry_no : int, customer : str, remaining : float, open : bool = True):
+    return {'entryNo' : entry_no, 'postingDate' : '2024-01-01', 'documentDate' : '2024-01-01', 'documentType' : 'Invoice',
+            'documentNo' : f'D{entry_no}', 'customerNo' : customer, 'currencyCode' : '', 'amount' : 100.0, 'remainingAmount' : remaining,
+            'positive' : True, 'transactionNo' : entry_no, 'externalDocumentNo' : '', 'appliesToExtDocNo' : '', 'closedByEntryNo' : 0,
+            'open' : open, 'reversed' : False, 'reversedByEntryNo' : 0, 'reversedEntryNo' : 0,
+            'systemCreatedAt' : '2024-01-01T00:00:00Z', 'systemModifiedAt' : '2024-01-01T00:00:00Z'}
+
+
+def _balances(db : Session):
+    return {row.customer_code : (row.open_amount, row.open_entries) for row in db.execute(select(customer_balance))}
+
+
+def _sync(maintainer : AggregateMaintainer, db : Session, inserts, updates) -> None:
+    """Writes the records through the taps, as sync_table does."""
+
+    for chunk in maintainer.tap_inserts([inserts], db):
+        customerLedgerEntries.insert_records(chunk, db)
+    for chunk in maintainer.tap_updates([updates], db):
+        customerLedgerEntries.update_records(chunk, db)
+
+
+def test_updates_apply_after_minus_before(tmp_path):
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'target.db'}")
+    Base.metadata.create_all(engine)
+    db = Session(engine)
+
+    maintainer = AggregateMaintainer.for_model(customerLedgerEntries, db)
+    _sync(maintainer, db, [_entry(1, 'C1', 100.0), _entry(2, 'C1', 50.0), _entry(3, 'C2', 20.0)], [])
+    assert _balances(db) == {'C1' : (150.0, 2), 'C2' : (20.0, 1)}
+
+    #entry 1 is closed, entry 2 partially paid and entry 3 moved to another customer, a repeated update changes nothing
+    _sync(maintainer, db, [], [_entry(1, 'C1', 0.0, open=False), _entry(2, 'C1', 30.0), _entry(3, 'C3', 20.0)])
+    _sync(maintainer, db, [], [_entry(2, 'C1', 30.0)])
+    assert _balances(db) == {'C1' : (30.0, 1), 'C2' : (0.0, 0), 'C3' : (20.0, 1)}
+
+    #an update of a missing entry only counts on backends writing it
+    _sync(maintainer, db, [], [_entry(4, 'C4', 10.0)])
+    expected = (10.0, 1) if get_backend('sqlite').upserts_updates else None
+    assert _balances(db).get('C4') == expected
+
+    incremental = {customer : values for customer, values in _balances(db).items() if any(values)}
+    rebuild_aggregates(customerLedgerEntries, db)
+    assert incremental == _balances(db)
@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from models.backends import TargetBackend, GenericBackend, SQLiteBackend, get_backend
+from models.base import Base
+from models.db_model import currencies
+from models.key_index import KeyIndex
+from models.normalization import normalize_records
+
+
+def test_backend_without_connection_url_can_not_be_built():
+
+    class Incomplete(TargetBackend):
+        name = 'incomplete'
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_other_dialects_get_a_generic_backend():
+
+    backend = get_backend('mysql')
+
+    assert isinstance(backend, GenericBackend)
+    assert not backend.upserts_updates
+    assert backend.connection_url('db:3306', 'bc', 'user', 'secret') == 'mysql://user:secret@db:3306/bc'
+    assert isinstance(get_backend('sqlite'), SQLiteBackend)
+
+
+def test_insert_stages_the_returned_ids_on_the_key_index(tmp_path):
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'target.db'}")
+    Base.metadata.create_all(engine)
+    db = Session(engine)
+    key_index = KeyIndex(currencies)
+    key_index.sync(db)
+
+    records = [{'code' : code, 'systemCreatedAt' : '2024-01-01T00:00:00Z', 'systemModifiedAt' : '2024-01-01T00:00:00Z'} for code in ('EUR', 'USD')]
+    get_backend('sqlite').insert(currencies, normalize_records(currencies, records, True), db, key_index)
+    db.commit()
+    key_index.commit()
+
+    assert key_index.ids == dict(db.execute(select(currencies.code, currencies.id)).all())
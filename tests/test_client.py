@@ -0,0 +1,46 @@
+import requests
+from business_central_api.client import BusinessCentralAPIClient
+from business_central_api.page_size import PageSizeTuner
+
+
+class _Response:
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+
+class _Client(BusinessCentralAPIClient):
+    """Client without authentication answering $batch requests with a created response per operation."""
+
+    def __init__(self, existing : set):
+        requests.Session.__init__(self)
+        self.company_id = 'company'
+        self.api_root_url = 'https://bc.test/api/v2.0/'
+        self.page_size_tuner = PageSizeTuner()
+        self.existing = existing
+        self.posted = []
+
+    def get_existing_keys(self, entity, records, key_fields):
+        return self.existing
+
+    def request(self, url, method, **kwargs):
+        operations = kwargs['json']['requests']
+        self.posted.extend(operation['body'] for operation in operations)
+        return _Response({'responses' : [{'id' : operation['id'], 'status' : 201, 'body' : operation['body']} for operation in operations]})
+
+
+def _rate(currency : str, amount : float):
+    return {'currencyCode' : currency, 'startingDate' : '2024-01-01', 'exchangeRateAmount' : amount}
+
+
+def test_repeated_records_are_posted_once_and_reported_as_skipped():
+
+    client = _Client(existing={('2024-01-01', 'EUR', '')})
+    results = client.post_exchange_rates([_rate('EUR', 1.1), _rate('USD', 1.0), _rate('USD', 1.2), _rate('GBP', 0.9)])
+
+    assert [result.status for result in results] == ['skipped', 'created', 'skipped', 'created']
+    assert [rate['currencyCode'] for rate in client.posted] == ['USD', 'GBP']
+    assert results[1].record['exchangeRateAmount'] == 1.0
@@ -0,0 +1,48 @@
+from datetime import timedelta
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import Session
+from models.base import Base
+from models.completions import get_completions, is_completed, record_completion, sync_completions, COMPLETION_RETENTION_DAYS
+from models.db_model import currencies, items
+
+
+def _currency(code : str, modified : str):
+    return {'code' : code, 'description' : code, 'systemCreatedAt' : '2024-01-01T00:00:00Z', 'systemModifiedAt' : modified}
+
+
+def test_table_is_completed_until_its_timestamps_move(tmp_path):
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'target.db'}")
+    Base.metadata.create_all(engine)
+    db = Session(engine)
+
+    start = currencies.get_sync_timestamps(db)
+    currencies.insert_records([_currency('EUR', '2024-01-01T00:00:00Z')], db)
+    db.commit()
+    record_completion(db, 'run-1', 'company', currencies, start, currencies.get_sync_timestamps(db))
+
+    completions = get_completions(db, 'run-1', 'company')
+    assert is_completed(completions, currencies, currencies.get_sync_timestamps(db))
+    assert not is_completed(completions, items, items.get_sync_timestamps(db))
+    assert get_completions(db, 'run-1', 'other') == {}
+    assert get_completions(db, 'run-2', 'company') == {}
+
+    #another run synced the table afterwards, the retried run syncs it again
+    currencies.update_records([_currency('EUR', '2024-02-01T00:00:00Z')], db)
+    db.commit()
+    assert not is_completed(completions, currencies, currencies.get_sync_timestamps(db))
+
+
+def test_expired_completions_are_pruned(tmp_path):
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'target.db'}")
+    Base.metadata.create_all(engine)
+    db = Session(engine)
+    timestamps = currencies.get_sync_timestamps(db)
+
+    record_completion(db, 'old-run', 'company', currencies, timestamps, timestamps)
+    db.execute(update(sync_completions).values(completed_at=sync_completions.c.completed_at - timedelta(days=COMPLETION_RETENTION_DAYS + 1)))
+    db.commit()
+    record_completion(db, 'run', 'company', currencies, timestamps, timestamps)
+
+    assert db.execute(select(sync_completions.c.run_key)).scalars().all() == ['run']
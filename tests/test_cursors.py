@@ -0,0 +1,58 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from models.base import Base
+from models.cursors import KeysetCursor
+from models.db_model import customerLedgerEntries
+
+
+class _Api:
+    """Serves entries 1 to count as an api would, in pages of page_size, recording the filter of each request."""
+
+    def __init__(self, count : int, page_size : int):
+        self.entries = [{'entryNo' : entry_no} for entry_no in range(1, count + 1)]
+        self.page_size = page_size
+        self.filters = []
+
+    def fetch_pages(self, custom_filter = None, order_by = None, limit = None, select = None):
+        self.filters.append(custom_filter)
+        last_key = int(custom_filter.split(' gt ')[1]) if custom_filter else 0
+        window = [entry for entry in self.entries if entry['entryNo'] > last_key][:limit]
+        for start in range(0, len(window), self.page_size):
+            yield window[start:start + self.page_size]
+
+
+def test_initial_load_requests_consecutive_windows():
+
+    api = _Api(count=7, page_size=2)
+    pages = list(KeysetCursor(window=3).initial_pages(customerLedgerEntries, api.fetch_pages, ['entryNo']))
+
+    assert [entry['entryNo'] for page in pages for entry in page] == list(range(1, 8))
+    assert api.filters == [None, 'entryNo gt 3', 'entryNo gt 6']
+
+
+def test_window_filled_exactly_requests_the_next_one():
+
+    api = _Api(count=6, page_size=3)
+    list(KeysetCursor(window=3).initial_pages(customerLedgerEntries, api.fetch_pages, ['entryNo']))
+
+    assert api.filters == [None, 'entryNo gt 3', 'entryNo gt 6']
+
+
+def test_new_pages_resume_from_the_largest_stored_key(tmp_path):
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'target.db'}")
+    Base.metadata.create_all(engine)
+    db = Session(engine)
+    customerLedgerEntries.insert_records([{
+        'entryNo' : 4, 'postingDate' : '2024-01-01', 'documentDate' : '2024-01-01', 'documentType' : 'Invoice', 'documentNo' : 'D4',
+        'customerNo' : 'C1', 'currencyCode' : '', 'amount' : 1.0, 'remainingAmount' : 1.0, 'positive' : True, 'transactionNo' : 4,
+        'externalDocumentNo' : '', 'appliesToExtDocNo' : '', 'closedByEntryNo' : 0, 'open' : True, 'reversed' : False,
+        'reversedByEntryNo' : 0, 'reversedEntryNo' : 0, 'systemCreatedAt' : '2024-01-01T00:00:00Z', 'systemModifiedAt' : '2024-01-01T00:00:00Z'
+    }], db)
+    db.commit()
+
+    api = _Api(count=7, page_size=2)
+    pages = KeysetCursor(window=5).new_pages(customerLedgerEntries, api.fetch_pages, db, {}, ['entryNo'])
+
+    assert [entry['entryNo'] for page in pages for entry in page] == [5, 6, 7]
+    assert api.filters == ['entryNo gt 4']
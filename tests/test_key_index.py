@@ -0,0 +1,94 @@
+import json
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import Session
+from models.base import Base
+from models.db_model import currencies
+from models.key_index import KeyIndex
+
+
+def _currency(code : str):
+    return {'code' : code, 'description' : code, 'systemCreatedAt' : '2024-01-01T00:00:00Z', 'systemModifiedAt' : '2024-01-01T00:00:00Z'}
+
+
+def _database(tmp_path, codes) -> Session:
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'target.db'}")
+    Base.metadata.create_all(engine)
+    db = Session(engine)
+    currencies.insert_records([_currency(code) for code in codes], db)
+    db.commit()
+    return db
+
+
+def _insert(db : Session, index : KeyIndex, codes) -> None:
+
+    currencies.insert_records([_currency(code) for code in codes], db, index)
+    db.commit()
+    index.commit()
+
+
+def test_snapshot_and_log_restore_the_index(tmp_path):
+
+    db = _database(tmp_path, ['EUR', 'USD'])
+    cache = str(tmp_path / 'cache' / 'currencies.json')
+
+    index = KeyIndex(currencies, cache)
+    index.sync(db)
+    index.save()
+    _insert(db, index, ['GBP'])
+    _insert(db, index, ['JPY'])
+
+    with open(cache + '.log') as f:
+        assert [line['generation'] for line in map(json.loads, f)] == [1, 1]
+
+    restored = KeyIndex(currencies, cache)
+    restored.sync(db)
+    assert restored.ids == index.ids
+    assert restored.row_count == 4
+
+    #a deleted row changes the count of the window, the index is reloaded and a new snapshot replaces the log
+    db.execute(delete(currencies.__table__).where(currencies.code == 'USD'))
+    db.commit()
+    restored.sync(db)
+    restored.save()
+    assert set(restored.ids) == {'EUR', 'GBP', 'JPY'}
+    assert json.load(open(cache))['generation'] == 2
+
+    #log lines of an older snapshot are not replayed
+    with open(cache + '.log', 'w') as f:
+        f.write(json.dumps({'generation' : 1, 'min_id' : 0, 'max_id' : 99, 'row_count' : 1, 'entries' : [['USD', 99]]}) + '\n')
+    reloaded = KeyIndex(currencies, cache)
+    reloaded.sync(db)
+    assert reloaded.ids == restored.ids
+
+
+def test_index_keeps_the_highest_ids(tmp_path):
+
+    db = _database(tmp_path, ['AUD', 'CAD', 'EUR', 'GBP', 'USD'])
+    index = KeyIndex(currencies, max_keys=3)
+    index.sync(db)
+
+    assert list(index.ids) == ['EUR', 'GBP', 'USD']
+    with_ids, missing = index.resolve([{'code' : 'AUD'}, {'code' : 'USD'}])
+    assert [row['code'] for row in missing] == ['AUD']
+    assert with_ids[0]['id'] == index.ids['USD']
+
+    _insert(db, index, ['JPY'])
+    index.sync(db)
+    assert list(index.ids) == ['GBP', 'USD', 'JPY']
+
+
+def test_rolled_back_inserts_are_not_indexed(tmp_path):
+
+    db = _database(tmp_path, ['EUR'])
+    index = KeyIndex(currencies)
+    index.sync(db)
+
+    currencies.insert_records([_currency('USD')], db, index)
+    db.rollback()
+    index.rollback()
+    index.commit()
+
+    assert set(index.ids) == {'EUR'}
+    index.sync(db)
+    assert index.row_count == 1
@@ -0,0 +1,70 @@
+import time
+import pytest
+from sqlalchemy import create_engine
+from models.base import Base
+from models.exceptions import LeaseLostError
+from models.lease import TableLease
+
+
+def _crash(lease : TableLease) -> None:
+    """Stops the heartbeat of a lease without releasing it, as a killed run would."""
+
+    lease._stop.set()
+    lease._heartbeat.join()
+    lease._heartbeat = None
+
+
+@pytest.fixture
+def engine(tmp_path):
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'target.db'}")
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def test_held_lease_is_not_taken_and_is_freed_on_release(engine):
+
+    with TableLease(engine, 'company', 'customers', ttl=60, owner='first') as first:
+        assert first.try_acquire()
+        second = TableLease(engine, 'company', 'customers', ttl=60, owner='second')
+        assert not second.try_acquire()
+        assert first.holder()[0] == 'first'
+        #other tables and companies are leased independently
+        assert TableLease(engine, 'other', 'customers', ttl=60).try_acquire()
+
+    assert first.holder() is None
+    assert second.try_acquire()
+    second.release()
+
+
+def test_expired_lease_is_taken_over(engine):
+
+    crashed = TableLease(engine, 'company', 'customers', ttl=1, owner='crashed')
+    assert crashed.try_acquire()
+    _crash(crashed)
+
+    takeover = TableLease(engine, 'company', 'customers', ttl=60, owner='takeover')
+    assert not takeover.try_acquire()
+    #the database clock has a resolution of one second
+    time.sleep(2.1)
+    assert takeover.acquire(wait=0)
+    assert takeover.holder()[0] == 'takeover'
+
+    with pytest.raises(LeaseLostError):
+        crashed.ensure_held()
+    takeover.ensure_held()
+    takeover.release()
+
+
+def test_lease_taken_over_is_lost_by_its_heartbeat(engine):
+
+    lease = TableLease(engine, 'company', 'customers', ttl=3, owner='first')
+    assert lease.try_acquire()
+    with engine.begin() as conn:
+        conn.exec_driver_sql("UPDATE sync_leases SET owner = 'other'")
+
+    time.sleep(1.5)
+    assert lease.lost
+    with pytest.raises(LeaseLostError):
+        lease.ensure_held()
+    lease.release()
@@ -0,0 +1,49 @@
+import logging
+from config.logging_config import SamplingFilter
+
+
+def _request_records(request_no : int, entity : str = 'items'):
+    attempt = logging.makeLogRecord({'msg' : 'Attempting GET request', 'sample_key' : entity, 'request_no' : request_no, 'method' : 'GET'})
+    response = logging.makeLogRecord({'msg' : 'response obtained', 'sample_key' : entity, 'request_no' : request_no,
+                                      'status_code' : 200, 'elapsed_ms' : 5})
+    return attempt, response
+
+
+def test_sampling_keeps_request_and_response_lines_together():
+
+    sampler = SamplingFilter(sample_every=100)
+    kept = []
+    for request_no in range(1, 401):
+        for record in _request_records(request_no):
+            if sampler.filter(record):
+                kept.append(record)
+
+    assert len(kept) == 8
+    assert [r.request_no for r in kept] == [1, 1, 101, 101, 201, 201, 301, 301]
+    assert sum(hasattr(r, 'status_code') for r in kept) == 4
+
+
+def test_summary_counts_every_request_and_resets():
+
+    sampler = SamplingFilter(sample_every=10)
+    for request_no in range(1, 26):
+        for record in _request_records(request_no):
+            sampler.filter(record)
+
+    assert sampler.summarize('items') == {'records' : 50, 'requests' : 25, 'status_200' : 25}
+    assert sampler.summarize('items') == {}
+
+
+def test_requests_are_sampled_per_key():
+
+    sampler = SamplingFilter(sample_every=100)
+    kept = [record for request_no, entity in enumerate(['items', 'vendors'], start=1)
+            for record in _request_records(request_no, entity) if sampler.filter(record)]
+
+    assert len(kept) == 4
+
+
+def test_records_without_sample_key_always_pass():
+
+    sampler = SamplingFilter(sample_every=100)
+    assert all(sampler.filter(logging.makeLogRecord({'msg' : 'plain'})) for _ in range(5))
@@ -0,0 +1,69 @@
+import threading
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+import main
+from models.base import Base
+from models.db_model import currencies
+
+
+class _Future:
+    """Stand-in of a PrefectFuture finishing when its event is set."""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+    def wait(self, timeout=None):
+        return 'Completed' if self.done.wait(timeout) else None
+
+
+def test_wait_first_completed_returns_the_first_finished_future(monkeypatch):
+
+    monkeypatch.setattr(main, 'WAIT_POLL_SECONDS', 0.05)
+    futures = [_Future() for _ in range(3)]
+    threading.Timer(0.1, futures[2].done.set).start()
+
+    assert main.wait_first_completed(futures) == 2
+
+
+class _Client:
+    """Api client returning one new currency, counting the change probes."""
+
+    company_id = 'company'
+
+    def __init__(self):
+        self.probes = 0
+
+    def count_changes(self, entity, last_created, last_modified):
+        self.probes += 1
+        raise ConnectionError('count not available')
+
+    def iter_with_params(self, endpoint, last_created_at=None, last_modified_at=None, **params):
+        if last_created_at is not None:
+            yield [{'code' : 'USD', 'description' : 'dollar', 'systemCreatedAt' : '2024-02-01T00:00:00Z', 'systemModifiedAt' : '2024-02-01T00:00:00Z'}]
+
+
+def _currency_db(tmp_path):
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'target.db'}")
+    Base.metadata.create_all(engine)
+    db = Session(engine)
+    currencies.insert_records([{'code' : 'EUR', 'systemCreatedAt' : '2024-01-01T00:00:00Z', 'systemModifiedAt' : '2024-01-01T00:00:00Z'}], db)
+    db.commit()
+    return db
+
+
+def test_table_is_not_probed_again_after_a_failed_flow_probe(tmp_path):
+
+    db, client = _currency_db(tmp_path), _Client()
+    main._sync_table(currencies, client, db, None, 5000, None, 1, probe=False)
+
+    assert client.probes == 0
+    assert set(db.execute(select(currencies.code)).scalars()) == {'EUR', 'USD'}
+
+
+def test_table_without_expected_changes_is_probed(tmp_path):
+
+    db, client = _currency_db(tmp_path), _Client()
+    main._sync_table(currencies, client, db, None, 5000, None, 1)
+
+    assert client.probes == 1
@@ -0,0 +1,53 @@
+from argparse import Namespace
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, MetaData, String
+from models.base import Base
+from models import db_model, aggregates, lease, completions
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / 'alembic.ini'
+
+
+def _alembic(url : str) -> Config:
+
+    config = Config(str(ALEMBIC_INI))
+    config.cmd_opts = Namespace(x=[f'url={url}'])
+    return config
+
+
+def _deployed_schema(engine) -> None:
+    """Tables as deployed before migrations: the model tables with length-less strings and without the sync indexes."""
+
+    metadata = MetaData()
+    for table in Base.metadata.sorted_tables:
+        if not table.name.startswith(('agg_', 'sync_', 'aggregate_')):
+            copy = table.to_metadata(metadata)
+            copy.indexes.clear()
+            for column in copy.columns:
+                if isinstance(column.type, String):
+                    column.type = String()
+    metadata.create_all(engine)
+
+
+def test_stamped_deployed_schema_upgrades_to_head(tmp_path):
+
+    url = f"sqlite:///{tmp_path / 'deployed.db'}"
+    engine = create_engine(url)
+    _deployed_schema(engine)
+    assert inspect(engine).get_columns('customer_ledger')[4]['type'].length is None
+
+    command.stamp(_alembic(url), '0001')
+    command.upgrade(_alembic(url), 'head')
+    command.check(_alembic(url))
+
+    columns = {column['name'] : column for column in inspect(engine).get_columns('customer_ledger')}
+    assert columns['document_no']['type'].length == 25
+    assert not columns['document_no']['nullable']
+
+
+def test_empty_database_upgrades_to_head(tmp_path):
+
+    url = f"sqlite:///{tmp_path / 'empty.db'}"
+    command.upgrade(_alembic(url), 'head')
+    command.check(_alembic(url))
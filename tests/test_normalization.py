@@ -0,0 +1,37 @@
+from datetime import date, datetime
+from models.db_model import customerLedgerEntries
+from models.normalization import normalize_records, NormalizedRecord, TimestampNormalizedRecord
+
+
+def test_records_are_converted_per_column():
+
+    records = [
+        {'@odata.etag' : 'W/1', 'entryNo' : 1, 'postingDate' : '2024-03-01', 'documentDate' : '0001-01-01', 'customerNo' : '',
+         'amount' : '12.5', 'remainingAmount' : 0, 'systemCreatedAt' : '2024-03-01T10:00:00.5+02:00'},
+        {'@odata.etag' : 'W/2', 'entryNo' : 2, 'postingDate' : '2024-03-01', 'documentDate' : '2024-02-29', 'customerNo' : 'C1',
+         'amount' : '', 'remainingAmount' : 3, 'systemCreatedAt' : '2024-03-01T10:00:00Z'},
+    ]
+
+    first, second = normalize_records(customerLedgerEntries, records)
+    assert '@odata.etag' not in first
+    assert first['postingDate'] == date(2024, 3, 1) and first['documentDate'] is None
+    assert first['customerNo'] is None and second['customerNo'] == 'C1'
+    assert first['amount'] == 12.5 and second['amount'] is None
+    #sync timestamps are bound as received unless parsed for the backend, then they are naive UTC
+    assert first['systemCreatedAt'] == '2024-03-01T10:00:00.5+02:00'
+
+    first, second = normalize_records(customerLedgerEntries, records, parse_timestamps=True)
+    assert first['systemCreatedAt'] == datetime(2024, 3, 1, 8, 0, 0, 500000)
+    assert second['systemCreatedAt'] == datetime(2024, 3, 1, 10)
+
+
+def test_records_normalized_by_the_workers_are_returned_as_received():
+
+    page = [NormalizedRecord(entryNo=1, amount=1.0)]
+    assert normalize_records(customerLedgerEntries, page) is page
+
+    #records normalized without parsing the timestamps are normalized again for a backend parsing them
+    page = [NormalizedRecord(entryNo=1, systemCreatedAt='2024-03-01T10:00:00Z')]
+    assert normalize_records(customerLedgerEntries, page, parse_timestamps=True)[0]['systemCreatedAt'] == datetime(2024, 3, 1, 10)
+    page = [TimestampNormalizedRecord(entryNo=1)]
+    assert normalize_records(customerLedgerEntries, page, parse_timestamps=True) is page
@@ -0,0 +1,47 @@
+from business_central_api.page_size import PageSizeTuner
+
+
+def test_pages_of_unknown_record_count_only_shrink_the_size():
+
+    tuner = PageSizeTuner()
+    size = tuner.get('customers', 20)
+
+    #a fast small page would double a full page, but the page may have held fewer records than requested
+    tuner.record_page('customers', size, None, 0.1, 1000)
+    assert tuner.get('customers') == size
+
+    tuner.record_page('customers', size, None, 20.0, 1000)
+    assert tuner.get('customers') < size
+
+
+def test_full_pages_grow_the_size():
+
+    tuner = PageSizeTuner()
+    size = tuner.get('customers', 20)
+    tuner.record_page('customers', size, size, 0.1, 1000)
+
+    assert tuner.get('customers') > size
+
+
+def test_sizes_are_kept_per_environment_and_company(tmp_path):
+
+    cache = str(tmp_path / 'page_sizes.json')
+    production = PageSizeTuner(cache, scope=('production', 'company-a'))
+    sandbox = PageSizeTuner(cache, scope=('sandbox', 'company-a'))
+    production.record_throttle('customers')
+    sandbox.get('customers', 20)
+    production.save()
+    sandbox.save()
+
+    assert PageSizeTuner(cache, scope=('production', 'company-a')).get('customers') == production.get('customers')
+    assert PageSizeTuner(cache, scope=('sandbox', 'company-a')).get('customers') == sandbox.get('customers')
+    assert PageSizeTuner(cache, scope=('production', 'company-b')).get('customers', 20) == sandbox.get('customers')
+    assert [path.name for path in tmp_path.iterdir()] == ['page_sizes.json']
+
+
+def test_unscoped_cache_is_ignored(tmp_path):
+
+    cache = tmp_path / 'page_sizes.json'
+    cache.write_text('{"customers" : 100}')
+
+    assert PageSizeTuner(str(cache), scope=('production', 'company-a')).get('customers', 20) == 10000
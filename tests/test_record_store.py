@@ -0,0 +1,43 @@
+import os
+import pytest
+from models.record_store import RecordStore
+from models.transform import TransformedPage
+
+
+def _page(start : int, count : int):
+    return [{'code' : f'C{i}', 'company' : 'A', 'value' : i} for i in range(start, start + count)]
+
+
+@pytest.mark.parametrize('memory_budget', [None, 1])
+def test_records_are_kept_in_order_and_excluded_by_key(tmp_path, memory_budget):
+
+    with RecordStore(['code', 'company'], memory_budget, str(tmp_path)) as store:
+        store.extend(_page(0, 3))
+        store.extend(TransformedPage(_page(3, 3), [(f'C{i}', 'A') for i in range(3, 6)]))
+
+        assert store.spilled == (memory_budget is not None)
+        assert len(store) == 6
+        assert [rec['value'] for rec in store] == list(range(6))
+        assert [len(chunk) for chunk in store.iter_chunks(4)] == [4, 2]
+
+        candidates = _page(4, 4) + [{'code' : 'C0', 'company' : 'B', 'value' : 0}]
+        assert [(rec['code'], rec['company']) for rec in store.exclude_existing(candidates)] == [('C6', 'A'), ('C7', 'A'), ('C0', 'B')]
+        assert [rec['code'] for rec in store.exclude_existing(iter(_page(5, 2)))] == ['C6']
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_store_spills_once_the_budget_is_exceeded(tmp_path):
+
+    store = RecordStore(['code'], memory_budget=10**9, spill_dir=str(tmp_path))
+    store.extend(_page(0, 100))
+    assert not store.spilled
+
+    store.memory_budget = 1
+    store.extend(_page(100, 1))
+    assert store.spilled
+    assert len(os.listdir(tmp_path)) == 1
+    assert len(store.preview(10)) == 10
+
+    store.close()
+    assert os.listdir(tmp_path) == []
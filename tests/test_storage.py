@@ -0,0 +1,33 @@
+from datetime import date
+import pytest
+from models.storage import StorageOptions, COLUMNSTORE_BATCH_ROWS, write_batch_rows, rebatch, month_boundaries
+from models.db_model import customerLedgerEntries, currencies
+
+
+def test_clustered_columnstore_is_rejected():
+
+    with pytest.raises(ValueError):
+        StorageOptions(columnstore='clustered')
+    with pytest.raises(ValueError):
+        StorageOptions(partition_by='postingDate')
+
+
+def test_columnstore_tables_are_written_in_rowgroups():
+
+    assert write_batch_rows(customerLedgerEntries, 5000) == COLUMNSTORE_BATCH_ROWS
+    assert write_batch_rows(customerLedgerEntries, 200000) == 200000
+    assert write_batch_rows(currencies, 5000) == 5000
+
+
+def test_rebatch_regroups_chunks():
+
+    chunks = [[{'n' : n} for n in range(start, start + 3)] for start in range(0, 12, 3)]
+    batches = list(rebatch(chunks, 5))
+
+    assert [len(batch) for batch in batches] == [5, 5, 2]
+    assert [row['n'] for batch in batches for row in batch] == list(range(12))
+
+
+def test_month_boundaries_include_both_ends():
+
+    assert month_boundaries(date(2024, 11, 15), date(2025, 2, 1)) == [date(2024, 11, 1), date(2024, 12, 1), date(2025, 1, 1), date(2025, 2, 1)]
@@ -0,0 +1,19 @@
+from models.tasks import get_db_engine, dispose_db_engines
+
+
+def test_engines_are_reused_and_never_disposed_for_a_bigger_pool(tmp_path):
+
+    database = str(tmp_path / 'target.db')
+    try:
+        small = get_db_engine(None, database, None, None, concurrency=2, backend='sqlite')
+        assert get_db_engine(None, database, None, None, concurrency=1, backend='sqlite') is small
+
+        with small.connect() as connection:
+            large = get_db_engine(None, database, None, None, concurrency=4, backend='sqlite')
+            assert large is not small
+            #the connection of the run still using the smaller engine stays usable
+            assert connection.exec_driver_sql('select 1').scalar() == 1
+
+        assert get_db_engine(None, database, None, None, concurrency=3, backend='sqlite') is large
+    finally:
+        dispose_db_engines()
@@ -0,0 +1,10 @@
+from models.transform import TransformedPage
+
+
+def test_pages_do_not_share_record_keys():
+
+    first, second = TransformedPage([{'code' : 'EUR'}]), TransformedPage()
+    first.record_keys.append(('EUR',))
+
+    assert second.record_keys == []
+    assert TransformedPage([{'code' : 'USD'}], [('USD',)]).record_keys == [('USD',)]
@@ -0,0 +1,116 @@
+import threading
+import time
+import pytest
+import requests
+from webhooks import ChangeDebouncer, WebhookReceiver, send_notifications
+
+COMPANY_ID = '1f0c7a2e-0000-4000-8000-000000000001'
+CLIENT_STATE = 'shared-secret'
+
+
+class _Recorder:
+    """Trigger of a ChangeDebouncer recording each batch of entities with the monotonic time it was triggered."""
+
+    def __init__(self):
+        self.batches = []
+        self.triggered = threading.Event()
+
+    def __call__(self, entities):
+        self.batches.append((time.monotonic(), set(entities)))
+        self.triggered.set()
+
+
+def _resource(entity : str) -> str:
+    return f'api/v2.0/companies({COMPANY_ID})/{entity}'
+
+
+@pytest.fixture
+def receiver():
+
+    recorder = _Recorder()
+    debouncer = ChangeDebouncer(recorder, debounce_seconds=0.2, max_delay=5.0)
+    server = WebhookReceiver(('127.0.0.1', 0), CLIENT_STATE, COMPANY_ID, debouncer)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield f'http://127.0.0.1:{server.server_address[1]}/', recorder
+
+    server.shutdown()
+    debouncer.stop()
+
+
+def test_validation_token_is_echoed(receiver):
+
+    url, recorder = receiver
+    response = requests.post(url, params={'validationToken' : 'token-123'}, timeout=5)
+
+    assert response.status_code == 200
+    assert response.text == 'token-123'
+    assert not recorder.batches
+
+
+def test_notifications_are_coalesced_per_entity(receiver):
+
+    url, recorder = receiver
+    for _ in range(3):
+        response = send_notifications(url, [_resource('customers'), _resource('items')], CLIENT_STATE)
+        assert response.status_code == 202
+
+    assert recorder.triggered.wait(5)
+    time.sleep(0.5)
+    assert [entities for _, entities in recorder.batches] == [{'customers', 'items'}]
+
+
+def test_client_state_mismatch_is_rejected(receiver):
+
+    url, recorder = receiver
+    response = send_notifications(url, [_resource('customers')], 'wrong-secret')
+
+    assert response.status_code == 401
+    assert not recorder.triggered.wait(0.5)
+
+
+def test_unknown_entities_and_other_companies_are_ignored(receiver):
+
+    url, recorder = receiver
+    response = send_notifications(url, [_resource('notAnEntity'), 'api/v2.0/companies(other)/customers'], CLIENT_STATE)
+
+    assert response.status_code == 202
+    assert not recorder.triggered.wait(0.5)
+
+
+def test_debouncer_waits_for_quiet_period():
+
+    recorder = _Recorder()
+    debouncer = ChangeDebouncer(recorder, debounce_seconds=0.3, max_delay=10.0)
+    try:
+        started = time.monotonic()
+        for _ in range(4):
+            debouncer.notify('customers')
+            time.sleep(0.1)
+
+        assert recorder.triggered.wait(5)
+        triggered_at, entities = recorder.batches[0]
+        assert entities == {'customers'}
+        #the last notification was sent about 0.3 s after the first one
+        assert triggered_at - started >= 0.6
+    finally:
+        debouncer.stop()
+
+
+def test_debouncer_triggers_after_max_delay_under_constant_notifications():
+
+    recorder = _Recorder()
+    debouncer = ChangeDebouncer(recorder, debounce_seconds=0.3, max_delay=0.6)
+    try:
+        started = time.monotonic()
+        while time.monotonic() - started < 1.0 and not recorder.batches:
+            debouncer.notify('items')
+            time.sleep(0.05)
+
+        assert recorder.batches
+        triggered_at, entities = recorder.batches[0]
+        assert entities == {'items'}
+        assert 0.6 <= triggered_at - started < 1.0
+    finally:
+        debouncer.stop()
@@ -0,0 +1,55 @@
+from sqlalchemy import create_engine, select, inspect
+from sqlalchemy.orm import Session
+from models.base import Base
+from models.db_model import currencies
+from models.key_index import KeyIndex
+from models.writer_pool import ParallelWriter
+
+
+def _currency(code : str, description : str, modified : str = '2024-02-01T00:00:00Z'):
+    return {'code' : code, 'description' : description, 'systemCreatedAt' : '2024-01-01T00:00:00Z', 'systemModifiedAt' : modified}
+
+
+def test_merge_applies_staged_rows_in_the_sync_transaction(tmp_path):
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'target.db'}")
+    Base.metadata.create_all(engine)
+    db = Session(engine)
+    currencies.insert_records([_currency('EUR', 'euro')], db)
+    db.commit()
+
+    key_index = KeyIndex(currencies)
+    key_index.sync(db)
+
+    #SQLite has a single writer, one session is enough to exercise the staging and the merge
+    with ParallelWriter(currencies, db, 1, key_index) as writer:
+        writer.insert([[_currency(f'C{i}', str(i)) for i in range(5)]])
+        writer.update([[_currency('EUR', 'euro new', '2024-03-01T00:00:00Z'), _currency('USD', 'dollar', '2024-03-01T00:00:00Z')]])
+        writer.merge()
+        db.commit()
+        key_index.commit()
+        staging = writer.staging.name
+
+    rows = dict(db.execute(select(currencies.code, currencies.description)).all())
+    assert rows == {'EUR' : 'euro new', 'USD' : 'dollar', **{f'C{i}' : str(i) for i in range(5)}}
+
+    #merged inserts and upserted updates reach the key index, so the next sync does not reload it
+    assert set(key_index.ids) == set(rows)
+    count = key_index.row_count
+    key_index.sync(db)
+    assert key_index.row_count == count
+    assert staging not in inspect(engine).get_table_names()
+
+
+def test_rolled_back_merge_leaves_the_table_untouched(tmp_path):
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'target.db'}")
+    Base.metadata.create_all(engine)
+    db = Session(engine)
+
+    with ParallelWriter(currencies, db, 1) as writer:
+        writer.insert([[_currency('EUR', 'euro')]])
+        writer.merge()
+        db.rollback()
+
+    assert db.execute(select(currencies.code)).all() == []